@@ -20,7 +20,7 @@ from app.persistence.database import Base
 # Import all models so Alembic can detect them
 from app.models import (
     User, CustomerProfile, PrinterProfile, PrintingJob, 
-    Bid, Agreement, Rating
+    Bid, Agreement, Rating, JobMatch, RevokedToken, UploadedFile
 )
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,51 @@
+"""Operational API routes (connection pool state, metrics, storage GC)."""
+
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.persistence.database import engine, get_db, replica_engine
+from app.persistence.pool import get_pool_status
+from app.services.storage_gc import STORAGE_GC_GRACE_HOURS, collect_orphaned_files
+from app.utils.dependencies import require_admin_token
+from app.utils.metrics import metrics
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+async def get_pool():
+    """
+    Get the current state of the database connection pools of this worker.
+    
+    replica is null when no read replica is configured.
+    """
+    return {
+        "primary": get_pool_status(engine.sync_engine),
+        "replica": get_pool_status(replica_engine.sync_engine) if replica_engine is not None else None,
+    }
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK)
+async def get_metrics():
+    """
+    Get the in-process metrics of this worker.
+    """
+    return metrics.snapshot()
+
+
+@router.post("/storage-gc", status_code=status.HTTP_200_OK)
+async def run_storage_gc(
+    dry_run: bool = Query(True, description="Only report orphaned files"),
+    grace_hours: float = Query(STORAGE_GC_GRACE_HOURS, ge=1, description="Keep files younger than this"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delete uploaded files that no job references (dry run by default).
+    
+    Runs to completion within the request; for large buckets prefer
+    `python -m app.services.storage_gc`.
+    """
+    stats = await collect_orphaned_files(db, timedelta(hours=grace_hours), dry_run)
+    return stats.as_dict()
@@ -1,21 +1,25 @@
 """Authentication API routes."""
 
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.persistence.database import get_db
 from app.models.user import User
 from app.models.customer_profile import CustomerProfile
 from app.schemas import LoginRequest, LoginResponse, LogoutResponse, SignupRequest, UserResponse
+from app.services.identity import CurrentIdentity, invalidate_identity
+from app.services.token_revocation import token_revocation_list
 from app.utils.auth import create_access_token
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_token_payload
 from app.utils.enums import UserRole
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=LoginResponse, status_code=status.HTTP_200_OK)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     """
     Login endpoint for existing users.
     
@@ -29,7 +33,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         JWT access token and user information
     """
     # Check if user exists
-    user = db.query(User).filter(User.email == request.email).first()
+    user = (await db.execute(select(User).where(User.email == request.email))).scalars().first()
     
     if user is None:
         raise HTTPException(
@@ -68,7 +72,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/signup", response_model=LoginResponse, status_code=status.HTTP_201_CREATED)
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
+async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
     """
     Signup endpoint for new users.
     
@@ -80,7 +84,7 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
         JWT access token and user information
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == request.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == request.email))).scalars().first()
     if existing_user is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -98,9 +102,9 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
     customer_profile_id = None
     if request.role == UserRole.CUSTOMER:
         # Check if a customer profile with this company_name already exists
-        customer_profile = db.query(CustomerProfile).filter(
-            CustomerProfile.company_name == request.company_name
-        ).first()
+        customer_profile = (await db.execute(
+            select(CustomerProfile).where(CustomerProfile.company_name == request.company_name)
+        )).scalars().first()
         
         if customer_profile is None:
             # Create new customer profile
@@ -108,7 +112,7 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
                 company_name=request.company_name
             )
             db.add(customer_profile)
-            db.flush()  # Flush to get the profile ID without committing
+            await db.flush()  # Flush to get the profile ID without committing
         
         customer_profile_id = customer_profile.id
     
@@ -119,8 +123,8 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
         customer_profile_id=customer_profile_id
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Create JWT token
     token_data = {
@@ -144,15 +148,30 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/logout", response_model=LogoutResponse, status_code=status.HTTP_200_OK)
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(
+    current_user: CurrentIdentity = Depends(get_current_user),
+    token_payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Logout endpoint.
     
-    Since JWT tokens are stateless, this endpoint primarily serves as a confirmation.
-    The client should discard the token after calling this endpoint.
+    Revokes the access token used for this request, so it is rejected from
+    now on even if it leaks. The client should still discard the token.
     
     Returns:
         Success message
     """
+    jti = token_payload.get("jti")
+    if jti is not None:
+        await token_revocation_list.revoke(
+            db,
+            jti=jti,
+            user_id=current_user.id,
+            expires_at=datetime.fromtimestamp(token_payload["exp"], tz=timezone.utc)
+        )
+        await db.commit()
+    
+    invalidate_identity(current_user.id)
     return LogoutResponse(message="Successfully logged out")
 
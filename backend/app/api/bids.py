@@ -0,0 +1,112 @@
+"""Bid API routes."""
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.persistence.database import get_db
+from app.models.printing_job import PrintingJob
+from app.schemas.agreement import AgreementResponse
+from app.schemas.bid import BidSubmit, BidResponse, JobBidResponse
+from app.services.bidding import accept_bid, list_job_bids, submit_bid
+from app.services.identity import CurrentIdentity
+from app.utils.dependencies import get_read_db, require_role
+from app.utils.enums import UserRole
+
+router = APIRouter(prefix="/api/jobs", tags=["bids"])
+
+
+@router.get(
+    "/{job_uuid}/bids",
+    response_model=List[JobBidResponse],
+    status_code=status.HTTP_200_OK
+)
+async def get_job_bids(
+    job_uuid: str,
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    List the bids on one of the current customer's jobs, cheapest first.
+    
+    Each bid includes the printer's business name and rating summary. The
+    list is loaded in a fixed number of queries, whatever the number of bids.
+    Only customers can list bids, on their own jobs.
+    """
+    if current_user.customer_profile_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer profile not found"
+        )
+    
+    job_id = (await db.execute(
+        select(PrintingJob.id).where(
+            PrintingJob.uuid == job_uuid,
+            PrintingJob.customer_profile_id == current_user.customer_profile_id
+        )
+    )).scalar()
+    
+    if job_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return await list_job_bids(db, job_id)
+
+
+@router.put(
+    "/{job_uuid}/bid",
+    response_model=BidResponse,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_201_CREATED: {"model": BidResponse, "description": "Bid created"}}
+)
+async def put_bid(
+    job_uuid: str,
+    bid_data: BidSubmit,
+    response: Response,
+    current_user: CurrentIdentity = Depends(require_role([UserRole.PRINTER])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Submit or update the current printer's bid on an OPEN job.
+    
+    The first call creates the bid (201), later calls update its price,
+    turnaround and notes (200) until the bidding window ends. Payment terms
+    are copied from the printer profile each time.
+    Only printers can bid.
+    """
+    submission = await submit_bid(db, job_uuid, current_user.id, bid_data)
+    if submission.created:
+        response.status_code = status.HTTP_201_CREATED
+    return BidResponse.model_validate(submission.bid)
+
+
+@router.post(
+    "/{job_uuid}/bids/{bid_uuid}/accept",
+    response_model=AgreementResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def post_accept_bid(
+    job_uuid: str,
+    bid_uuid: str,
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Accept a bid on one of the current customer's jobs.
+    
+    The job moves to IN_PROGRESS, the bid to ACCEPTED and all other bids on
+    the job to LOST, and the agreement (price, turnaround and payment terms
+    of the bid) is created and returned.
+    Only customers can accept bids, on their own jobs.
+    """
+    if current_user.customer_profile_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer profile not found"
+        )
+    
+    agreement = await accept_bid(db, job_uuid, bid_uuid, current_user.id, current_user.customer_profile_id)
+    return AgreementResponse.model_validate(agreement)
@@ -1,24 +1,38 @@
 """Printing job management API routes."""
 
-import json
+import logging
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app.persistence.database import get_db
-from app.models.user import User
 from app.models.printing_job import PrintingJob
 from app.models.printer_profile import PrinterProfile
 from app.models.customer_profile import CustomerProfile
+from app.models.job_match import JobMatch
+from app.models.uploaded_file import UploadedFile
 from app.schemas.printing_job import (
     PrintingJobCreate,
     PrintingJobUpdate,
     PrintingJobResponse,
     PrintingJobPublishRequest
 )
-from app.utils.dependencies import get_current_user, require_role
-from app.utils.enums import UserRole, JobState, ProductType
+from app.services.bidding_sweeper import bidding_sweeper
+from app.services.identity import CurrentIdentity
+from app.services.matching import add_job_matches, normalize_location, locations_overlap
+from app.services.open_job_index import MATCHING_ENGINE, open_job_index
+from app.utils.dependencies import get_current_user, get_read_db, require_role
+from app.utils.enums import UserRole, JobState, ProductType, UploadStatus
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    paginate_newest_first
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
@@ -30,8 +44,8 @@ router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 )
 async def create_job(
     job_data: PrintingJobCreate,
-    current_user: User = Depends(require_role([UserRole.CUSTOMER])),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new printing job.
@@ -46,6 +60,9 @@ async def create_job(
             detail="Customer profile not found. Please create your profile first."
         )
     
+    if job_data.file_url is not None:
+        await ensure_file_attachable(db, job_data.file_url, current_user.id)
+    
     # Create job in DRAFT state
     job = PrintingJob(
         customer_profile_id=current_user.customer_profile_id,
@@ -62,12 +79,76 @@ async def create_job(
     )
     
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     
     return PrintingJobResponse.model_validate(job)
 
 
+# Declared before /{job_uuid}, which would otherwise take "matching" as a job UUID
+@router.get(
+    "/matching",
+    response_model=List[PrintingJobResponse],
+    status_code=status.HTTP_200_OK
+)
+async def get_matching_jobs(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    current_user: CurrentIdentity = Depends(require_role([UserRole.PRINTER])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get jobs that match the printer's profile.
+    
+    Only returns OPEN jobs that match:
+    - Product type (job.product_type in printer.supported_product_types)
+    - Quantity range (job.quantity within printer.min_quantity and max_quantity)
+    - Geography (job.delivery_location matches printer.service_areas, if both are set)
+    
+    Only accessible by printers. Results are paginated, most recent first;
+    when more jobs are available, the X-Next-Cursor response header holds the
+    cursor for the next page.
+    
+    Matches are read from job_matches, or with MATCHING_ENGINE=columnar
+    evaluated against the in-memory snapshot of OPEN jobs.
+    """
+    # Get printer profile
+    printer_profile = (await db.execute(
+        select(PrinterProfile).where(PrinterProfile.user_id == current_user.id)
+    )).scalars().first()
+    
+    if printer_profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Printer profile not found. Please create your profile first."
+        )
+    
+    if MATCHING_ENGINE == "columnar":
+        # Evaluate the profile against the in-memory snapshot of OPEN jobs;
+        # only the page's rows are loaded
+        matching_jobs, next_cursor = await open_job_index.page(db, printer_profile, cursor, limit)
+    else:
+        # Matches are materialized at publish / profile save time
+        query = select(PrintingJob).join(
+            JobMatch, JobMatch.job_id == PrintingJob.id
+        ).where(
+            JobMatch.printer_id == current_user.id,
+            PrintingJob.state == JobState.OPEN.value
+        )
+        
+        # Page over job_matches' denormalized (job_created_at, job_id) so each
+        # page is a range scan of the printer's slice of the index
+        matching_jobs, next_cursor = await paginate_newest_first(
+            db,
+            query, JobMatch.job_created_at, JobMatch.job_id, cursor, limit
+        )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    return [PrintingJobResponse.model_validate(job) for job in matching_jobs]
+
+
 @router.get(
     "/{job_uuid}",
     response_model=PrintingJobResponse,
@@ -75,8 +156,8 @@ async def create_job(
 )
 async def get_job(
     job_uuid: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a specific job by UUID.
@@ -86,7 +167,7 @@ async def get_job(
     """
     user_role = UserRole(current_user.role)
     
-    query = db.query(PrintingJob).filter(PrintingJob.uuid == job_uuid)
+    query = select(PrintingJob).where(PrintingJob.uuid == job_uuid)
     
     # Customers can only view jobs from their customer profile
     if user_role == UserRole.CUSTOMER:
@@ -95,12 +176,12 @@ async def get_job(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Customer profile not found"
             )
-        query = query.filter(PrintingJob.customer_profile_id == current_user.customer_profile_id)
+        query = query.where(PrintingJob.customer_profile_id == current_user.customer_profile_id)
     # Printers can only view OPEN jobs (matching logic is handled in the matching endpoint)
     elif user_role == UserRole.PRINTER:
-        query = query.filter(PrintingJob.state == JobState.OPEN.value)
+        query = query.where(PrintingJob.state == JobState.OPEN.value)
     
-    job = query.first()
+    job = (await db.execute(query)).scalars().first()
     
     if job is None:
         raise HTTPException(
@@ -117,19 +198,25 @@ async def get_job(
     status_code=status.HTTP_200_OK
 )
 async def list_jobs(
+    response: Response,
     state: Optional[JobState] = Query(None, description="Filter by job state"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    current_user: CurrentIdentity = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    List jobs.
+    List jobs, most recent first.
     
     Customers see their own jobs (optionally filtered by state).
     Printers should use /api/jobs/matching to see jobs that match their profile.
+    
+    Results are paginated: when more jobs are available, the X-Next-Cursor
+    response header holds the cursor for the next page.
     """
     user_role = UserRole(current_user.role)
     
-    query = db.query(PrintingJob)
+    query = select(PrintingJob)
     
     if user_role == UserRole.CUSTOMER:
         # Customers see jobs from their customer profile
@@ -138,12 +225,12 @@ async def list_jobs(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Customer profile not found. Please create your profile first."
             )
-        query = query.filter(PrintingJob.customer_profile_id == current_user.customer_profile_id)
+        query = query.where(PrintingJob.customer_profile_id == current_user.customer_profile_id)
         if state:
-            query = query.filter(PrintingJob.state == state.value)
+            query = query.where(PrintingJob.state == state.value)
     elif user_role == UserRole.PRINTER:
         # Printers should use the matching endpoint, but we allow listing OPEN jobs here
-        query = query.filter(PrintingJob.state == JobState.OPEN.value)
+        query = query.where(PrintingJob.state == JobState.OPEN.value)
         if state and state != JobState.OPEN:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -155,7 +242,9 @@ async def list_jobs(
             detail="Invalid user role"
         )
     
-    jobs = query.order_by(PrintingJob.created_at.desc()).all()
+    jobs, next_cursor = await paginate_newest_first(db, query, PrintingJob.created_at, PrintingJob.id, cursor, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [PrintingJobResponse.model_validate(job) for job in jobs]
 
 
@@ -167,8 +256,8 @@ async def list_jobs(
 async def update_job(
     job_uuid: str,
     job_data: PrintingJobUpdate,
-    current_user: User = Depends(require_role([UserRole.CUSTOMER])),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a printing job.
@@ -183,11 +272,13 @@ async def update_job(
             detail="Customer profile not found. Please create your profile first."
         )
     
-    job = db.query(PrintingJob).filter(
-        PrintingJob.uuid == job_uuid,
-        PrintingJob.customer_profile_id == current_user.customer_profile_id,
-        PrintingJob.state == JobState.DRAFT.value
-    ).first()
+    job = (await db.execute(
+        select(PrintingJob).where(
+            PrintingJob.uuid == job_uuid,
+            PrintingJob.customer_profile_id == current_user.customer_profile_id,
+            PrintingJob.state == JobState.DRAFT.value
+        )
+    )).scalars().first()
     
     if job is None:
         raise HTTPException(
@@ -206,7 +297,8 @@ async def update_job(
         job.description = job_data.description
     if job_data.special_instructions is not None:
         job.special_instructions = job_data.special_instructions
-    if job_data.file_url is not None:
+    if job_data.file_url is not None and job_data.file_url != job.file_url:
+        await ensure_file_attachable(db, job_data.file_url, current_user.id)
         job.file_url = job_data.file_url
     if job_data.bidding_duration_hours is not None:
         job.bidding_duration_hours = job_data.bidding_duration_hours
@@ -215,8 +307,8 @@ async def update_job(
     if job_data.pickup_preferred is not None:
         job.pickup_preferred = job_data.pickup_preferred
     
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
     
     return PrintingJobResponse.model_validate(job)
 
@@ -227,8 +319,8 @@ async def update_job(
 )
 async def delete_job(
     job_uuid: str,
-    current_user: User = Depends(require_role([UserRole.CUSTOMER])),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a printing job.
@@ -243,11 +335,13 @@ async def delete_job(
             detail="Customer profile not found. Please create your profile first."
         )
     
-    job = db.query(PrintingJob).filter(
-        PrintingJob.uuid == job_uuid,
-        PrintingJob.customer_profile_id == current_user.customer_profile_id,
-        PrintingJob.state == JobState.DRAFT.value
-    ).first()
+    job = (await db.execute(
+        select(PrintingJob).where(
+            PrintingJob.uuid == job_uuid,
+            PrintingJob.customer_profile_id == current_user.customer_profile_id,
+            PrintingJob.state == JobState.DRAFT.value
+        )
+    )).scalars().first()
     
     if job is None:
         raise HTTPException(
@@ -255,8 +349,8 @@ async def delete_job(
             detail="Job not found or you don't have permission to delete it"
         )
     
-    db.delete(job)
-    db.commit()
+    await db.delete(job)
+    await db.commit()
     
     return None
 
@@ -269,8 +363,8 @@ async def delete_job(
 async def publish_job(
     job_uuid: str,
     publish_request: PrintingJobPublishRequest,
-    current_user: User = Depends(require_role([UserRole.CUSTOMER])),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Publish a job (change state from DRAFT to OPEN).
@@ -286,11 +380,13 @@ async def publish_job(
             detail="Customer profile not found. Please create your profile first."
         )
     
-    job = db.query(PrintingJob).filter(
-        PrintingJob.uuid == job_uuid,
-        PrintingJob.customer_profile_id == current_user.customer_profile_id,
-        PrintingJob.state == JobState.DRAFT.value
-    ).first()
+    job = (await db.execute(
+        select(PrintingJob).where(
+            PrintingJob.uuid == job_uuid,
+            PrintingJob.customer_profile_id == current_user.customer_profile_id,
+            PrintingJob.state == JobState.DRAFT.value
+        )
+    )).scalars().first()
     
     if job is None:
         raise HTTPException(
@@ -338,12 +434,57 @@ async def publish_job(
     job.state = JobState.OPEN.value
     job.published_at = now
     
-    db.commit()
-    db.refresh(job)
+    # Materialize matches for printers in the same transaction
+    await db.flush()
+    matching_printer_ids = await add_job_matches(db, job)
+    
+    # Printers to notify about the new job: the ones just matched
+    notification_flags = (await db.execute(
+        select(
+            PrinterProfile.email_notifications,
+            PrinterProfile.whatsapp_notifications
+        ).where(PrinterProfile.user_id.in_(matching_printer_ids))
+    )).all() if matching_printer_ids else []
+    
+    await db.commit()
+    await db.refresh(job)
+    open_job_index.apply(job)
+    bidding_sweeper.notify()
+    
+    logger.info(
+        f"Job {job.uuid} published: {len(matching_printer_ids)} matching printers, "
+        f"{sum(bool(flags.email_notifications) for flags in notification_flags)} with email notifications, "
+        f"{sum(bool(flags.whatsapp_notifications) for flags in notification_flags)} with WhatsApp notifications"
+    )
     
     return PrintingJobResponse.model_validate(job)
 
 
+async def ensure_file_attachable(db: AsyncSession, file_key: str, user_id: int) -> None:
+    """
+    Check that a file_url refers to a completed upload of the user.
+    
+    The upload row stays share-locked until the caller commits, so storage
+    GC cannot delete the file in the meantime.
+    
+    Raises:
+        HTTPException: If the file is unknown, not yet completed or uploaded by someone else
+    """
+    uploaded_file = (await db.execute(
+        select(UploadedFile).where(
+            UploadedFile.file_key == file_key,
+            UploadedFile.user_id == user_id,
+            UploadedFile.status == UploadStatus.COMPLETED.value
+        ).with_for_update(read=True)
+    )).scalars().first()
+    
+    if uploaded_file is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="file_url must refer to a completed upload of yours"
+        )
+
+
 def job_matches_printer(job: PrintingJob, printer_profile: PrinterProfile) -> bool:
     """
     Check if a job matches a printer's profile based on:
@@ -356,13 +497,10 @@ def job_matches_printer(job: PrintingJob, printer_profile: PrinterProfile) -> bo
         True if job matches printer profile, False otherwise
     """
     # 1. Product type match
-    try:
-        supported_types = json.loads(printer_profile.supported_product_types)
-        if not isinstance(supported_types, list):
-            return False
-        if job.product_type not in supported_types:
-            return False
-    except (json.JSONDecodeError, TypeError):
+    supported_types = printer_profile.supported_product_types
+    if not isinstance(supported_types, list):
+        return False
+    if job.product_type not in supported_types:
         return False
     
     # 2. Quantity range match
@@ -373,73 +511,20 @@ def job_matches_printer(job: PrintingJob, printer_profile: PrinterProfile) -> bo
         return False
     
     # 3. Geography match (if both job and printer have location info)
-    if job.delivery_location and printer_profile.service_areas:
-        try:
-            service_areas = json.loads(printer_profile.service_areas)
-            if isinstance(service_areas, list) and len(service_areas) > 0:
-                # Simple matching: check if job location contains any service area
-                # or if any service area contains job location (case-insensitive)
-                job_location_lower = job.delivery_location.lower()
-                matches = any(
-                    area.lower() in job_location_lower or job_location_lower in area.lower()
-                    for area in service_areas
-                    if isinstance(area, str)
-                )
-                if not matches:
-                    return False
-        except (json.JSONDecodeError, TypeError):
-            # If service_areas is invalid JSON, skip geography matching
-            pass
+    service_areas = printer_profile.service_areas
+    if job.delivery_location and isinstance(service_areas, list) and len(service_areas) > 0:
+        # Token-based matching: the job location and a service area match
+        # if the normalized tokens of one appear in the other
+        job_location = normalize_location(job.delivery_location)
+        matches = any(
+            locations_overlap(job_location, normalize_location(area))
+            for area in service_areas
+            if isinstance(area, str)
+        )
+        if not matches:
+            return False
     
     # 4. Capability match (optional - for now we'll skip this as it's not clearly defined)
     # This can be enhanced later when capabilities are better defined
     
     return True
-
-
-@router.get(
-    "/matching",
-    response_model=List[PrintingJobResponse],
-    status_code=status.HTTP_200_OK
-)
-async def get_matching_jobs(
-    current_user: User = Depends(require_role([UserRole.PRINTER])),
-    db: Session = Depends(get_db)
-):
-    """
-    Get jobs that match the printer's profile.
-    
-    Only returns OPEN jobs that match:
-    - Product type (job.product_type in printer.supported_product_types)
-    - Quantity range (job.quantity within printer.min_quantity and max_quantity)
-    - Geography (job.delivery_location matches printer.service_areas, if both are set)
-    
-    Only accessible by printers.
-    """
-    # Get printer profile
-    printer_profile = db.query(PrinterProfile).filter(
-        PrinterProfile.user_id == current_user.id
-    ).first()
-    
-    if printer_profile is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Printer profile not found. Please create your profile first."
-        )
-    
-    # Get all OPEN jobs
-    open_jobs = db.query(PrintingJob).filter(
-        PrintingJob.state == JobState.OPEN.value
-    ).all()
-    
-    # Filter jobs that match the printer's profile
-    matching_jobs = [
-        job for job in open_jobs
-        if job_matches_printer(job, printer_profile)
-    ]
-    
-    # Sort by created_at (most recent first)
-    matching_jobs.sort(key=lambda j: j.created_at, reverse=True)
-    
-    return [PrintingJobResponse.model_validate(job) for job in matching_jobs]
-
@@ -1,8 +1,8 @@
 """Profile management API routes."""
 
-import json
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.persistence.database import get_db
 from app.models.user import User
@@ -13,18 +13,23 @@ from app.schemas import (
     CustomerProfileResponse,
     PrinterProfileCreate,
     PrinterProfileResponse,
-    ProfileResponse
+    ProfileResponse,
+    RatingSummaryBatchRequest,
+    RatingSummaryBatchResponse
 )
-from app.utils.dependencies import get_current_user, require_role
-from app.utils.enums import UserRole, ProductType
+from app.services.identity import CurrentIdentity, invalidate_identity
+from app.services.matching import rebuild_printer_matches
+from app.services.rating_summaries import get_rating_summaries
+from app.utils.dependencies import get_current_user, get_read_db, require_role
+from app.utils.enums import UserRole
 
 router = APIRouter(prefix="/api/profiles", tags=["profiles"])
 
 
 @router.get("/me", response_model=ProfileResponse, status_code=status.HTTP_200_OK)
 async def get_my_profile(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get the current user's profile (customer or printer).
@@ -35,14 +40,16 @@ async def get_my_profile(
     user_role = UserRole(current_user.role)
     
     if user_role == UserRole.CUSTOMER:
-        profile = current_user.customer_profile
+        profile = None
+        if current_user.customer_profile_id is not None:
+            profile = await db.get(CustomerProfile, current_user.customer_profile_id)
         return ProfileResponse(
             customer_profile=CustomerProfileResponse.model_validate(profile) if profile else None
         )
     elif user_role == UserRole.PRINTER:
-        profile = db.query(PrinterProfile).filter(
-            PrinterProfile.user_id == current_user.id
-        ).first()
+        profile = (await db.execute(
+            select(PrinterProfile).where(PrinterProfile.user_id == current_user.id)
+        )).scalars().first()
         return ProfileResponse(
             printer_profile=PrinterProfileResponse.model_validate(profile) if profile else None
         )
@@ -60,8 +67,8 @@ async def get_my_profile(
 )
 async def create_or_update_customer_profile(
     profile_data: CustomerProfileCreate,
-    current_user: User = Depends(require_role([UserRole.CUSTOMER])),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create or update customer profile.
@@ -71,18 +78,22 @@ async def create_or_update_customer_profile(
     If user doesn't have a profile, they will be linked to an existing profile with the same company_name,
     or a new profile will be created if no matching company_name exists.
     """
+    user = await db.get(User, current_user.id)
+    
     # Check if user already has a profile
-    profile = current_user.customer_profile
+    profile = None
+    if user.customer_profile_id is not None:
+        profile = await db.get(CustomerProfile, user.customer_profile_id)
     
     if profile is None:
         # Check if a profile with this company_name already exists
-        existing_profile = db.query(CustomerProfile).filter(
-            CustomerProfile.company_name == profile_data.company_name
-        ).first()
+        existing_profile = (await db.execute(
+            select(CustomerProfile).where(CustomerProfile.company_name == profile_data.company_name)
+        )).scalars().first()
         
         if existing_profile is not None:
             # Link user to existing profile
-            current_user.customer_profile_id = existing_profile.id
+            user.customer_profile_id = existing_profile.id
             profile = existing_profile
         else:
             # Create new profile
@@ -93,8 +104,8 @@ async def create_or_update_customer_profile(
                 address=profile_data.address
             )
             db.add(profile)
-            db.flush()  # Flush to get the profile ID
-            current_user.customer_profile_id = profile.id
+            await db.flush()  # Flush to get the profile ID
+            user.customer_profile_id = profile.id
     else:
         # Update existing profile (shared by all users in the same company)
         if profile_data.company_name is not None:
@@ -106,8 +117,9 @@ async def create_or_update_customer_profile(
         if profile_data.address is not None:
             profile.address = profile_data.address
     
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
+    invalidate_identity(user.id)
     
     return CustomerProfileResponse.model_validate(profile)
 
@@ -119,8 +131,8 @@ async def create_or_update_customer_profile(
 )
 async def create_or_update_printer_profile(
     profile_data: PrinterProfileCreate,
-    current_user: User = Depends(require_role([UserRole.PRINTER])),
-    db: Session = Depends(get_db)
+    current_user: CurrentIdentity = Depends(require_role([UserRole.PRINTER])),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create or update printer profile.
@@ -130,7 +142,7 @@ async def create_or_update_printer_profile(
     
     Validates:
     - business_name is required
-    - supported_product_types must be valid JSON array
+    - supported_product_types must be a list (or JSON array string) of ProductType values
     - payment_terms is required
     - max_quantity must be >= min_quantity if both are provided
     """
@@ -142,38 +154,14 @@ async def create_or_update_printer_profile(
                 detail="max_quantity must be greater than or equal to min_quantity"
             )
     
-    # Validate supported_product_types is valid JSON
-    try:
-        product_types_list = json.loads(profile_data.supported_product_types)
-        if not isinstance(product_types_list, list):
-            raise ValueError("supported_product_types must be a JSON array")
-        # Validate each product type is a valid enum value
-        for pt in product_types_list:
-            ProductType(pt)  # Will raise ValueError if invalid
-    except (json.JSONDecodeError, ValueError) as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid supported_product_types: {str(e)}"
-        )
-    
-    # Validate service_areas if provided
-    service_areas_value = None
-    if profile_data.service_areas is not None:
-        try:
-            service_areas_list = json.loads(profile_data.service_areas)
-            if not isinstance(service_areas_list, list):
-                raise ValueError("service_areas must be a JSON array")
-            service_areas_value = profile_data.service_areas
-        except (json.JSONDecodeError, ValueError) as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid service_areas: {str(e)}"
-            )
+    # Schemas parse legacy JSON strings; store plain lists in the JSONB columns
+    supported_product_types = [pt.value for pt in profile_data.supported_product_types]
+    service_areas_value = profile_data.service_areas
     
     # Check if profile already exists
-    profile = db.query(PrinterProfile).filter(
-        PrinterProfile.user_id == current_user.id
-    ).first()
+    profile = (await db.execute(
+        select(PrinterProfile).where(PrinterProfile.user_id == current_user.id)
+    )).scalars().first()
     
     if profile is None:
         # Create new profile
@@ -185,7 +173,7 @@ async def create_or_update_printer_profile(
             email=str(profile_data.email) if profile_data.email else None,
             address=profile_data.address,
             capabilities=profile_data.capabilities,
-            supported_product_types=profile_data.supported_product_types,
+            supported_product_types=supported_product_types,
             min_quantity=profile_data.min_quantity,
             max_quantity=profile_data.max_quantity,
             service_areas=service_areas_value,
@@ -208,7 +196,7 @@ async def create_or_update_printer_profile(
             profile.address = profile_data.address
         if profile_data.capabilities is not None:
             profile.capabilities = profile_data.capabilities
-        profile.supported_product_types = profile_data.supported_product_types
+        profile.supported_product_types = supported_product_types
         if profile_data.min_quantity is not None:
             profile.min_quantity = profile_data.min_quantity
         if profile_data.max_quantity is not None:
@@ -221,8 +209,32 @@ async def create_or_update_printer_profile(
         if profile_data.whatsapp_number is not None:
             profile.whatsapp_number = profile_data.whatsapp_number
     
-    db.commit()
-    db.refresh(profile)
+    # Recompute this printer's materialized job matches in the same transaction
+    await db.flush()
+    await rebuild_printer_matches(db, profile)
+    
+    await db.commit()
+    await db.refresh(profile)
+    invalidate_identity(current_user.id)
     
     return PrinterProfileResponse.model_validate(profile)
 
+
+@router.post(
+    "/printers/rating-summaries",
+    response_model=RatingSummaryBatchResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_printer_rating_summaries(
+    request_data: RatingSummaryBatchRequest,
+    current_user: CurrentIdentity = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get the rating summaries (count, average, 1-5 star histogram) of several
+    printers in one request, by printer profile UUID.
+    
+    Unknown printer profiles are left out of the response.
+    """
+    summaries = await get_rating_summaries(db, request_data.printer_profile_uuids)
+    return RatingSummaryBatchResponse(summaries=summaries)
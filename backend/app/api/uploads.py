@@ -1,23 +1,49 @@
 """File upload API routes."""
 
+from email.utils import format_datetime
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-import io
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from typing import Optional
 import logging
+import os
+import re
 
 from app.persistence.database import get_db
-from app.models.user import User
-from app.utils.dependencies import get_current_user, require_role
-from app.utils.enums import UserRole
+from app.models.printing_job import PrintingJob
+from app.models.uploaded_file import UploadedFile
+from app.schemas.upload import (
+    PresignedUploadRequest,
+    PresignedUploadResponse,
+    PresignedUrlBatchRequest,
+    PresignedUrlBatchResponse,
+    PresignedUrlResponse,
+    UploadedFileResponse
+)
+from app.services.identity import CurrentIdentity
+from app.services.previews import generate_preview, preview_key
+from app.utils.concurrency import ConcurrencyLimiter
+from app.utils.dependencies import get_current_user, get_read_db, require_role
+from app.utils.enums import JobState, UserRole, UploadStatus
+from app.utils.metrics import metrics
 from app.utils.storage import (
-    upload_file,
-    generate_presigned_url,
+    StreamingUpload,
+    InvalidRangeError,
+    delete_file,
+    generate_presigned_post,
+    generate_presigned_urls,
     generate_file_key,
-    file_exists,
-    get_file_content
+    get_file_metadata,
+    iter_file_chunks,
+    open_file_stream,
+    presigned_uploads_supported,
+    read_file
 )
+from app.utils.upload_stream import FilePartHeader, iter_multipart_file
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +53,33 @@ router = APIRouter(prefix="/api/uploads", tags=["uploads"])
 ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.gif', '.tiff', '.tif', '.psd', '.ai', '.eps', '.svg', '.doc', '.docx', '.zip'}
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Room for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Streamed uploads in progress per worker, uploads waiting for a slot, how
+# long they wait, and the Retry-After sent when saturated
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "8"))
+UPLOAD_MAX_QUEUED = int(os.getenv("UPLOAD_MAX_QUEUED", "16"))
+UPLOAD_QUEUE_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_QUEUE_TIMEOUT_SECONDS", "10"))
+UPLOAD_RETRY_AFTER_SECONDS = int(os.getenv("UPLOAD_RETRY_AFTER_SECONDS", "5"))
+
+upload_limiter = ConcurrencyLimiter(
+    "uploads",
+    max_active=UPLOAD_MAX_CONCURRENCY,
+    max_queued=UPLOAD_MAX_QUEUED,
+    queue_timeout=UPLOAD_QUEUE_TIMEOUT_SECONDS,
+    retry_after=UPLOAD_RETRY_AFTER_SECONDS
+)
+
+# Lifetime of presigned upload forms
+PRESIGNED_UPLOAD_EXPIRATION = 15 * 60  # 15 minutes
+
+# X-Content-SHA256 header values
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+# Range header values passed through to storage: a single byte range
+SINGLE_BYTE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
 
 def get_file_extension(filename: str) -> str:
     """Get file extension from filename."""
@@ -62,12 +115,32 @@ def get_content_type(filename: str) -> str:
 
 @router.post(
     "/job-file",
-    status_code=status.HTTP_201_CREATED
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}}
+                    }
+                }
+            }
+        }
+    }
 )
 async def upload_job_file(
-    file: UploadFile = File(...),
-    current_user: User = Depends(require_role([UserRole.CUSTOMER])),
-    db: Session = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    content_sha256: Optional[str] = Header(
+        None,
+        alias="X-Content-SHA256",
+        description="Hex SHA-256 of the file; skips the upload if you already uploaded this content"
+    ),
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a file for a printing job.
@@ -75,8 +148,199 @@ async def upload_job_file(
     Only customers can upload files.
     Files are stored in MinIO/S3 with a unique name.
     Returns the file key and URL that should be stored in the job.
+    
+    The file is streamed to storage as it arrives; uploads exceeding
+    MAX_FILE_SIZE are aborted as soon as the limit is crossed (or rejected
+    upfront when Content-Length says so). At most UPLOAD_MAX_CONCURRENCY
+    uploads stream at once; when the queue behind them is full, the
+    response is 503 with Retry-After.
+    
+    Uploads are deduplicated by content: if the user already uploaded the
+    same bytes, the existing file key is returned ("deduplicated": true)
+    and nothing new is stored. Clients that send X-Content-SHA256 (ideally
+    with "Expect: 100-continue") get that answer before sending the body.
+    
+    A preview (see GET /api/uploads/previews/{file_key}) is generated in
+    the background once the file is stored.
     """
-    filename = file.filename or "unknown"
+    # Reject oversized bodies before reading them or taking an upload slot
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+        metrics.counter("uploads_rejected_too_large").inc()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024):.0f}MB"
+        )
+    
+    if content_sha256 is not None:
+        content_sha256 = content_sha256.lower()
+        if not SHA256_HEX.match(content_sha256):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="X-Content-SHA256 must be a hex SHA-256 digest"
+            )
+        existing = await get_uploaded_file_by_hash(db, current_user.id, content_sha256)
+        if existing is not None:
+            return uploaded_file_response(existing, existing.filename, deduplicated=True)
+    
+    filename = "unknown"
+    upload: Optional[StreamingUpload] = None
+    
+    # Bounded so concurrent uploads cannot exhaust memory and storage connections
+    async with upload_limiter.slot():
+        try:
+            async for item in iter_multipart_file(request, "file"):
+                if isinstance(item, FilePartHeader):
+                    filename = item.filename or "unknown"
+                    
+                    # Validate file extension, before any file data is read
+                    if not is_allowed_file(filename):
+                        metrics.counter("uploads_rejected_file_type").inc()
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+                        )
+                    
+                    # Generate unique file key for storage
+                    file_key = generate_file_key(current_user.id, filename)
+                    upload = StreamingUpload(file_key, get_content_type(filename))
+                    continue
+                
+                if upload.size + len(item) > MAX_FILE_SIZE:
+                    metrics.counter("uploads_rejected_too_large").inc()
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024):.0f}MB"
+                    )
+                await upload.write(item)
+            
+            if upload is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Missing file field 'file'"
+                )
+            
+            if content_sha256 is not None and upload.sha256 != content_sha256:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File content does not match X-Content-SHA256"
+                )
+            
+            # Same content uploaded before: drop the parts sent so far and reuse it
+            existing = await get_uploaded_file_by_hash(db, current_user.id, upload.sha256)
+            if existing is not None:
+                await upload.abort()
+                return uploaded_file_response(existing, filename, deduplicated=True)
+            
+            await upload.complete()
+        except HTTPException:
+            if upload is not None:
+                await upload.abort()
+            raise
+        except Exception as e:
+            if upload is not None:
+                await upload.abort()
+            logger.error(
+                f"Failed to upload file {filename} to storage",
+                exc_info=True
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload file: {str(e)}"
+            )
+    
+    # Record the upload so it can be attached to a job
+    uploaded_file = UploadedFile(
+        user_id=current_user.id,
+        file_key=upload.file_key,
+        filename=filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        sha256=upload.sha256,
+        status=UploadStatus.COMPLETED.value,
+        completed_at=datetime.now(timezone.utc)
+    )
+    db.add(uploaded_file)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same content won; keep its copy
+        await db.rollback()
+        await delete_file(upload.file_key)
+        existing = await get_uploaded_file_by_hash(db, current_user.id, upload.sha256)
+        if existing is None:
+            raise
+        return uploaded_file_response(existing, filename, deduplicated=True)
+    
+    background_tasks.add_task(generate_preview, uploaded_file.file_key)
+    return uploaded_file_response(uploaded_file, filename, deduplicated=False)
+
+
+async def get_uploaded_file_by_hash(db: AsyncSession, user_id: int, sha256: str) -> Optional[UploadedFile]:
+    """
+    Get the user's completed upload with the given content hash, if any, for
+    reuse, and commit.
+    
+    Its last_used_at is refreshed in the same statement, so storage GC
+    treats the reused file as new. If GC deleted the upload first, nothing
+    is returned.
+    """
+    uploaded_file = (await db.execute(
+        update(UploadedFile)
+        .where(
+            UploadedFile.user_id == user_id,
+            UploadedFile.sha256 == sha256,
+            UploadedFile.status == UploadStatus.COMPLETED.value
+        )
+        .values(last_used_at=func.now())
+        .returning(UploadedFile)
+        .execution_options(synchronize_session=False)
+    )).scalars().first()
+    await db.commit()
+    return uploaded_file
+
+
+def uploaded_file_response(uploaded_file: UploadedFile, filename: str, deduplicated: bool) -> dict:
+    # Return file_key as file_url - frontend will use it to get presigned URLs
+    # This ensures we can always generate fresh URLs even if they expire
+    return {
+        "file_path": uploaded_file.file_key,
+        "file_url": uploaded_file.file_key,  # Store the file_key, not a presigned URL
+        "filename": filename,
+        "size": uploaded_file.size,
+        "deduplicated": deduplicated
+    }
+
+
+@router.post(
+    "/presigned",
+    response_model=PresignedUploadResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_presigned_upload(
+    upload_data: PresignedUploadRequest,
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start a direct-to-storage upload of a file for a printing job.
+    
+    Only customers can upload files.
+    Returns a presigned POST: the client uploads the file straight to
+    MinIO/S3 (it never passes through the API), then calls
+    POST /api/uploads/{upload_uuid}/complete to get the file_url for the job.
+    Storage rejects files larger than MAX_FILE_SIZE.
+    
+    Answers 501 when the storage backend does not support direct uploads
+    (STORAGE_BACKEND=local); use POST /api/uploads/job-file instead.
+    """
+    if not presigned_uploads_supported():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Direct uploads are not supported by this storage backend. Use /api/uploads/job-file."
+        )
+    
+    filename = upload_data.filename
     
     # Validate file extension
     if not is_allowed_file(filename):
@@ -85,43 +349,184 @@ async def upload_job_file(
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Read file content to check size
-    contents = await file.read()
-    file_size = len(contents)
-    
-    if file_size > MAX_FILE_SIZE:
+    if upload_data.size is not None and upload_data.size > MAX_FILE_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024):.0f}MB"
         )
     
-    # Generate unique file key for storage
     file_key = generate_file_key(current_user.id, filename)
-    
-    # Get content type
     content_type = get_content_type(filename)
     
-    # Upload to MinIO/S3
     try:
-        upload_file(contents, file_key, content_type)
+        presigned = await generate_presigned_post(
+            file_key, content_type, MAX_FILE_SIZE, PRESIGNED_UPLOAD_EXPIRATION
+        )
     except Exception as e:
         logger.error(
-            f"Failed to upload file {filename} to storage",
+            f"Failed to presign upload of {filename}",
             exc_info=True
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload file: {str(e)}"
+            detail=f"Failed to create upload: {str(e)}"
         )
     
-    # Return file_key as file_url - frontend will use it to get presigned URLs
-    # This ensures we can always generate fresh URLs even if they expire
-    return {
-        "file_path": file_key,
-        "file_url": file_key,  # Store the file_key, not a presigned URL
-        "filename": filename,
-        "size": file_size
-    }
+    uploaded_file = UploadedFile(
+        user_id=current_user.id,
+        file_key=file_key,
+        filename=filename,
+        content_type=content_type,
+        status=UploadStatus.PENDING.value
+    )
+    db.add(uploaded_file)
+    await db.commit()
+    
+    return PresignedUploadResponse(
+        upload_uuid=uploaded_file.uuid,
+        file_key=file_key,
+        url=presigned["url"],
+        fields=presigned["fields"],
+        expires_in=PRESIGNED_UPLOAD_EXPIRATION
+    )
+
+
+@router.post(
+    "/{upload_uuid}/complete",
+    response_model=UploadedFileResponse,
+    status_code=status.HTTP_200_OK
+)
+async def complete_presigned_upload(
+    upload_uuid: str,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentIdentity = Depends(require_role([UserRole.CUSTOMER])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Complete a direct-to-storage upload.
+    
+    Verifies the object in storage (HEAD: exists, size within limits,
+    expected content type). Only completed uploads can be attached to a job.
+    Calling it again for a completed upload returns the same result.
+    """
+    uploaded_file = (await db.execute(
+        select(UploadedFile).where(
+            UploadedFile.uuid == upload_uuid,
+            UploadedFile.user_id == current_user.id
+        )
+    )).scalars().first()
+    
+    if uploaded_file is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    if uploaded_file.status != UploadStatus.COMPLETED.value:
+        try:
+            metadata = await get_file_metadata(uploaded_file.file_key)
+        except Exception as e:
+            logger.error(
+                f"Failed to verify upload {uploaded_file.file_key}",
+                exc_info=True
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to verify upload: {str(e)}"
+            )
+        
+        if metadata is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File has not been uploaded yet"
+            )
+        
+        size = metadata["size"] or 0
+        if size <= 0 or size > MAX_FILE_SIZE or metadata["content_type"] != uploaded_file.content_type:
+            # Storage enforces these through the POST policy; never keep a file that slipped through
+            await delete_file(uploaded_file.file_key)
+            await db.delete(uploaded_file)
+            await db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty, too large or has an unexpected content type"
+            )
+        
+        uploaded_file.size = size
+        uploaded_file.status = UploadStatus.COMPLETED.value
+        uploaded_file.completed_at = datetime.now(timezone.utc)
+        await db.commit()
+        background_tasks.add_task(generate_preview, uploaded_file.file_key)
+    
+    return UploadedFileResponse(
+        file_path=uploaded_file.file_key,
+        file_url=uploaded_file.file_key,
+        filename=uploaded_file.filename,
+        size=uploaded_file.size
+    )
+
+
+@router.post(
+    "/urls",
+    response_model=PresignedUrlBatchResponse,
+    status_code=status.HTTP_200_OK
+)
+async def get_download_urls(
+    request_data: PresignedUrlBatchRequest,
+    current_user: CurrentIdentity = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get presigned download URLs for several files in one request.
+    
+    Files are given by key and/or by the UUID of the job they are attached
+    to. Jobs follow the same visibility rules as GET /api/jobs/{job_uuid};
+    jobs that are not visible or have no file are left out.
+    
+    URLs are cached and shared between requests, so each one is valid for
+    a varying time (at least a few minutes); see expires_at.
+    """
+    for file_key in request_data.file_keys:
+        # Security: Validate file key format (should start with "users/")
+        if not file_key.startswith("users/"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid file path"
+            )
+    
+    job_files = []
+    if request_data.job_uuids:
+        query = select(PrintingJob.uuid, PrintingJob.file_url).where(
+            PrintingJob.uuid.in_(request_data.job_uuids),
+            PrintingJob.file_url.is_not(None)
+        )
+        user_role = UserRole(current_user.role)
+        if user_role == UserRole.CUSTOMER:
+            query = query.where(PrintingJob.customer_profile_id == current_user.customer_profile_id)
+        elif user_role == UserRole.PRINTER:
+            query = query.where(PrintingJob.state == JobState.OPEN.value)
+        job_files = (await db.execute(query)).all()
+    
+    file_keys = list(request_data.file_keys) + [row.file_url for row in job_files]
+    try:
+        urls = await generate_presigned_urls(file_keys)
+    except Exception as e:
+        logger.error(
+            f"Failed to presign {len(file_keys)} download URLs",
+            exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create download URLs: {str(e)}"
+        )
+    
+    return PresignedUrlBatchResponse(urls=[
+        PresignedUrlResponse(file_key=file_key, **urls[file_key])
+        for file_key in dict.fromkeys(request_data.file_keys)
+    ] + [
+        PresignedUrlResponse(file_key=row.file_url, job_uuid=str(row.uuid), **urls[row.file_url])
+        for row in job_files
+    ])
 
 
 @router.get(
@@ -129,8 +534,9 @@ async def upload_job_file(
 )
 async def get_file(
     file_key: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: CurrentIdentity = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Download an uploaded file.
@@ -138,7 +544,9 @@ async def get_file(
     Files are protected - users can only access files they uploaded
     or files associated with jobs they have access to.
     
-    Returns the file as a download with proper content type.
+    Returns the file as a download with proper content type. The content is
+    streamed from storage in chunks; a single-range Range header (e.g. to
+    resume a download) returns 206 Partial Content.
     """
     # Security: Validate file key format (should start with "users/")
     if not file_key.startswith("users/"):
@@ -147,34 +555,26 @@ async def get_file(
             detail="Invalid file path"
         )
     
-    # Check if file exists in storage
-    if not file_exists(file_key):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
     # For now, allow access if user is authenticated
     # In production, you might want to add more specific access control
     # (e.g., check if file belongs to user's job or if user is a printer viewing a job)
     
-    # Get file content from storage
+    # Multi-range and malformed Range headers are ignored: the whole file is sent
+    byte_range = range_header if range_header and SINGLE_BYTE_RANGE.match(range_header) else None
+    
     try:
-        file_content = get_file_content(file_key)
-        
-        # Extract filename from file_key (e.g., "users/2/uuid.pdf" -> "uuid.pdf")
-        filename = file_key.split('/')[-1]
-        
-        # Determine content type based on file extension
-        content_type = get_content_type(filename)
-        
-        # Return file as streaming response with download disposition
-        return StreamingResponse(
-            io.BytesIO(file_content),
-            media_type=content_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"'
-            }
+        stream = await open_file_stream(file_key, byte_range)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    except InvalidRangeError as e:
+        headers = {"Content-Range": f"bytes */{e.object_size}"} if e.object_size is not None else None
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers=headers
         )
     except Exception as e:
         logger.error(
@@ -185,4 +585,74 @@ async def get_file(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve file: {str(e)}"
         )
+    
+    # Extract filename from file_key (e.g., "users/2/uuid.pdf" -> "uuid.pdf")
+    filename = file_key.split('/')[-1]
+    
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+    }
+    if stream["content_length"] is not None:
+        headers["Content-Length"] = str(stream["content_length"])
+    if stream["content_range"]:
+        headers["Content-Range"] = stream["content_range"]
+    if stream["etag"]:
+        headers["ETag"] = stream["etag"]
+    if stream["last_modified"]:
+        headers["Last-Modified"] = format_datetime(stream["last_modified"], usegmt=True)
+    
+    # Chunks are read in the storage thread pool as the client consumes them
+    return StreamingResponse(
+        iter_file_chunks(stream["body"]),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if stream["content_range"] else status.HTTP_200_OK,
+        media_type=get_content_type(filename),
+        headers=headers
+    )
 
+
+@router.get(
+    "/previews/{file_key:path}"
+)
+async def get_file_preview(
+    file_key: str,
+    current_user: CurrentIdentity = Depends(get_current_user)
+):
+    """
+    Get the preview of an uploaded file: a JPEG of the image or of the
+    first PDF page, at most PREVIEW_MAX_SIZE pixels on each side.
+    
+    Previews are generated in the background after upload, so this returns
+    404 until the preview exists, and always for file types without
+    previews. A file's preview never changes, so responses may be cached
+    indefinitely.
+    """
+    # Security: Validate file key format (should start with "users/")
+    if not file_key.startswith("users/"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid file path"
+        )
+    
+    try:
+        content = await read_file(preview_key(file_key))
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Preview not available"
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to retrieve preview of {file_key} from storage",
+            exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve preview: {str(e)}"
+        )
+    
+    return Response(
+        content=content,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "private, max-age=31536000, immutable"}
+    )
@@ -6,7 +6,11 @@ import logging
 import sys
 from dotenv import load_dotenv
 
-from app.api import auth, profiles, jobs, uploads
+from app.api import auth, profiles, jobs, bids, uploads, admin
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.services.bidding_sweeper import BIDDING_SWEEPER_ENABLED, bidding_sweeper
+from app.services.previews import shutdown_previews
+from app.utils.storage import init_storage, shutdown_storage
 
 load_dotenv()
 
@@ -39,18 +43,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Register API routers
 app.include_router(auth.router)
 app.include_router(profiles.router)
 app.include_router(jobs.router)
+app.include_router(bids.router)
 app.include_router(uploads.router)
+app.include_router(admin.router)
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Printing Marketplace API starting up...")
     logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
+    await init_storage()
+    if BIDDING_SWEEPER_ENABLED:
+        bidding_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await bidding_sweeper.stop()
+    shutdown_previews()
+    shutdown_storage()
 
 
 @app.exception_handler(Exception)
@@ -7,6 +7,10 @@ from app.models.printing_job import PrintingJob
 from app.models.bid import Bid
 from app.models.agreement import Agreement
 from app.models.rating import Rating
+from app.models.printer_rating_summary import PrinterRatingSummary
+from app.models.job_match import JobMatch
+from app.models.revoked_token import RevokedToken
+from app.models.uploaded_file import UploadedFile
 
 __all__ = [
     # Models
@@ -17,4 +21,8 @@ __all__ = [
     "Bid",
     "Agreement",
     "Rating",
+    "PrinterRatingSummary",
+    "JobMatch",
+    "RevokedToken",
+    "UploadedFile",
 ]
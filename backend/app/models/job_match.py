@@ -0,0 +1,28 @@
+"""JobMatch model."""
+
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.persistence.database import Base
+
+
+class JobMatch(Base):
+    """
+    Materialized printer <-> job match.
+    
+    One row per (printer, OPEN job) pair that satisfies the matching rules.
+    Rows are added when a job is published, recomputed per printer when a
+    printer profile is saved, and pruned when a job leaves the OPEN state.
+    """
+    __tablename__ = "job_matches"
+    
+    # Primary key (printer_id, job_id) doubles as the per-printer range scan index
+    printer_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    job_id = Column(Integer, ForeignKey("printing_jobs.id", ondelete="CASCADE"), primary_key=True, index=True)
+    matched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Copy of printing_jobs.created_at so matches can be paged newest first from the index alone
+    job_created_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index('ix_job_matches_printer_id_job_created_at_job_id', 'printer_id', 'job_created_at', 'job_id'),
+    )
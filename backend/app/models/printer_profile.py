@@ -1,7 +1,7 @@
 """PrinterProfile model."""
 
-from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship, foreign
 from sqlalchemy.sql import func
 from app.persistence.database import Base
@@ -24,14 +24,14 @@ class PrinterProfile(Base):
     
     # Capabilities
     capabilities = Column(Text, nullable=True)  # JSON string or comma-separated
-    supported_product_types = Column(Text, nullable=False)  # JSON array of ProductType
+    supported_product_types = Column(JSONB, nullable=False)  # JSON array of ProductType values
     
     # Quantity ranges
     min_quantity = Column(Integer, nullable=True)
     max_quantity = Column(Integer, nullable=True)
     
     # Geography
-    service_areas = Column(Text, nullable=True)  # JSON array of locations/regions
+    service_areas = Column(JSONB, nullable=True)  # JSON array of locations/regions
     
     # Payment terms
     payment_terms = Column(Text, nullable=False)  # Payment terms description
@@ -53,4 +53,9 @@ class PrinterProfile(Base):
         viewonly=True
     )
     ratings = relationship("Rating", back_populates="printer_profile")
-
+    
+    __table_args__ = (
+        # GIN indexes for containment lookups (e.g. printers supporting a product type)
+        Index('ix_printer_profiles_supported_product_types', 'supported_product_types', postgresql_using='gin'),
+        Index('ix_printer_profiles_service_areas', 'service_areas', postgresql_using='gin'),
+    )
@@ -0,0 +1,93 @@
+"""PrinterRatingSummary model."""
+
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql import func
+from app.persistence.database import Base
+
+from app.models.rating import Rating
+
+STAR_COLUMNS = ("stars_1", "stars_2", "stars_3", "stars_4", "stars_5")
+
+
+class PrinterRatingSummary(Base):
+    """
+    Denormalized rating aggregates of one printer profile.
+
+    Kept in step with the ratings table by the Rating mapper events below,
+    which apply +1/-1 deltas in the same transaction as the rating write, so
+    ratings are never loaded to show a printer's average. Writes to ratings
+    that bypass the ORM (bulk UPDATE/DELETE) must apply the deltas themselves
+    with rating_summary_delta.
+    """
+    __tablename__ = "printer_rating_summaries"
+
+    printer_profile_id = Column(Integer, ForeignKey("printer_profiles.id", ondelete="CASCADE"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Histogram: number of 1..5 star ratings
+    stars_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    stars_5 = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+def rating_summary_delta(printer_profile_id: int, stars: int, sign: int):
+    """
+    Statement adding (sign=1) or removing (sign=-1) one rating of the given
+    stars to a printer's summary, creating the summary row if needed.
+    """
+    star_column = STAR_COLUMNS[stars - 1]
+    stmt = insert(PrinterRatingSummary).values(
+        printer_profile_id=printer_profile_id,
+        rating_count=sign,
+        rating_sum=sign * stars,
+        **{star_column: sign}
+    )
+    table = PrinterRatingSummary.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=[PrinterRatingSummary.printer_profile_id],
+        set_={
+            "rating_count": table.c.rating_count + sign,
+            "rating_sum": table.c.rating_sum + sign * stars,
+            star_column: table.c[star_column] + sign,
+            "updated_at": func.now(),
+        }
+    )
+
+
+def _committed_value(target: Rating, key: str):
+    """Value of an attribute as last flushed (before a pending change)."""
+    history = get_history(target, key)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, key)
+
+
+@event.listens_for(Rating, "after_insert")
+def _rating_inserted(mapper, connection, target: Rating) -> None:
+    connection.execute(rating_summary_delta(target.printer_profile_id, target.rating, 1))
+
+
+@event.listens_for(Rating, "after_update")
+def _rating_updated(mapper, connection, target: Rating) -> None:
+    old_profile_id = _committed_value(target, "printer_profile_id")
+    old_rating = _committed_value(target, "rating")
+    if old_profile_id == target.printer_profile_id and old_rating == target.rating:
+        return
+    connection.execute(rating_summary_delta(old_profile_id, old_rating, -1))
+    connection.execute(rating_summary_delta(target.printer_profile_id, target.rating, 1))
+
+
+@event.listens_for(Rating, "after_delete")
+def _rating_deleted(mapper, connection, target: Rating) -> None:
+    connection.execute(rating_summary_delta(
+        _committed_value(target, "printer_profile_id"),
+        _committed_value(target, "rating"),
+        -1
+    ))
@@ -1,6 +1,6 @@
 """PrintingJob model."""
 
-from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, ForeignKey, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -25,7 +25,7 @@ class PrintingJob(Base):
     special_instructions = Column(Text, nullable=True)
     
     # File upload (stored as URL/path - implementation TBD)
-    file_url = Column(String, nullable=True)
+    file_url = Column(String, nullable=True, index=True)  # Storage GC looks up references by key
     
     # Bidding
     bidding_duration_hours = Column(Integer, nullable=False, default=24)
@@ -52,5 +52,12 @@ class PrintingJob(Base):
     __table_args__ = (
         CheckConstraint('quantity > 0', name='quantity_positive'),
         CheckConstraint('bidding_duration_hours > 0', name='bidding_duration_positive'),
+        # Supports the printer matching query (state + product type + quantity range)
+        Index('ix_printing_jobs_state_product_type_quantity', 'state', 'product_type', 'quantity'),
+        # Keyset pagination on (created_at, id), per customer profile and per state
+        Index('ix_printing_jobs_customer_profile_id_created_at_id', 'customer_profile_id', 'created_at', 'id'),
+        Index('ix_printing_jobs_state_created_at_id', 'state', 'created_at', 'id'),
+        # Finding OPEN jobs whose bidding window ended, earliest first
+        Index('ix_printing_jobs_state_bidding_ends_at', 'state', 'bidding_ends_at'),
     )
 
@@ -0,0 +1,22 @@
+"""RevokedToken model."""
+
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy.sql import func
+from app.persistence.database import Base
+
+
+class RevokedToken(Base):
+    """
+    Access token revoked before its expiry (e.g. on logout).
+    
+    Rows are identified by the token's jti claim. Workers sync new
+    revocations incrementally by revoked_at; rows are irrelevant once
+    expires_at has passed.
+    """
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String, unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,51 @@
+"""UploadedFile model."""
+
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.persistence.database import Base
+import uuid as uuid_lib
+
+from app.utils.enums import UploadStatus
+
+
+class UploadedFile(Base):
+    """
+    A file in object storage uploaded by a user.
+    
+    Uploads through a presigned URL start PENDING and become COMPLETED once
+    the object has been verified in storage. Only COMPLETED uploads owned by
+    the user can be attached to a job (PrintingJob.file_url == file_key).
+    
+    Files streamed through the API record their SHA-256. A user's uploads
+    are deduplicated on it: uploading the same content again returns the
+    existing file, which any number of the user's jobs can reference.
+    
+    last_used_at is refreshed on every such reuse; storage GC only deletes
+    unreferenced uploads unused for its grace period.
+    """
+    __tablename__ = "uploaded_files"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    uuid = Column(UUID(as_uuid=False), unique=True, nullable=False, default=lambda: str(uuid_lib.uuid4()), index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Object storage key (e.g. "users/123/uuid.pdf")
+    file_key = Column(String, unique=True, nullable=False, index=True)
+    filename = Column(String, nullable=False)  # Original filename
+    content_type = Column(String, nullable=True)
+    size = Column(BigInteger, nullable=True)  # Known once COMPLETED
+    sha256 = Column(String(64), nullable=True)  # Hex digest; unknown for presigned uploads
+    
+    # Status
+    status = Column(String, nullable=False, default=UploadStatus.PENDING.value)  # Stores UploadStatus enum value as string
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        # One stored copy of each content per user
+        Index('ix_uploaded_files_user_id_sha256', 'user_id', 'sha256', unique=True),
+    )
@@ -1,9 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from app.persistence.pool import get_pool_options, instrument_pool
+
 load_dotenv()
 
 # Get database URL and fix postgres:// to postgresql://
@@ -11,15 +17,101 @@ database_url = os.getenv("DATABASE_URL", "")
 if database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Optional read replica for read-only endpoints
+replica_database_url = os.getenv("DATABASE_REPLICA_URL", "")
+if replica_database_url.startswith("postgres://"):
+    replica_database_url = replica_database_url.replace("postgres://", "postgresql://", 1)
+
+# After a user writes, their reads go to the primary for this long so they
+# see their own changes despite replication lag. The marker is kept in this
+# process only: a read served by another worker process or instance goes to
+# the replica and may miss the write. Run a single worker per instance with
+# sticky sessions, or point DATABASE_REPLICA_URL at the primary, where
+# read-your-writes must hold across processes.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+
+def get_async_database_url(url: str) -> str:
+    """Use async drivers for plain postgresql:// and sqlite:// URLs (Alembic keeps the sync driver)."""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+def create_engine_for(url: str, name: str):
+    """Create an async engine; pooled databases get the configured, instrumented pool."""
+    async_url = get_async_database_url(url)
+    if async_url.startswith("sqlite"):
+        return create_async_engine(async_url)
+    async_engine = create_async_engine(async_url, **get_pool_options(name))
+    instrument_pool(async_engine.sync_engine, name)
+    return async_engine
+
+
+class PrimarySession(Session):
+    """Session bound to the primary; commits start the committing user's read-your-writes window."""
+
+
+engine = create_engine_for(database_url, "primary")
+# expire_on_commit=False: attributes stay loaded after commit, since lazy
+# loading is not available on AsyncSession
+SessionLocal = async_sessionmaker(
+    engine, class_=AsyncSession, sync_session_class=PrimarySession, autoflush=False, expire_on_commit=False
+)
+
+replica_engine = create_engine_for(replica_database_url, "replica") if replica_database_url else None
+ReadSessionLocal = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    if replica_engine is not None else None
+)
+
 Base = declarative_base()
 
-def get_db():
+# user ID -> time.monotonic() until which the user's reads stay on the primary
+# (per process, see READ_YOUR_WRITES_SECONDS)
+_recent_writers: Dict[int, float] = {}
+_recent_writers_lock = threading.Lock()
+
+
+def mark_recent_write(user_id: int) -> None:
+    """Pin a user's reads to the primary for READ_YOUR_WRITES_SECONDS."""
+    now = time.monotonic()
+    with _recent_writers_lock:
+        _recent_writers[user_id] = now + READ_YOUR_WRITES_SECONDS
+        if len(_recent_writers) > 10000:
+            for expired in [uid for uid, until in _recent_writers.items() if until <= now]:
+                del _recent_writers[expired]
+
+
+def has_recent_write(user_id: int) -> bool:
+    """Check whether a user wrote within the read-your-writes window."""
+    until = _recent_writers.get(user_id)
+    return until is not None and until > time.monotonic()
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _mark_committing_user(session: Session) -> None:
+    # get_current_user records the authenticated user in session.info
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        mark_recent_write(user_id)
+
+
+async def get_db():
     """Dependency for FastAPI routes"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
+
+def get_read_sessionmaker(user_id: Optional[int] = None) -> async_sessionmaker:
+    """
+    Session factory for read-only work.
+
+    The replica when one is configured, unless the user wrote recently
+    through this process.
+    """
+    if ReadSessionLocal is None or (user_id is not None and has_recent_write(user_id)):
+        return SessionLocal
+    return ReadSessionLocal
@@ -0,0 +1,91 @@
+"""Connection pool configuration and instrumentation."""
+
+import os
+import time
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.metrics import metrics
+
+load_dotenv()
+
+# Pool settings (per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle connections before server-side / load balancer idle timeouts kill them
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+
+def get_pool_options(name: str) -> Dict[str, Any]:
+    """Keyword arguments for create_async_engine() on a pooled (non-SQLite) database."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_logging_name": name,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def connect(self):
+        name = self._orig_logging_name or "default"
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.counter(f"db_pool_{name}_checkout_timeouts").inc()
+            raise
+        finally:
+            metrics.summary(f"db_pool_{name}_checkout_wait_seconds").observe(time.perf_counter() - start)
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Count pool events of an engine under db_pool_<name>_* metric names."""
+    pool = engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.counter(f"db_pool_{name}_connects").inc()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.counter(f"db_pool_{name}_checkouts").inc()
+        if isinstance(pool, AsyncAdaptedQueuePool) and pool.overflow() > 0:
+            metrics.counter(f"db_pool_{name}_overflow_checkouts").inc()
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.counter(f"db_pool_{name}_invalidations").inc()
+
+    @event.listens_for(pool, "soft_invalidate")
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.counter(f"db_pool_{name}_invalidations").inc()
+
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """Current state of an engine's connection pool."""
+    pool = engine.pool
+    pool_status: Dict[str, Any] = {"class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        pool_status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "recycle": pool._recycle,
+            "pre_ping": pool._pre_ping,
+        })
+    return pool_status
@@ -10,6 +10,17 @@ from app.schemas.printing_job import (
     PrintingJobResponse,
     PrintingJobPublishRequest
 )
+from app.schemas.bid import BidSubmit, BidResponse, JobBidResponse
+from app.schemas.agreement import AgreementResponse
+from app.schemas.rating import RatingSummaryBatchRequest, RatingSummaryBatchResponse, RatingSummaryResponse
+from app.schemas.upload import (
+    PresignedUploadRequest,
+    PresignedUploadResponse,
+    PresignedUrlBatchRequest,
+    PresignedUrlBatchResponse,
+    PresignedUrlResponse,
+    UploadedFileResponse
+)
 
 __all__ = [
     # Auth schemas
@@ -31,5 +42,22 @@ __all__ = [
     "PrintingJobUpdate",
     "PrintingJobResponse",
     "PrintingJobPublishRequest",
+    # Bid schemas
+    "BidSubmit",
+    "BidResponse",
+    "JobBidResponse",
+    # Agreement schemas
+    "AgreementResponse",
+    # Rating schemas
+    "RatingSummaryBatchRequest",
+    "RatingSummaryBatchResponse",
+    "RatingSummaryResponse",
+    # Upload schemas
+    "PresignedUploadRequest",
+    "PresignedUploadResponse",
+    "PresignedUrlBatchRequest",
+    "PresignedUrlBatchResponse",
+    "PresignedUrlResponse",
+    "UploadedFileResponse",
 ]
 
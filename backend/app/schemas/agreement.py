@@ -0,0 +1,24 @@
+"""Pydantic schemas for Agreement."""
+
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel
+
+
+class AgreementResponse(BaseModel):
+    """Schema for agreement response."""
+    id: int
+    uuid: str
+    job_id: int
+    bid_id: int
+    customer_id: int
+    printer_id: int
+    agreed_price: Decimal
+    agreed_turnaround_days: int
+    payment_terms: str
+    customer_confirmed: bool
+    confirmation_timestamp: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,41 @@
+"""Pydantic schemas for Bid."""
+
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from app.schemas.rating import RatingSummaryResponse
+
+
+class BidSubmit(BaseModel):
+    """Schema for submitting or updating a bid (payment terms come from the printer profile)."""
+    price: Decimal = Field(gt=0, max_digits=10, decimal_places=2, description="Price must be greater than 0")
+    estimated_turnaround_days: int = Field(ge=0, description="Estimated turnaround in days")
+    notes: Optional[str] = None
+
+
+class BidResponse(BaseModel):
+    """Schema for bid response."""
+    id: int
+    uuid: str
+    job_id: int
+    printer_id: int
+    price: Decimal
+    estimated_turnaround_days: int
+    notes: Optional[str]
+    payment_terms: str
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    accepted_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class JobBidResponse(BidResponse):
+    """Bid in a job's bid list, with the printer's business name and rating."""
+    printer_profile_uuid: str
+    printer_business_name: str
+    printer_rating: RatingSummaryResponse
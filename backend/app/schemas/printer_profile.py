@@ -1,9 +1,12 @@
 """Printer profile-related Pydantic schemas."""
 
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+import json
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import List, Optional
 from datetime import datetime
 
+from app.utils.enums import ProductType
+
 
 class PrinterProfileCreate(BaseModel):
     """Schema for creating/updating printer profile."""
@@ -13,15 +16,28 @@ class PrinterProfileCreate(BaseModel):
     email: Optional[EmailStr] = None
     address: Optional[str] = None
     capabilities: Optional[str] = None
-    supported_product_types: str = Field(..., description="JSON array of ProductType enum values")
+    supported_product_types: List[ProductType] = Field(..., description="List of ProductType enum values")
     min_quantity: Optional[int] = Field(None, ge=1)
     max_quantity: Optional[int] = Field(None, ge=1)
-    service_areas: Optional[str] = Field(None, description="JSON array of locations/regions")
+    service_areas: Optional[List[str]] = Field(None, description="List of locations/regions")
     payment_terms: str = Field(..., min_length=1)
     email_notifications: bool = True
     whatsapp_notifications: bool = False
     whatsapp_number: Optional[str] = None
 
+    @field_validator('supported_product_types', 'service_areas', mode='before')
+    @classmethod
+    def parse_json_array(cls, v):
+        """Accept the legacy format: a JSON array encoded as a string."""
+        if isinstance(v, str):
+            try:
+                v = json.loads(v)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"must be a JSON array: {str(e)}")
+            if not isinstance(v, list):
+                raise ValueError("must be a JSON array")
+        return v
+
 
 class PrinterProfileResponse(BaseModel):
     """Response schema for printer profile."""
@@ -33,10 +49,10 @@ class PrinterProfileResponse(BaseModel):
     email: Optional[str]
     address: Optional[str]
     capabilities: Optional[str]
-    supported_product_types: str
+    supported_product_types: List[str]
     min_quantity: Optional[int]
     max_quantity: Optional[int]
-    service_areas: Optional[str]
+    service_areas: Optional[List[str]]
     payment_terms: str
     email_notifications: bool
     whatsapp_notifications: bool
@@ -0,0 +1,25 @@
+"""Pydantic schemas for printer ratings."""
+
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+# Maximum number of printer profiles in one batch
+MAX_RATING_SUMMARY_BATCH_SIZE = 100
+
+
+class RatingSummaryBatchRequest(BaseModel):
+    """Request schema for rating summaries of several printers."""
+    printer_profile_uuids: List[str] = Field(min_length=1, max_length=MAX_RATING_SUMMARY_BATCH_SIZE)
+
+
+class RatingSummaryResponse(BaseModel):
+    """Rating aggregates of a printer; average_rating is None without ratings."""
+    printer_profile_uuid: str
+    rating_count: int
+    average_rating: Optional[float]
+    stars: Dict[int, int] = Field(description="Number of ratings per star value (1-5)")
+
+
+class RatingSummaryBatchResponse(BaseModel):
+    """Response schema for a batch of rating summaries."""
+    summaries: List[RatingSummaryResponse]
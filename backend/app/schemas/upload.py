@@ -0,0 +1,55 @@
+"""Pydantic schemas for file uploads."""
+
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+# Maximum number of file keys plus job UUIDs in one batch
+MAX_PRESIGNED_URL_BATCH_SIZE = 100
+
+
+class PresignedUploadRequest(BaseModel):
+    """Request schema for a direct-to-storage upload."""
+    filename: str = Field(min_length=1)
+    size: Optional[int] = Field(default=None, gt=0, description="Expected size in bytes")
+
+
+class PresignedUploadResponse(BaseModel):
+    """
+    Presigned POST for uploading a file directly to storage.
+    
+    The client POSTs a multipart form to url with all fields plus the file
+    (as the last field named "file"), then calls the completion endpoint.
+    """
+    upload_uuid: str
+    file_key: str
+    url: str
+    fields: Dict[str, str]
+    expires_in: int
+
+
+class UploadedFileResponse(BaseModel):
+    """Response schema for a completed upload; file_url is what jobs store."""
+    file_path: str
+    file_url: str
+    filename: str
+    size: int
+
+
+class PresignedUrlBatchRequest(BaseModel):
+    """Request schema for download URLs of several files."""
+    file_keys: List[str] = Field(default_factory=list, max_length=MAX_PRESIGNED_URL_BATCH_SIZE)
+    job_uuids: List[str] = Field(default_factory=list, max_length=MAX_PRESIGNED_URL_BATCH_SIZE)
+
+
+class PresignedUrlResponse(BaseModel):
+    """Download URL of a file; job_uuid is set when requested by job."""
+    file_key: str
+    url: str
+    expires_at: datetime
+    job_uuid: Optional[str] = None
+
+
+class PresignedUrlBatchResponse(BaseModel):
+    """Response schema for a batch of download URLs."""
+    urls: List[PresignedUrlResponse]
@@ -0,0 +1,318 @@
+"""Submission and acceptance of printer bids.
+
+Bids arrive in bursts just before a job's bidding window ends, many printers
+bidding on the same job within seconds. A bid is therefore created or
+updated with a single INSERT ... SELECT ... ON CONFLICT statement: the SELECT
+yields a row only if the job is OPEN and its window has not ended, and takes
+the printer's payment terms from its profile, so there is no read-then-write
+race and no retry on duplicate bids.
+
+The job row is share-locked by the statement, so a bid cannot land on a job
+that is being closed or accepted at the same moment: whichever commits first
+wins, and the other sees the new state.
+
+Accepting a bid touches every bid on the job, so it is done with a fixed
+number of set-based statements in one transaction (see accept_bid) rather
+than one ORM update per bid.
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, exists, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.agreement import Agreement
+from app.models.bid import Bid
+from app.models.printer_profile import PrinterProfile
+from app.models.printer_rating_summary import PrinterRatingSummary
+from app.models.printing_job import PrintingJob
+from app.schemas.bid import BidSubmit, JobBidResponse
+from app.services.matching import prune_job_matches
+from app.services.open_job_index import open_job_index
+from app.services.rating_summaries import RATING_SUMMARY_COLUMNS, rating_summary_response
+from app.utils.enums import BidStatus, JobState
+from app.utils.metrics import metrics
+
+
+@dataclass
+class BidSubmission:
+    """Outcome of submit_bid."""
+    bid: Row
+    created: bool
+
+
+def bid_upsert_statement(job_uuid: str, printer_id: int, bid_data: BidSubmit):
+    """
+    Build the statement that creates or updates a printer's bid on a job.
+
+    Returns no row if the job is not OPEN, its bidding window has ended, the
+    printer has no profile, or the existing bid is no longer OPEN.
+    """
+    source = (
+        select(
+            PrintingJob.id,
+            literal(printer_id),
+            literal(bid_data.price, Bid.price.type),
+            literal(bid_data.estimated_turnaround_days),
+            literal(bid_data.notes, Bid.notes.type),
+            PrinterProfile.payment_terms,
+            literal(BidStatus.OPEN.value)
+        )
+        .join(PrinterProfile, PrinterProfile.user_id == printer_id)
+        .where(
+            PrintingJob.uuid == job_uuid,
+            PrintingJob.state == JobState.OPEN.value,
+            PrintingJob.bidding_ends_at > func.now()
+        )
+        .with_for_update(read=True, of=PrintingJob)
+    )
+    stmt = insert(Bid).from_select(
+        ["job_id", "printer_id", "price", "estimated_turnaround_days", "notes", "payment_terms", "status"],
+        source
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[Bid.job_id, Bid.printer_id],
+        set_={
+            "price": stmt.excluded.price,
+            "estimated_turnaround_days": stmt.excluded.estimated_turnaround_days,
+            "notes": stmt.excluded.notes,
+            "payment_terms": stmt.excluded.payment_terms,
+            "updated_at": func.now(),
+        },
+        where=Bid.status == BidStatus.OPEN.value
+    ).returning(*Bid.__table__.columns)
+
+
+async def _rejection(db: AsyncSession, job_uuid: str, printer_id: int) -> HTTPException:
+    """Explain why the upsert wrote nothing (only read on this failure path)."""
+    has_profile = (await db.execute(
+        select(PrinterProfile.id).where(PrinterProfile.user_id == printer_id)
+    )).first() is not None
+    if not has_profile:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Printer profile not found. Please create your profile first."
+        )
+
+    job = (await db.execute(
+        select(PrintingJob.state).where(PrintingJob.uuid == job_uuid)
+    )).first()
+    if job is None or job.state == JobState.DRAFT.value:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job.state != JobState.OPEN.value:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bidding on this job is closed"
+        )
+
+    bid_status = (await db.execute(
+        select(Bid.status)
+        .join(PrintingJob, PrintingJob.id == Bid.job_id)
+        .where(PrintingJob.uuid == job_uuid, Bid.printer_id == printer_id)
+    )).scalar()
+    if bid_status is not None and bid_status != BidStatus.OPEN.value:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Bid cannot be changed in {bid_status} status"
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Bidding on this job is closed"
+    )
+
+
+async def submit_bid(
+    db: AsyncSession,
+    job_uuid: str,
+    printer_id: int,
+    bid_data: BidSubmit
+) -> BidSubmission:
+    """
+    Create or update a printer's bid on an OPEN job, and commit.
+
+    Raises:
+        HTTPException: 404 if the job or printer profile does not exist,
+            409 if bidding on the job is closed or the bid is no longer OPEN
+    """
+    bid = (await db.execute(bid_upsert_statement(job_uuid, printer_id, bid_data))).first()
+    if bid is None:
+        await db.rollback()
+        metrics.counter("bids_rejected").inc()
+        raise await _rejection(db, job_uuid, printer_id)
+
+    await db.commit()
+    # updated_at is only set by the ON CONFLICT branch
+    created = bid.updated_at is None
+    metrics.counter("bids_created" if created else "bids_updated").inc()
+    return BidSubmission(bid=bid, created=created)
+
+
+async def list_job_bids(db: AsyncSession, job_id: int) -> List[JobBidResponse]:
+    """
+    Get all bids on a job, cheapest first, with each printer's profile and
+    rating summary.
+
+    One query whatever the number of bids: bids joined to printer profiles
+    and outer-joined to rating summaries, instead of lazy loading the
+    profile of every bid.
+    """
+    rows = (await db.execute(
+        select(
+            *Bid.__table__.columns,
+            PrinterProfile.uuid.label("printer_profile_uuid"),
+            PrinterProfile.business_name.label("printer_business_name"),
+            *RATING_SUMMARY_COLUMNS
+        )
+        .join(PrinterProfile, PrinterProfile.user_id == Bid.printer_id)
+        .outerjoin(PrinterRatingSummary, PrinterRatingSummary.printer_profile_id == PrinterProfile.id)
+        .where(Bid.job_id == job_id)
+        .order_by(Bid.price, Bid.created_at, Bid.id)
+    )).all()
+    return [
+        JobBidResponse(
+            **{column.key: getattr(row, column.key) for column in Bid.__table__.columns},
+            printer_profile_uuid=row.printer_profile_uuid,
+            printer_business_name=row.printer_business_name,
+            printer_rating=rating_summary_response(row.printer_profile_uuid, row)
+        )
+        for row in rows
+    ]
+
+
+# Job states in which the customer can accept a bid (early, or after bidding ended)
+ACCEPTING_JOB_STATES = (JobState.OPEN.value, JobState.CLOSED.value)
+
+
+async def _accept_rejection(
+    db: AsyncSession,
+    job_uuid: str,
+    bid_uuid: str,
+    customer_profile_id: int
+) -> HTTPException:
+    """Explain why the guarded job update matched nothing (only read on this failure path)."""
+    job = (await db.execute(
+        select(PrintingJob.id, PrintingJob.state).where(
+            PrintingJob.uuid == job_uuid,
+            PrintingJob.customer_profile_id == customer_profile_id
+        )
+    )).first()
+    if job is None:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job.state not in ACCEPTING_JOB_STATES:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot accept a bid on a job in {job.state} state"
+        )
+
+    bid_status = (await db.execute(
+        select(Bid.status).where(Bid.uuid == bid_uuid, Bid.job_id == job.id)
+    )).scalar()
+    if bid_status is None:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bid not found"
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Cannot accept a bid in {bid_status} status"
+    )
+
+
+async def accept_bid(
+    db: AsyncSession,
+    job_uuid: str,
+    bid_uuid: str,
+    customer_id: int,
+    customer_profile_id: int
+) -> Row:
+    """
+    Accept a bid on the customer's job, and commit.
+
+    In one transaction, with four statements whatever the number of bids:
+    the job moves to IN_PROGRESS, the bid becomes ACCEPTED and every other
+    OPEN bid LOST, the Agreement is inserted from the accepted bid, and the
+    job's matches are pruned.
+
+    The job update is guarded by the job's state and the bid being OPEN,
+    and it is the first row locked, like in bid submission and the bidding
+    sweeper. A concurrent accept of the same job waits for that row only,
+    then matches nothing and gets a 409; no deadlock is possible.
+
+    Returns:
+        The inserted agreements row
+
+    Raises:
+        HTTPException: 404 if the job or bid does not exist, 409 if the job
+            no longer accepts bids or the bid is not OPEN
+    """
+    job_id = (await db.execute(
+        update(PrintingJob)
+        .where(
+            PrintingJob.uuid == job_uuid,
+            PrintingJob.customer_profile_id == customer_profile_id,
+            PrintingJob.state.in_(ACCEPTING_JOB_STATES),
+            exists().where(
+                Bid.job_id == PrintingJob.id,
+                Bid.uuid == bid_uuid,
+                Bid.status == BidStatus.OPEN.value
+            )
+        )
+        .values(
+            state=JobState.IN_PROGRESS.value,
+            closed_at=func.coalesce(PrintingJob.closed_at, func.now())
+        )
+        .returning(PrintingJob.id)
+        .execution_options(synchronize_session=False)
+    )).scalar()
+    if job_id is None:
+        await db.rollback()
+        metrics.counter("bid_accepts_rejected").inc()
+        raise await _accept_rejection(db, job_uuid, bid_uuid, customer_profile_id)
+
+    accepted = Bid.uuid == bid_uuid
+    await db.execute(
+        update(Bid)
+        .where(Bid.job_id == job_id, Bid.status == BidStatus.OPEN.value)
+        .values(
+            status=case((accepted, BidStatus.ACCEPTED.value), else_=BidStatus.LOST.value),
+            accepted_at=case((accepted, func.now()), else_=None),
+            updated_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    agreement = (await db.execute(
+        insert(Agreement).from_select(
+            [
+                "job_id", "bid_id", "customer_id", "printer_id", "agreed_price",
+                "agreed_turnaround_days", "payment_terms", "customer_confirmed", "confirmation_timestamp"
+            ],
+            select(
+                Bid.job_id,
+                Bid.id,
+                literal(customer_id),
+                Bid.printer_id,
+                Bid.price,
+                Bid.estimated_turnaround_days,
+                Bid.payment_terms,
+                true(),
+                func.now()
+            ).where(Bid.job_id == job_id, Bid.uuid == bid_uuid)
+        ).returning(*Agreement.__table__.columns)
+    )).first()
+
+    await prune_job_matches(db, [job_id])
+    await db.commit()
+    open_job_index.discard([job_id])
+    metrics.counter("bids_accepted").inc()
+    return agreement
@@ -0,0 +1,149 @@
+"""Closing of OPEN jobs whose bidding window has ended.
+
+A background task (started with the app) moves expired OPEN jobs to CLOSED
+in batches, one UPDATE per batch, and prunes their job matches. Between
+sweeps it sleeps until the earliest bidding deadline, capped at
+BIDDING_SWEEPER_MAX_SLEEP_SECONDS so that jobs published by other worker
+processes are picked up too; publishing a job in this process wakes it
+early.
+
+Batches lock their jobs with FOR UPDATE SKIP LOCKED, so sweepers in several
+workers can run at once without blocking each other or closing a job twice.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, select, update
+
+from app.models.printing_job import PrintingJob
+from app.persistence.database import SessionLocal
+from app.services.matching import prune_job_matches
+from app.services.open_job_index import open_job_index
+from app.utils.enums import JobState
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BIDDING_SWEEPER_ENABLED = os.getenv("BIDDING_SWEEPER_ENABLED", "true").lower() == "true"
+BIDDING_SWEEPER_BATCH_SIZE = int(os.getenv("BIDDING_SWEEPER_BATCH_SIZE", "500"))
+BIDDING_SWEEPER_MAX_SLEEP_SECONDS = float(os.getenv("BIDDING_SWEEPER_MAX_SLEEP_SECONDS", "300"))
+# Lower bound on sleeps, so deadlines held by another worker's batch don't cause a busy loop
+BIDDING_SWEEPER_MIN_SLEEP_SECONDS = 1.0
+BIDDING_SWEEPER_RETRY_SECONDS = 30.0
+
+
+async def close_expired_jobs_batch(batch_size: int = BIDDING_SWEEPER_BATCH_SIZE) -> List[int]:
+    """
+    Close up to batch_size OPEN jobs whose bidding window has ended.
+
+    Returns:
+        IDs of the closed jobs
+    """
+    expired = (
+        select(PrintingJob.id)
+        .where(
+            PrintingJob.state == JobState.OPEN.value,
+            PrintingJob.bidding_ends_at <= func.now()
+        )
+        .order_by(PrintingJob.bidding_ends_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    async with SessionLocal() as db:
+        job_ids = (await db.execute(
+            update(PrintingJob)
+            .where(
+                PrintingJob.id.in_(expired.scalar_subquery()),
+                PrintingJob.state == JobState.OPEN.value
+            )
+            .values(state=JobState.CLOSED.value, closed_at=func.now())
+            .returning(PrintingJob.id)
+            .execution_options(synchronize_session=False)
+        )).scalars().all()
+        await prune_job_matches(db, job_ids)
+        await db.commit()
+    open_job_index.discard(job_ids)
+    return list(job_ids)
+
+
+async def next_bidding_deadline() -> Optional[datetime]:
+    """Get the earliest bidding_ends_at of the OPEN jobs, if any."""
+    async with SessionLocal() as db:
+        deadline = (await db.execute(
+            select(func.min(PrintingJob.bidding_ends_at))
+            .where(PrintingJob.state == JobState.OPEN.value)
+        )).scalar()
+    if deadline is not None and deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline
+
+
+class BiddingSweeper:
+    """Background task closing expired OPEN jobs (one per worker process)."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="bidding-sweeper")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self) -> None:
+        """Recompute the next deadline now (e.g. after a job was published)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def sweep(self) -> int:
+        """Close all expired jobs, batch by batch. Returns the number closed."""
+        closed = 0
+        while True:
+            job_ids = await close_expired_jobs_batch()
+            closed += len(job_ids)
+            if len(job_ids) < BIDDING_SWEEPER_BATCH_SIZE:
+                break
+        if closed:
+            metrics.counter("bidding_sweeper_closed_jobs").inc(closed)
+            logger.info(f"Closed {closed} jobs whose bidding window ended")
+        return closed
+
+    async def _sleep_seconds(self) -> float:
+        deadline = await next_bidding_deadline()
+        if deadline is None:
+            return BIDDING_SWEEPER_MAX_SLEEP_SECONDS
+        seconds = (deadline - datetime.now(timezone.utc)).total_seconds()
+        return min(max(seconds, BIDDING_SWEEPER_MIN_SLEEP_SECONDS), BIDDING_SWEEPER_MAX_SLEEP_SECONDS)
+
+    async def _run(self) -> None:
+        while True:
+            # Cleared before reading deadlines, so a publish during the sweep still wakes us
+            self._wake.clear()
+            try:
+                await self.sweep()
+                timeout = await self._sleep_seconds()
+            except Exception:
+                metrics.counter("bidding_sweeper_errors").inc()
+                logger.error("Bidding sweeper failed", exc_info=True)
+                timeout = BIDDING_SWEEPER_RETRY_SECONDS
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+bidding_sweeper = BiddingSweeper()
@@ -0,0 +1,78 @@
+"""Cached identity of authenticated users.
+
+Most routes only need a user's id, role and customer profile, so those are
+cached per user ID instead of loading the users row on every request.
+Entries are invalidated when they change (explicitly by the routes after
+commit, and by the User mapper events below for any other ORM write) and
+expire after IDENTITY_CACHE_TTL_SECONDS, which bounds staleness across worker
+processes.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import get_history
+
+from app.models.user import User
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "60"))
+IDENTITY_CACHE_MAX_SIZE = int(os.getenv("IDENTITY_CACHE_MAX_SIZE", "10000"))
+
+# User columns copied into CurrentIdentity
+CACHED_USER_FIELDS = ("role", "customer_profile_id")
+
+
+@dataclass(frozen=True)
+class CurrentIdentity:
+    """The authenticated user, as needed for authorization and scoping."""
+    id: int
+    role: str
+    customer_profile_id: Optional[int]
+
+
+identity_cache = TTLCache(maxsize=IDENTITY_CACHE_MAX_SIZE, ttl=IDENTITY_CACHE_TTL_SECONDS)
+
+
+async def get_identity(db: AsyncSession, user_id: int) -> Optional[CurrentIdentity]:
+    """
+    Get a user's identity, from the cache or the database.
+
+    Returns:
+        The identity, or None if the user does not exist
+    """
+    identity = identity_cache.get(user_id)
+    if identity is not None:
+        metrics.counter("identity_cache_hits").inc()
+        return identity
+
+    metrics.counter("identity_cache_misses").inc()
+    row = (await db.execute(
+        select(User.id, User.role, User.customer_profile_id).where(User.id == user_id)
+    )).first()
+    if row is None:
+        return None
+
+    identity = CurrentIdentity(id=row.id, role=row.role, customer_profile_id=row.customer_profile_id)
+    identity_cache.set(user_id, identity)
+    return identity
+
+
+def invalidate_identity(user_id: int) -> None:
+    """Drop a user's cached identity after their role or customer profile changed."""
+    identity_cache.delete(user_id)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    if any(get_history(target, key).has_changes() for key in CACHED_USER_FIELDS):
+        invalidate_identity(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    invalidate_identity(target.id)
@@ -0,0 +1,186 @@
+"""Matching of OPEN printing jobs against printer profiles.
+
+The matching rules (product type, quantity range, geography) are expressed
+as SQL predicates so that Postgres does the filtering. Matches are
+materialized in the job_matches table: rows are added when a job is
+published, recomputed for one printer when its profile is saved, and pruned
+when a job leaves the OPEN state.
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, delete, false, func, literal, or_, select, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.job_match import JobMatch
+from app.models.printing_job import PrintingJob
+from app.models.printer_profile import PrinterProfile
+from app.utils.enums import JobState
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_location(value: Optional[str]) -> str:
+    """
+    Normalize a free-text location to lowercase alphanumeric tokens.
+
+    "Tel-Aviv,  Israel" -> "tel aviv israel"
+    """
+    if not value:
+        return ""
+    return " ".join(_TOKEN_RE.findall(value.lower()))
+
+
+def locations_overlap(location: str, area: str) -> bool:
+    """
+    Check whether two normalized locations overlap.
+
+    They overlap when the tokens of one appear as a contiguous run in the
+    other, e.g. "tel aviv" overlaps "tel aviv israel" but "york" does not
+    overlap "yorkshire".
+    """
+    if not location or not area:
+        return False
+    padded_location = f" {location} "
+    padded_area = f" {area} "
+    return padded_area in padded_location or padded_location in padded_area
+
+
+def _normalize_location_sql(column: ColumnElement) -> ColumnElement:
+    """SQL equivalent of normalize_location()."""
+    return func.btrim(func.regexp_replace(func.lower(column), "[^[:alnum:]]+", " ", "g"))
+
+
+def normalized_location_sql(column: ColumnElement) -> ColumnElement:
+    """SQL equivalent of normalize_location(), padded with a space on each side."""
+    return func.concat(" ", _normalize_location_sql(column), " ")
+
+
+def printer_job_filters(printer_profile: PrinterProfile) -> List[ColumnElement]:
+    """
+    Build the WHERE clauses selecting OPEN jobs that match a printer profile.
+
+    Same rules as job_matches_printer:
+    - Product type (job.product_type in printer.supported_product_types)
+    - Quantity range (job.quantity within printer.min_quantity and max_quantity)
+    - Geography (job.delivery_location overlaps printer.service_areas, if both are set)
+    """
+    supported_types = printer_profile.supported_product_types
+    if not isinstance(supported_types, list) or not supported_types:
+        return [false()]
+
+    filters = [
+        PrintingJob.state == JobState.OPEN.value,
+        PrintingJob.product_type.in_(supported_types),
+    ]
+
+    if printer_profile.min_quantity is not None:
+        filters.append(PrintingJob.quantity >= printer_profile.min_quantity)
+    if printer_profile.max_quantity is not None:
+        filters.append(PrintingJob.quantity <= printer_profile.max_quantity)
+
+    service_areas = printer_profile.service_areas
+    if isinstance(service_areas, list) and service_areas:
+        job_location = normalized_location_sql(PrintingJob.delivery_location)
+        overlaps = []
+        for area in service_areas:
+            if not isinstance(area, str):
+                continue
+            normalized_area = normalize_location(area)
+            if not normalized_area:
+                continue
+            padded_area = f" {normalized_area} "
+            overlaps.append(func.strpos(job_location, padded_area) > 0)
+            overlaps.append(func.strpos(padded_area, job_location) > 0)
+        filters.append(or_(
+            PrintingJob.delivery_location.is_(None),
+            PrintingJob.delivery_location == "",
+            *overlaps
+        ))
+
+    return filters
+
+
+def job_printer_filters(job: PrintingJob) -> List[ColumnElement]:
+    """
+    Build the WHERE clauses selecting printer profiles that match a job.
+
+    Mirror image of printer_job_filters(); the product type check is a JSONB
+    containment test that can use the GIN index on supported_product_types.
+    """
+    filters = [
+        PrinterProfile.supported_product_types.contains([job.product_type]),
+        or_(PrinterProfile.min_quantity.is_(None), PrinterProfile.min_quantity <= job.quantity),
+        or_(PrinterProfile.max_quantity.is_(None), PrinterProfile.max_quantity >= job.quantity),
+    ]
+
+    if job.delivery_location:
+        job_location = normalize_location(job.delivery_location)
+        areas = func.jsonb_array_elements_text(PrinterProfile.service_areas).table_valued("value").alias("area")
+        area_location = _normalize_location_sql(areas.c.value)
+        if job_location:
+            padded_location = f" {job_location} "
+            padded_area = func.concat(" ", area_location, " ")
+            area_overlaps = select(literal(1)).select_from(areas).where(
+                area_location != "",
+                or_(
+                    func.strpos(padded_location, padded_area) > 0,
+                    func.strpos(padded_area, padded_location) > 0
+                )
+            ).exists()
+        else:
+            area_overlaps = false()
+        # Printers without service areas match any location
+        filters.append(case(
+            (PrinterProfile.service_areas.is_(None), true()),
+            (func.jsonb_typeof(PrinterProfile.service_areas) != "array", true()),
+            (func.jsonb_array_length(PrinterProfile.service_areas) == 0, true()),
+            else_=area_overlaps
+        ))
+
+    return filters
+
+
+async def add_job_matches(db: AsyncSession, job: PrintingJob) -> List[int]:
+    """
+    Materialize matches for a newly OPEN job.
+
+    Returns:
+        User IDs of the printers that match the job
+    """
+    result = await db.execute(
+        insert(JobMatch).from_select(
+            ["printer_id", "job_id", "job_created_at"],
+            select(
+                PrinterProfile.user_id,
+                literal(job.id),
+                literal(job.created_at, PrintingJob.created_at.type)
+            ).where(*job_printer_filters(job))
+        ).on_conflict_do_nothing().returning(JobMatch.printer_id)
+    )
+    return [row.printer_id for row in result]
+
+
+async def rebuild_printer_matches(db: AsyncSession, printer_profile: PrinterProfile) -> None:
+    """Recompute all matches for one printer after its profile changed."""
+    await db.execute(delete(JobMatch).where(JobMatch.printer_id == printer_profile.user_id))
+    await db.execute(
+        insert(JobMatch).from_select(
+            ["printer_id", "job_id", "job_created_at"],
+            select(
+                literal(printer_profile.user_id),
+                PrintingJob.id,
+                PrintingJob.created_at
+            ).where(*printer_job_filters(printer_profile))
+        ).on_conflict_do_nothing()
+    )
+
+
+async def prune_job_matches(db: AsyncSession, job_ids: Iterable[int]) -> None:
+    """Remove matches for jobs that left the OPEN state."""
+    job_ids = list(job_ids)
+    if job_ids:
+        await db.execute(delete(JobMatch).where(JobMatch.job_id.in_(job_ids)))
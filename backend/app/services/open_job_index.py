@@ -0,0 +1,316 @@
+"""Columnar in-process snapshot of OPEN jobs.
+
+Keeps every OPEN job's matching-relevant fields in parallel NumPy arrays so
+that a printer profile can be evaluated against all of them with a handful
+of vectorized operations instead of one Python call per job.
+
+The job_matches table (see app.services.matching) is the default source of
+a printer's matching jobs. With MATCHING_ENGINE=columnar, get_matching_jobs
+evaluates the profile against this snapshot instead, so the job feed does
+not depend on matches having been materialized (e.g. for jobs imported
+without going through publish_job); job_matches is still maintained.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.printer_profile import PrinterProfile
+from app.models.printing_job import PrintingJob
+from app.services.matching import normalize_location, locations_overlap
+from app.utils.enums import JobState, ProductType
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# "table" (job_matches) or "columnar" (this snapshot)
+MATCHING_ENGINE = os.getenv("MATCHING_ENGINE", "table")
+if MATCHING_ENGINE not in ("table", "columnar"):
+    raise ValueError(f"Unknown MATCHING_ENGINE: {MATCHING_ENGINE}")
+
+# Re-read the OPEN job set from the database at least this often so that
+# changes made by other workers become visible.
+SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("MATCHING_SNAPSHOT_MAX_AGE_SECONDS", "30"))
+
+PRODUCT_TYPE_CODES: Dict[str, int] = {pt.value: code for code, pt in enumerate(ProductType)}
+UNKNOWN_PRODUCT_TYPE = -1
+
+_INITIAL_CAPACITY = 1024
+
+
+def _to_datetime64(value: Optional[datetime]) -> np.datetime64:
+    if value is None:
+        return np.datetime64("NaT", "us")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+class OpenJobIndex:
+    """
+    Columnar snapshot of OPEN jobs.
+
+    Each job occupies one slot across parallel arrays (id, product type code,
+    quantity, location code, created_at). Locations are dictionary-encoded:
+    every distinct normalized location gets an integer code, with code 0
+    reserved for "no location". Removed jobs leave a dead slot behind that is
+    reclaimed on the next compaction.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._reset(_INITIAL_CAPACITY)
+
+    def _reset(self, capacity: int) -> None:
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._product_codes = np.zeros(capacity, dtype=np.int16)
+        self._quantities = np.zeros(capacity, dtype=np.int64)
+        self._location_codes = np.zeros(capacity, dtype=np.int32)
+        self._created_at = np.full(capacity, np.datetime64("NaT", "us"), dtype="datetime64[us]")
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._slots: Dict[int, int] = {}
+        self._locations: List[str] = [""]
+        self._location_codes_by_value: Dict[str, int] = {}
+        # token -> codes of the locations containing it, and the number of
+        # distinct tokens of each location
+        self._location_codes_by_token: Dict[str, List[int]] = {}
+        self._location_token_counts: List[int] = [0]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _grow(self, capacity: int) -> None:
+        for name in ("_ids", "_product_codes", "_quantities", "_location_codes", "_created_at", "_alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            if name == "_created_at":
+                grown[:] = np.datetime64("NaT", "us")
+            grown[: self._size] = column[: self._size]
+            setattr(self, name, grown)
+
+    def _compact(self) -> None:
+        live = np.flatnonzero(self._alive[: self._size])
+        for name in ("_ids", "_product_codes", "_quantities", "_location_codes", "_created_at", "_alive"):
+            column = getattr(self, name)
+            column[: len(live)] = column[live]
+        self._alive[len(live): self._size] = False
+        self._size = len(live)
+        self._slots = {int(job_id): slot for slot, job_id in enumerate(self._ids[: self._size])}
+
+    def _location_code(self, delivery_location: Optional[str]) -> int:
+        if not delivery_location:
+            return 0
+        # A location without any token (e.g. "-") gets a code of its own:
+        # unlike no location, it matches no service area
+        normalized = normalize_location(delivery_location)
+        code = self._location_codes_by_value.get(normalized)
+        if code is None:
+            code = len(self._locations)
+            self._locations.append(normalized)
+            self._location_codes_by_value[normalized] = code
+            tokens = set(normalized.split())
+            for token in tokens:
+                self._location_codes_by_token.setdefault(token, []).append(code)
+            self._location_token_counts.append(len(tokens))
+        return code
+
+    def _write(self, slot: int, job_id: int, product_type: str, quantity: int,
+               delivery_location: Optional[str], created_at: Optional[datetime]) -> None:
+        self._ids[slot] = job_id
+        self._product_codes[slot] = PRODUCT_TYPE_CODES.get(product_type, UNKNOWN_PRODUCT_TYPE)
+        self._quantities[slot] = quantity
+        self._location_codes[slot] = self._location_code(delivery_location)
+        self._created_at[slot] = _to_datetime64(created_at)
+        self._alive[slot] = True
+
+    def _upsert(self, job_id: int, product_type: str, quantity: int,
+                delivery_location: Optional[str], created_at: Optional[datetime]) -> None:
+        slot = self._slots.get(job_id)
+        if slot is None:
+            if self._size == len(self._ids):
+                if len(self._slots) < self._size // 2:
+                    self._compact()
+                else:
+                    self._grow(len(self._ids) * 2)
+            slot = self._size
+            self._size += 1
+            self._slots[job_id] = slot
+        self._write(slot, job_id, product_type, quantity, delivery_location, created_at)
+
+    def _discard(self, job_id: int) -> None:
+        slot = self._slots.pop(job_id, None)
+        if slot is not None:
+            self._alive[slot] = False
+
+    async def load(self, db: AsyncSession) -> None:
+        """Rebuild the snapshot from all OPEN jobs in the database."""
+        rows = (await db.execute(
+            select(
+                PrintingJob.id,
+                PrintingJob.product_type,
+                PrintingJob.quantity,
+                PrintingJob.delivery_location,
+                PrintingJob.created_at
+            ).where(PrintingJob.state == JobState.OPEN.value)
+        )).all()
+
+        with self._lock:
+            self._reset(max(_INITIAL_CAPACITY, len(rows) * 2))
+            for job_id, product_type, quantity, delivery_location, created_at in rows:
+                self._upsert(job_id, product_type, quantity, delivery_location, created_at)
+            self._loaded_at = time.monotonic()
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Reload the snapshot if it was never loaded or is older than the max age."""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > SNAPSHOT_MAX_AGE_SECONDS:
+            await self.load(db)
+
+    def apply(self, job: PrintingJob) -> None:
+        """
+        Reflect a job change in the snapshot.
+
+        OPEN jobs are inserted or updated; jobs in any other state are removed.
+        """
+        if self._loaded_at is None:
+            # Nothing to keep in sync yet; the first match() loads everything.
+            return
+        with self._lock:
+            if job.state == JobState.OPEN.value:
+                self._upsert(job.id, job.product_type, job.quantity, job.delivery_location, job.created_at)
+            else:
+                self._discard(job.id)
+
+    def discard(self, job_ids: Iterable[int]) -> None:
+        """Remove jobs that left the OPEN state (closed, accepted) from the snapshot."""
+        with self._lock:
+            for job_id in job_ids:
+                self._discard(job_id)
+
+    def _location_mask(self, service_areas: List[str]) -> np.ndarray:
+        """
+        Boolean lookup table over location codes: True where geography matches.
+
+        A location and an area can only overlap if one has every token of the
+        other, so only locations sharing a token with an area are checked,
+        found through the token postings; the cost follows the number of
+        postings of the areas' tokens, not the number of locations.
+        """
+        mask = np.zeros(len(self._locations), dtype=bool)
+        # Jobs without a location match any service area
+        mask[0] = True
+        areas = {normalize_location(area) for area in service_areas if isinstance(area, str)}
+        for area in areas:
+            area_tokens = set(area.split())
+            shared_tokens: Dict[int, int] = {}
+            for token in area_tokens:
+                for code in self._location_codes_by_token.get(token, ()):
+                    shared_tokens[code] = shared_tokens.get(code, 0) + 1
+            for code, shared in shared_tokens.items():
+                if mask[code]:
+                    continue
+                contains_area = shared == len(area_tokens)
+                within_area = shared == self._location_token_counts[code]
+                if (contains_area or within_area) and locations_overlap(self._locations[code], area):
+                    mask[code] = True
+        return mask
+
+    async def match(
+        self,
+        db: AsyncSession,
+        printer_profile: PrinterProfile,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> np.ndarray:
+        """
+        Return ids of OPEN jobs matching the printer profile, ordered by
+        (created_at, id) descending, like paginate_newest_first.
+
+        Matches on product type, quantity range and geography, with the same
+        rules as printer_job_filters. With after (a decoded cursor), only jobs
+        that sort after it are returned. Jobs closed by another worker since
+        the last reload may still be returned; callers re-check the state when
+        loading the rows.
+        """
+        supported_types = printer_profile.supported_product_types
+        if not isinstance(supported_types, list) or not supported_types:
+            return np.zeros(0, dtype=np.int64)
+        service_areas = printer_profile.service_areas
+
+        await self.ensure_fresh(db)
+
+        with self._lock:
+            size = self._size
+            mask = self._alive[:size].copy()
+
+            supported_codes = [PRODUCT_TYPE_CODES[pt] for pt in supported_types if pt in PRODUCT_TYPE_CODES]
+            mask &= np.isin(self._product_codes[:size], supported_codes)
+
+            quantities = self._quantities[:size]
+            if printer_profile.min_quantity is not None:
+                mask &= quantities >= printer_profile.min_quantity
+            if printer_profile.max_quantity is not None:
+                mask &= quantities <= printer_profile.max_quantity
+
+            if isinstance(service_areas, list) and service_areas:
+                mask &= self._location_mask(service_areas)[self._location_codes[:size]]
+
+            if after is not None:
+                after_created_at, after_id = _to_datetime64(after[0]), after[1]
+                created_at = self._created_at[:size]
+                mask &= (created_at < after_created_at) | (
+                    (created_at == after_created_at) & (self._ids[:size] < after_id)
+                )
+
+            matched = np.flatnonzero(mask)
+            ids = self._ids[matched]
+            # Most recent first: sort by (created_at, id) and reverse
+            order = np.lexsort((ids, self._created_at[matched]))[::-1]
+            return ids[order]
+
+    async def page(
+        self,
+        db: AsyncSession,
+        printer_profile: PrinterProfile,
+        cursor: Optional[str],
+        limit: int
+    ) -> Tuple[List[PrintingJob], Optional[str]]:
+        """
+        Fetch one page of the OPEN jobs matching a printer profile.
+
+        The cursor and limit are applied to the snapshot's ordered ids, so
+        only the page's rows are loaded, by id. Jobs that are no longer OPEN
+        in the database are skipped and the next ids are loaded instead.
+
+        Returns:
+            (jobs, next_cursor) where next_cursor is None on the last page
+        """
+        matching_ids = await self.match(db, printer_profile, decode_cursor(cursor) if cursor else None)
+
+        jobs: List[PrintingJob] = []
+        position = 0
+        while len(jobs) <= limit and position < len(matching_ids):
+            batch = matching_ids[position:position + limit + 1 - len(jobs)].tolist()
+            position += len(batch)
+            loaded = {
+                job.id: job
+                for job in (await db.execute(
+                    select(PrintingJob).where(
+                        PrintingJob.id.in_(batch),
+                        PrintingJob.state == JobState.OPEN.value
+                    )
+                )).scalars()
+            }
+            jobs.extend(loaded[job_id] for job_id in batch if job_id in loaded)
+
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            next_cursor = encode_cursor(jobs[-1].created_at, jobs[-1].id)
+        return jobs, next_cursor
+
+open_job_index = OpenJobIndex()
@@ -0,0 +1,100 @@
+"""Background generation of previews for uploaded print files.
+
+After an upload completes, the route schedules generate_preview as a
+background task. The file is copied from storage to a temporary file in
+chunks, rendered to a small JPEG in a process pool (rendering a 50MB TIFF or
+PDF page is CPU-bound and would otherwise stall the event loop), and stored
+next to the original under preview_key(file_key). Workers open the
+temporary file themselves, so the API process never holds the file in
+memory. Previews of a file key never change, so they can be cached by
+clients indefinitely.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from app.utils.metrics import metrics
+from app.utils.previews import can_render_preview, render_preview
+from app.utils.storage import download_file, upload_file
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_MAX_WORKERS = int(os.getenv("PREVIEW_MAX_WORKERS", "2"))
+PREVIEW_MAX_SIZE = int(os.getenv("PREVIEW_MAX_SIZE", "512"))  # Pixels on the longest side
+PREVIEW_SUFFIX = ".preview.jpg"
+
+# Files copied to temporary files at once for rendering; more wait their turn
+_render_slots = asyncio.Semaphore(PREVIEW_MAX_WORKERS * 2)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def preview_key(file_key: str) -> str:
+    """Storage key of a file's preview (e.g. "users/1/uuid.pdf.preview.jpg")."""
+    return f"{file_key}{PREVIEW_SUFFIX}"
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process with running threads (storage pool) is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=PREVIEW_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_previews() -> None:
+    """Stop the preview worker processes, dropping queued renders."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def generate_preview(file_key: str) -> None:
+    """
+    Render and store the preview of an uploaded file.
+
+    Runs as a background task: failures are logged, never raised. Files
+    whose type has no preview are skipped.
+    """
+    file_ext = Path(file_key).suffix.lower()
+    if not can_render_preview(file_ext):
+        return
+
+    async with _render_slots:
+        start = time.perf_counter()
+        try:
+            with tempfile.NamedTemporaryFile(suffix=file_ext) as source:
+                await download_file(file_key, source)
+                source.flush()
+                loop = asyncio.get_running_loop()
+                preview = await loop.run_in_executor(
+                    _get_executor(), render_preview, source.name, file_ext, PREVIEW_MAX_SIZE
+                )
+            if preview is None:
+                return
+            await upload_file(preview, preview_key(file_key), "image/jpeg")
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory on a huge image); start a fresh pool next time
+            shutdown_previews()
+            metrics.counter("preview_failures").inc()
+            logger.warning(f"Preview worker crashed while rendering {file_key}", exc_info=True)
+            return
+        except Exception:
+            metrics.counter("preview_failures").inc()
+            logger.warning(f"Failed to generate preview of {file_key}", exc_info=True)
+            return
+
+    metrics.counter("previews_generated").inc()
+    metrics.summary("preview_generation_seconds").observe(time.perf_counter() - start)
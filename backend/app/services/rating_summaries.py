@@ -0,0 +1,55 @@
+"""Reading of printer rating summaries.
+
+Summaries are maintained incrementally (see app.models.printer_rating_summary),
+so the rating of any number of printers is one indexed lookup, never an
+aggregate over the ratings table.
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.printer_profile import PrinterProfile
+from app.models.printer_rating_summary import STAR_COLUMNS, PrinterRatingSummary
+from app.schemas.rating import RatingSummaryResponse
+
+# Columns to select (outer-joined to printer profiles) for rating_summary_response
+RATING_SUMMARY_COLUMNS = (
+    PrinterRatingSummary.rating_count,
+    PrinterRatingSummary.rating_sum,
+    *(getattr(PrinterRatingSummary, column) for column in STAR_COLUMNS)
+)
+
+
+def rating_summary_response(printer_profile_uuid: str, row) -> RatingSummaryResponse:
+    """
+    Build the summary of a printer from a row with RATING_SUMMARY_COLUMNS.
+
+    The columns are NULL for printers that were never rated.
+    """
+    rating_count = row.rating_count or 0
+    average_rating: Optional[float] = None
+    if rating_count:
+        average_rating = round(row.rating_sum / rating_count, 2)
+    return RatingSummaryResponse(
+        printer_profile_uuid=printer_profile_uuid,
+        rating_count=rating_count,
+        average_rating=average_rating,
+        stars={stars: getattr(row, column) or 0 for stars, column in enumerate(STAR_COLUMNS, start=1)}
+    )
+
+
+async def get_rating_summaries(db: AsyncSession, printer_profile_uuids: List[str]) -> List[RatingSummaryResponse]:
+    """
+    Get the rating summaries of several printers with a single query.
+
+    Unknown printer profiles are left out; printers without ratings get an
+    empty summary.
+    """
+    rows = (await db.execute(
+        select(PrinterProfile.uuid, *RATING_SUMMARY_COLUMNS)
+        .outerjoin(PrinterRatingSummary, PrinterRatingSummary.printer_profile_id == PrinterProfile.id)
+        .where(PrinterProfile.uuid.in_(set(printer_profile_uuids)))
+    )).all()
+    return [rating_summary_response(row.uuid, row) for row in rows]
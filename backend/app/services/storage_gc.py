@@ -0,0 +1,188 @@
+"""Garbage collection of uploaded files that no job references.
+
+Uploads that were never attached to a job, or whose jobs were deleted, stay
+in storage forever. collect_orphaned_files pages through the bucket and,
+for each page of up to 1000 keys, finds the referenced ones with a single
+lookup on the printing_jobs.file_url index. Unreferenced files unused for
+the grace period are deleted with batched delete requests, together with
+their previews and uploaded_files rows.
+
+A tracked upload's age is its uploaded_files.last_used_at, which is
+refreshed whenever the upload is reused by deduplication; the storage
+object's last_modified only counts for objects without an uploaded_files row.
+
+Run it from the command line:
+
+    python -m app.services.storage_gc --grace-hours 168 --dry-run
+
+or through POST /api/admin/storage-gc.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Set
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.printing_job import PrintingJob
+from app.models.uploaded_file import UploadedFile
+from app.persistence.database import SessionLocal
+from app.services.previews import PREVIEW_SUFFIX
+from app.utils.metrics import metrics
+from app.utils.storage import delete_files, list_files
+
+logger = logging.getLogger(__name__)
+
+STORAGE_GC_GRACE_HOURS = float(os.getenv("STORAGE_GC_GRACE_HOURS", "168"))  # 7 days
+STORAGE_GC_PREFIX = "users/"
+
+
+@dataclass
+class GarbageCollectionStats:
+    """Outcome of a garbage collection run."""
+    dry_run: bool
+    pages: int = 0
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    orphaned_files: int = 0
+    orphaned_bytes: int = 0
+    deleted_files: int = 0
+    failed_files: int = 0
+    elapsed_seconds: float = 0.0
+    files_per_second: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _source_key(file_key: str) -> str:
+    """The uploaded file a key belongs to (itself, or the original of a preview)."""
+    if file_key.endswith(PREVIEW_SUFFIX):
+        return file_key[:-len(PREVIEW_SUFFIX)]
+    return file_key
+
+
+async def _find_orphans(db: AsyncSession, files: List[Dict], cutoff: datetime, claim: bool) -> List[Dict]:
+    """
+    Find the files of a page that are past the grace period and that no job
+    references.
+
+    With claim, the uploaded_files rows are locked before their last_used_at
+    is checked, and the orphans' rows are deleted and committed. A job being
+    created with one of these files (which share-locks its row) either
+    commits before the reference check below, or finds the row gone
+    afterwards; likewise a deduplicated upload reusing one of them either
+    refreshes last_used_at first, or finds the row gone and uploads anew.
+
+    Returns:
+        The orphaned files (originals and previews)
+    """
+    source_keys = list({_source_key(file["key"]) for file in files})
+    query = select(
+        UploadedFile.file_key,
+        (UploadedFile.last_used_at < cutoff).label("stale")
+    ).where(UploadedFile.file_key.in_(source_keys))
+    if claim:
+        query = query.with_for_update()
+    tracked = {row.file_key: bool(row.stale) for row in (await db.execute(query)).all()}
+
+    candidates = [
+        file for file in files
+        if tracked.get(_source_key(file["key"]), file["last_modified"] < cutoff)
+    ]
+    candidate_keys = list({_source_key(file["key"]) for file in candidates})
+    referenced: Set[str] = set()
+    if candidate_keys:
+        referenced = set((await db.execute(
+            select(PrintingJob.file_url).distinct().where(PrintingJob.file_url.in_(candidate_keys))
+        )).scalars().all())
+    orphaned = [file for file in candidates if _source_key(file["key"]) not in referenced]
+
+    if claim:
+        orphan_keys = list({_source_key(file["key"]) for file in orphaned})
+        if orphan_keys:
+            await db.execute(
+                delete(UploadedFile)
+                .where(UploadedFile.file_key.in_(orphan_keys))
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+    return orphaned
+
+
+async def collect_orphaned_files(
+    db: AsyncSession,
+    grace_period: timedelta = timedelta(hours=STORAGE_GC_GRACE_HOURS),
+    dry_run: bool = False
+) -> GarbageCollectionStats:
+    """
+    Delete uploaded files that no job references.
+
+    Only files unused since now - grace_period are considered, so uploads
+    that are about to be attached to a job are kept.
+
+    Args:
+        db: Session on the primary database
+        grace_period: Minimum age of a file before it can be deleted
+        dry_run: Only count orphans, delete nothing
+
+    Returns:
+        Counts of scanned, orphaned and deleted files and the throughput
+    """
+    stats = GarbageCollectionStats(dry_run=dry_run)
+    cutoff = datetime.now(timezone.utc) - grace_period
+    start = time.perf_counter()
+
+    continuation_token = None
+    while True:
+        files, continuation_token = await list_files(STORAGE_GC_PREFIX, continuation_token)
+        stats.pages += 1
+        stats.scanned_files += len(files)
+        stats.scanned_bytes += sum(file["size"] for file in files)
+
+        if files:
+            orphaned = await _find_orphans(db, files, cutoff, claim=not dry_run)
+            stats.orphaned_files += len(orphaned)
+            stats.orphaned_bytes += sum(file["size"] for file in orphaned)
+
+            if orphaned and not dry_run:
+                failed = await delete_files([file["key"] for file in orphaned])
+                stats.deleted_files += len(orphaned) - len(failed)
+                stats.failed_files += len(failed)
+                if failed:
+                    logger.warning(f"Storage GC could not delete {len(failed)} files, e.g. {failed[0]}")
+
+        if continuation_token is None:
+            break
+
+    stats.elapsed_seconds = round(time.perf_counter() - start, 3)
+    stats.files_per_second = round(stats.scanned_files / stats.elapsed_seconds, 1) if stats.elapsed_seconds else 0.0
+
+    metrics.counter("storage_gc_deleted_files").inc(stats.deleted_files)
+    metrics.counter("storage_gc_failed_files").inc(stats.failed_files)
+    metrics.summary("storage_gc_seconds").observe(stats.elapsed_seconds)
+    logger.info(f"Storage GC finished: {stats.as_dict()}")
+    return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete uploaded files that no job references.")
+    parser.add_argument("--grace-hours", type=float, default=STORAGE_GC_GRACE_HOURS,
+                        help="Keep files younger than this (default: STORAGE_GC_GRACE_HOURS)")
+    parser.add_argument("--dry-run", action="store_true", help="Report orphans without deleting them")
+    args = parser.parse_args()
+
+    async with SessionLocal() as db:
+        stats = await collect_orphaned_files(db, timedelta(hours=args.grace_hours), args.dry_run)
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
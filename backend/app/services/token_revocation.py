@@ -0,0 +1,152 @@
+"""Revocation of access tokens before their expiry.
+
+Revoked token IDs (jti claims) are stored in the revoked_tokens table and
+mirrored in a process-local Bloom filter, so the common "not revoked" check
+is a memory lookup. Only a filter hit (a revoked token or a false positive)
+costs a database query.
+
+Each worker pulls new revocations incrementally at most every
+REVOCATION_SYNC_INTERVAL_SECONDS, and rebuilds the filter from unexpired rows
+every REVOCATION_REBUILD_INTERVAL_SECONDS so that expired revocations drop
+out. A token revoked on another worker is therefore rejected everywhere
+within one sync interval.
+
+Incremental syncs select rows by revoked_at, re-reading a trailing window of
+REVOCATION_SYNC_OVERLAP_SECONDS before the newest revocation seen. Neither
+ids nor revoked_at (the revoking transaction's start time) become visible in
+order, since transactions commit in any order; the overlap picks up rows that
+committed after newer ones were already synced. Re-adding a token to the
+filter is a no-op.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.revoked_token import RevokedToken
+from app.utils.metrics import metrics
+
+REVOCATION_SYNC_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", "5"))
+REVOCATION_REBUILD_INTERVAL_SECONDS = float(os.getenv("REVOCATION_REBUILD_INTERVAL_SECONDS", "3600"))
+# Longer than any revoking transaction takes to commit
+REVOCATION_SYNC_OVERLAP_SECONDS = float(os.getenv("REVOCATION_SYNC_OVERLAP_SECONDS", "60"))
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FILTER_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        # Double hashing: h1 + i * h2 gives k independent-enough positions
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """Add an item; adding one that is already present changes nothing."""
+        positions = list(self._positions(item))
+        if all(self._bits[position >> 3] & (1 << (position & 7)) for position in positions):
+            return
+        for position in positions:
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationList:
+    """Process-local view of the revoked_tokens table."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(REVOCATION_FILTER_CAPACITY, REVOCATION_FILTER_ERROR_RATE)
+        # Newest revoked_at seen; syncs re-read from REVOCATION_SYNC_OVERLAP_SECONDS before it
+        self._last_revoked_at: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._rebuilt_at: Optional[float] = None
+
+    async def _rebuild(self, db: AsyncSession) -> None:
+        # Rows committed during the rebuild are picked up by the next incremental sync
+        last_revoked_at = (await db.execute(select(func.max(RevokedToken.revoked_at)))).scalar()
+        rows = (await db.execute(
+            select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.now(timezone.utc))
+        )).all()
+        bloom = BloomFilter(max(REVOCATION_FILTER_CAPACITY, 2 * len(rows)), REVOCATION_FILTER_ERROR_RATE)
+        for row in rows:
+            bloom.add(row.jti)
+        with self._lock:
+            self._filter = bloom
+            self._last_revoked_at = last_revoked_at
+            self._rebuilt_at = self._synced_at = time.monotonic()
+
+    async def _sync(self, db: AsyncSession) -> None:
+        query = select(RevokedToken.jti, RevokedToken.revoked_at)
+        if self._last_revoked_at is not None:
+            overlap = timedelta(seconds=REVOCATION_SYNC_OVERLAP_SECONDS)
+            query = query.where(RevokedToken.revoked_at >= self._last_revoked_at - overlap)
+        rows = (await db.execute(query)).all()
+        with self._lock:
+            for row in rows:
+                self._filter.add(row.jti)
+                if self._last_revoked_at is None or row.revoked_at > self._last_revoked_at:
+                    self._last_revoked_at = row.revoked_at
+            self._synced_at = time.monotonic()
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Pull revocations made since the last sync, rebuilding the filter when due."""
+        now = time.monotonic()
+        if (
+            self._rebuilt_at is None
+            or now - self._rebuilt_at > REVOCATION_REBUILD_INTERVAL_SECONDS
+            or self._filter.count > self._filter.capacity
+        ):
+            await self._rebuild(db)
+        elif now - self._synced_at > REVOCATION_SYNC_INTERVAL_SECONDS:
+            await self._sync(db)
+
+    async def is_revoked(self, db: AsyncSession, jti: str) -> bool:
+        """Check whether a token ID was revoked."""
+        await self.ensure_fresh(db)
+        if jti not in self._filter:
+            return False
+
+        metrics.counter("token_revocation_filter_hits").inc()
+        revoked = (await db.execute(
+            select(RevokedToken.id).where(RevokedToken.jti == jti)
+        )).first() is not None
+        if not revoked:
+            metrics.counter("token_revocation_false_positives").inc()
+        return revoked
+
+    async def revoke(self, db: AsyncSession, jti: str, user_id: Optional[int], expires_at: datetime) -> None:
+        """Record a revocation; the caller commits."""
+        await db.execute(
+            insert(RevokedToken)
+            .values(jti=jti, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        # Visible to this worker immediately; others pick it up on their next sync
+        with self._lock:
+            self._filter.add(jti)
+
+
+token_revocation_list = TokenRevocationList()
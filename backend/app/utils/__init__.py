@@ -1,11 +1,12 @@
 """Utils package."""
 
-from app.utils.enums import UserRole, JobState, BidStatus, ProductType
+from app.utils.enums import UserRole, JobState, BidStatus, ProductType, UploadStatus
 
 __all__ = [
     "UserRole",
     "JobState",
     "BidStatus",
     "ProductType",
+    "UploadStatus",
 ]
 
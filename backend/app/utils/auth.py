@@ -3,16 +3,31 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError, ExpiredSignatureError
+import hashlib
+import logging
 import os
+import time
+import uuid
 from dotenv import load_dotenv
 
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24 * 7  # 7 days
 
+# Verified token payloads, keyed by the SHA-256 of the token. An entry never
+# outlives the token's exp claim.
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "3600"))
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -31,7 +46,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     
-    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+    # jti identifies the token for revocation (see app.services.token_revocation)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -40,6 +56,9 @@ def verify_token(token: str) -> Optional[dict]:
     """
     Verify and decode a JWT token.
     
+    Tokens verified before are served from token_cache without checking the
+    signature again, until they expire.
+    
     Args:
         token: JWT token string
     
@@ -47,21 +66,31 @@ def verify_token(token: str) -> Optional[dict]:
         Decoded token payload if valid, None otherwise
     """
     if not token or not isinstance(token, str):
-        print(f"Invalid token type or empty token")
+        logger.debug("Invalid token type or empty token")
         return None
     
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        metrics.counter("token_cache_hits").inc()
+        return payload
+    metrics.counter("token_cache_misses").inc()
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except ExpiredSignatureError:
-        print(f"JWT token has expired")
+        logger.debug("JWT token has expired")
         return None
     except JWTError as e:
-        # Log the error for debugging (in production, you might want to use a logger)
-        print(f"JWT verification failed: {type(e).__name__}: {str(e)}")
+        logger.info("JWT verification failed: %s", type(e).__name__)
         return None
     except Exception as e:
         # Catch any other exceptions (e.g., malformed token)
-        print(f"Token verification error: {type(e).__name__}: {str(e)}")
+        logger.info("Token verification error: %s", type(e).__name__)
         return None
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(cache_key, payload, ttl=exp - time.time())
+    return payload
 
@@ -0,0 +1,75 @@
+"""Admission control for expensive requests."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+from app.utils.metrics import metrics
+
+
+class ConcurrencyLimiter:
+    """
+    Cap on the number of requests doing some work at the same time.
+
+    Up to max_active requests run; up to max_queued more wait for a slot
+    for at most queue_timeout seconds. Beyond that, requests are rejected
+    with 503 and a Retry-After header instead of piling up. Per worker
+    process.
+
+    Metrics (prefixed with name): gauges "_active" and "_queue_depth",
+    counter "_rejected_saturated", summary "_queue_wait_seconds".
+    """
+
+    def __init__(self, name: str, max_active: int, max_queued: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_active)
+        self._queued = 0
+        self._active = metrics.gauge(f"{name}_active")
+        self._queue_depth = metrics.gauge(f"{name}_queue_depth")
+
+    def _reject(self) -> HTTPException:
+        metrics.counter(f"{self.name}_rejected_saturated").inc()
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry later",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block.
+
+        Raises:
+            HTTPException: 503 if no slot frees up in time or the queue is full
+        """
+        if self._semaphore.locked():
+            if self._queued >= self.max_queued:
+                raise self._reject()
+            self._queued += 1
+            self._queue_depth.inc()
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject()
+            finally:
+                self._queued -= 1
+                self._queue_depth.dec()
+                metrics.summary(f"{self.name}_queue_wait_seconds").observe(time.perf_counter() - start)
+        else:
+            await self._semaphore.acquire()
+
+        self._active.inc()
+        try:
+            yield
+        finally:
+            self._active.dec()
+            self._semaphore.release()
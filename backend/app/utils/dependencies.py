@@ -1,27 +1,34 @@
 """FastAPI dependencies for authentication and authorization."""
 
-from fastapi import Depends, HTTPException, status
+import hmac
+import os
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.persistence.database import get_db
-from app.models.user import User
+from app.persistence.database import get_db, get_read_sessionmaker
+from app.services.identity import CurrentIdentity, get_identity
+from app.services.token_revocation import token_revocation_list
 from app.utils.enums import UserRole
 from app.utils.auth import verify_token
 
 security = HTTPBearer(auto_error=False)
 
+# Shared secret for operational endpoints (/api/admin); they are disabled when unset
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
 
-async def get_current_user(
+
+async def get_token_payload(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> dict:
     """
-    Dependency to get the current authenticated user from JWT token.
+    Dependency to get the verified, unrevoked JWT payload of the request.
     
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If token is missing, invalid, expired or revoked
     """
     if credentials is None:
         raise HTTPException(
@@ -47,6 +54,31 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Tokens issued before revocation support have no jti and cannot be revoked
+    jti = payload.get("jti")
+    if jti is not None and await token_revocation_list.is_revoked(db, jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication token has been revoked. Please log in again.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return payload
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db)
+) -> CurrentIdentity:
+    """
+    Dependency to get the current authenticated user from JWT token.
+    
+    Returns the user's cached identity (id, role, customer_profile_id); routes
+    that modify the user load the User row themselves.
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
     user_id_str: Optional[str] = payload.get("sub")
     if user_id_str is None:
         raise HTTPException(
@@ -65,7 +97,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await get_identity(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,9 +105,24 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Commits on this request's session start the user's read-your-writes window
+    db.info["user_id"] = user.id
+    
     return user
 
 
+async def get_read_db(current_user: CurrentIdentity = Depends(get_current_user)):
+    """
+    Dependency for read-only routes: a session on the read replica, if configured.
+
+    Falls back to the primary for a short window after the user's own writes
+    made through this worker process; writes made through another process
+    are not seen (see READ_YOUR_WRITES_SECONDS).
+    """
+    async with get_read_sessionmaker(current_user.id)() as db:
+        yield db
+
+
 def require_role(allowed_roles: list[UserRole]):
     """
     Create a dependency that checks if the current user has one of the allowed roles.
@@ -86,7 +133,7 @@ def require_role(allowed_roles: list[UserRole]):
     Returns:
         Dependency function that raises HTTPException if user role is not allowed
     """
-    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def role_checker(current_user: CurrentIdentity = Depends(get_current_user)) -> CurrentIdentity:
         user_role = UserRole(current_user.role)
         if user_role not in allowed_roles:
             raise HTTPException(
@@ -97,3 +144,21 @@ def require_role(allowed_roles: list[UserRole]):
     
     return role_checker
 
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency for operational endpoints, authenticated by the X-Admin-Token header.
+
+    Raises:
+        HTTPException: If the admin API is disabled or the token does not match
+    """
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_API_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token",
+        )
@@ -30,3 +30,8 @@ class ProductType(str, enum.Enum):
     BUSINESS_CARDS = "BUSINESS_CARDS"
     OTHER = "OTHER"
 
+
+
+class UploadStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    COMPLETED = "COMPLETED"
@@ -0,0 +1,111 @@
+"""In-process metrics (counters, gauges and timing summaries).
+
+Values are per worker process; they are exposed through the admin API.
+"""
+
+import threading
+from typing import Dict
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> int:
+        return self._value
+
+
+class Gauge:
+    """Current value that goes up and down (e.g. requests in progress)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> int:
+        return self._value
+
+
+class Summary:
+    """Count, total and maximum of observed values (e.g. durations in seconds)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "avg": self._sum / self._count if self._count else 0.0,
+                "max": self._max,
+            }
+
+
+class MetricsRegistry:
+    """Named counters, gauges and summaries, created on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._summaries: Dict[str, Summary] = {}
+
+    def counter(self, name: str) -> Counter:
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+
+    def gauge(self, name: str) -> Gauge:
+        with self._lock:
+            return self._gauges.setdefault(name, Gauge())
+
+    def summary(self, name: str) -> Summary:
+        with self._lock:
+            return self._summaries.setdefault(name, Summary())
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = dict(self._summaries)
+        return {
+            "counters": {name: counter.snapshot() for name, counter in sorted(counters.items())},
+            "gauges": {name: gauge.snapshot() for name, gauge in sorted(gauges.items())},
+            "summaries": {name: summary.snapshot() for name, summary in sorted(summaries.items())},
+        }
+
+
+metrics = MetricsRegistry()
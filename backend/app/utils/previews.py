@@ -0,0 +1,92 @@
+"""Rendering of small JPEG previews of print files.
+
+These functions run in worker processes (see app.services.previews), so this
+module must stay importable without the rest of the application. Pillow
+renders images; PDFs additionally need pypdfium2. Without them, no previews
+are rendered.
+"""
+
+import io
+from typing import Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# File extensions previews can be rendered for
+IMAGE_PREVIEW_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.tiff', '.tif', '.psd'}
+PDF_PREVIEW_EXTENSIONS = {'.pdf'}
+
+PREVIEW_JPEG_QUALITY = 80
+
+
+def can_render_preview(file_ext: str) -> bool:
+    """Check whether a preview can be rendered for a file extension."""
+    if Image is None:
+        return False
+    if file_ext in PDF_PREVIEW_EXTENSIONS:
+        return pdfium is not None
+    return file_ext in IMAGE_PREVIEW_EXTENSIONS
+
+
+def _open_image(path: str, max_size: int) -> "Image.Image":
+    with Image.open(path) as image:
+        # JPEGs can be decoded at a reduced scale, which is much faster
+        image.draft("RGB", (max_size, max_size))
+        # First frame/page of GIFs and multi-page TIFFs; PSDs open as the composite
+        image.seek(0)
+        # Returns a loaded copy, so the file can be closed
+        return ImageOps.exif_transpose(image)
+
+
+def _open_pdf_page(path: str, max_size: int) -> "Image.Image":
+    # Opened from the path, pdfium reads only the parts of the file it needs
+    pdf = pdfium.PdfDocument(path)
+    try:
+        page = pdf[0]
+        width, height = page.get_size()
+        bitmap = page.render(scale=max_size / max(width, height, 1))
+        return bitmap.to_pil()
+    finally:
+        pdf.close()
+
+
+def render_preview(path: str, file_ext: str, max_size: int) -> Optional[bytes]:
+    """
+    Render a JPEG preview of a file, at most max_size pixels on each side.
+
+    Args:
+        path: Local path of the file (read by the worker process)
+        file_ext: Lower-case file extension (e.g. ".pdf")
+        max_size: Maximum width and height of the preview
+
+    Returns:
+        JPEG bytes, or None if previews are not supported for the file type
+    """
+    if not can_render_preview(file_ext):
+        return None
+
+    if file_ext in PDF_PREVIEW_EXTENSIONS:
+        image = _open_pdf_page(path, max_size)
+    else:
+        image = _open_image(path, max_size)
+
+    image.thumbnail((max_size, max_size))
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent areas print as paper: flatten onto white
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=PREVIEW_JPEG_QUALITY, optimize=True)
+    return output.getvalue()
@@ -1,13 +1,41 @@
 """Storage utility for MinIO/S3 file operations."""
 
+import asyncio
+import functools
+import hashlib
+import logging
 import os
-import boto3
-from botocore.client import Config
-from botocore.exceptions import ClientError
-from typing import Optional
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
 import uuid
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+from app.utils.storage_backends import (
+    MAX_KEYS_PER_REQUEST,
+    InvalidRangeError,
+    LocalBackend,
+    S3Backend,
+    StorageBackend
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Backend: "s3" (MinIO/S3) or "local" (files under STORAGE_LOCAL_PATH)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3").lower()
+STORAGE_LOCAL_PATH = os.getenv("STORAGE_LOCAL_PATH", "./storage")
+
 # MinIO/S3 configuration from environment
 STORAGE_ENDPOINT = os.getenv("STORAGE_ENDPOINT", "http://localhost:9000")
 STORAGE_ACCESS_KEY = os.getenv("STORAGE_ACCESS_KEY", "minioadmin")
@@ -15,82 +43,341 @@ STORAGE_SECRET_KEY = os.getenv("STORAGE_SECRET_KEY", "minioadmin")
 STORAGE_BUCKET_NAME = os.getenv("STORAGE_BUCKET_NAME", "printing-marketplace")
 STORAGE_USE_SSL = os.getenv("STORAGE_USE_SSL", "false").lower() == "true"
 
-# Initialize S3 client (works with MinIO)
-s3_client = boto3.client(
-    's3',
-    endpoint_url=STORAGE_ENDPOINT,
-    aws_access_key_id=STORAGE_ACCESS_KEY,
-    aws_secret_access_key=STORAGE_SECRET_KEY,
-    config=Config(signature_version='s3v4'),
-    use_ssl=STORAGE_USE_SSL
-)
+# Threads running blocking storage calls, and HTTP connections kept open to
+# storage (one per thread, so no thread waits for a connection)
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "16"))
+STORAGE_MAX_POOL_CONNECTIONS = int(os.getenv("STORAGE_MAX_POOL_CONNECTIONS", str(STORAGE_MAX_WORKERS)))
+
+# Chunk size for streamed downloads
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+
+# Part size for streamed uploads (S3 requires at least 5MB for all but the last part)
+UPLOAD_PART_SIZE = max(5 * 1024 * 1024, int(os.getenv("UPLOAD_PART_SIZE", str(5 * 1024 * 1024))))
+
+# Bytes of a part buffered in memory; the rest of the part spools to a temp file
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+
+# Presigned download URLs: default lifetime, the lifetime a cached URL must
+# still have when handed out, and the number of cached URLs per process
+PRESIGNED_URL_EXPIRATION = int(os.getenv("PRESIGNED_URL_EXPIRATION", "3600"))
+PRESIGNED_URL_MIN_VALIDITY = int(os.getenv("PRESIGNED_URL_MIN_VALIDITY", "300"))
+PRESIGNED_URL_CACHE_MAX_SIZE = int(os.getenv("PRESIGNED_URL_CACHE_MAX_SIZE", "10000"))
+
+# S3 rejects presigned URLs valid for longer than 7 days
+MAX_PRESIGNED_URL_EXPIRATION = 7 * 24 * 3600
+
+
+def create_storage_backend() -> StorageBackend:
+    """Create the backend selected by STORAGE_BACKEND."""
+    if STORAGE_BACKEND == "local":
+        return LocalBackend(STORAGE_LOCAL_PATH, base_url=os.getenv("API_BASE_URL", ""))
+    if STORAGE_BACKEND == "s3":
+        return S3Backend(
+            endpoint=STORAGE_ENDPOINT,
+            access_key=STORAGE_ACCESS_KEY,
+            secret_key=STORAGE_SECRET_KEY,
+            bucket=STORAGE_BUCKET_NAME,
+            use_ssl=STORAGE_USE_SSL,
+            max_pool_connections=STORAGE_MAX_POOL_CONNECTIONS
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
 
+storage_backend = create_storage_backend()
 
-def ensure_bucket_exists():
-    """Ensure the bucket exists, create if it doesn't."""
+# Bounded, so a burst of uploads queues here instead of exhausting the
+# default executor shared with the rest of the application
+storage_executor = ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+_bucket_ready = False
+
+
+async def run_storage_call(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking storage call in the storage thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(storage_executor, functools.partial(func, *args, **kwargs))
+
+
+def ensure_bucket_exists() -> None:
+    """Ensure the bucket exists, create if it doesn't. Checked once per process."""
+    global _bucket_ready
+    if _bucket_ready:
+        return
+    storage_backend.ensure_bucket()
+    _bucket_ready = True
+
+
+async def init_storage() -> None:
+    """Check the bucket at startup so uploads don't have to."""
     try:
-        s3_client.head_bucket(Bucket=STORAGE_BUCKET_NAME)
-    except ClientError:
-        # Bucket doesn't exist, create it
-        try:
-            s3_client.create_bucket(Bucket=STORAGE_BUCKET_NAME)
-        except ClientError as e:
-            # Bucket might have been created by another process
-            if e.response['Error']['Code'] != 'BucketAlreadyOwnedByYou':
-                raise
+        await run_storage_call(ensure_bucket_exists)
+    except Exception:
+        # Storage may come up after the API; the first upload retries the check
+        logger.error("Storage bucket check failed", exc_info=True)
 
 
-def upload_file(file_content: bytes, file_key: str, content_type: Optional[str] = None) -> str:
+def shutdown_storage() -> None:
+    """Stop the storage threads (waits for running calls)."""
+    storage_executor.shutdown(wait=True)
+
+
+async def upload_file(file_content: Union[bytes, BinaryIO], file_key: str, content_type: Optional[str] = None) -> str:
     """
     Upload a file to MinIO/S3.
     
     Args:
-        file_content: File content as bytes
+        file_content: File content as bytes or a binary file positioned at its start
         file_key: S3 object key (path in bucket)
         content_type: Optional MIME type
     
     Returns:
         S3 object key
     """
-    ensure_bucket_exists()
+    if not _bucket_ready:
+        await run_storage_call(ensure_bucket_exists)
+    await run_storage_call(storage_backend.put_object, file_key, file_content, content_type)
+    return file_key
+
+
+class StreamingUpload:
+    """
+    Upload an object from a stream of chunks without holding it in memory.
     
-    extra_args = {}
-    if content_type:
-        extra_args['ContentType'] = content_type
+    Chunks are buffered up to UPLOAD_PART_SIZE and sent as parts of an S3
+    multipart upload. Only the first UPLOAD_SPOOL_THRESHOLD bytes of a part
+    are kept in memory; the rest spools to a temporary file, so memory use
+    per upload stays small even with large parts.
+    Objects smaller than one part are sent with a single put_object.
+    Blocking storage calls run in the storage thread pool.
     
-    s3_client.put_object(
-        Bucket=STORAGE_BUCKET_NAME,
-        Key=file_key,
-        Body=file_content,
-        **extra_args
-    )
+    The SHA-256 of the content is computed along the way; once all chunks
+    are written, the caller may still abort (e.g. the content is a
+    duplicate) and nothing is stored.
     
-    return file_key
+    Usage:
+        upload = StreamingUpload(file_key, content_type)
+        try:
+            async for chunk in chunks:
+                await upload.write(chunk)
+            # upload.sha256 is final here
+            await upload.complete()
+        except BaseException:
+            await upload.abort()
+            raise
+    """
+    
+    def __init__(self, file_key: str, content_type: Optional[str] = None):
+        self.file_key = file_key
+        self.content_type = content_type
+        self.size = 0
+        self._buffer = self._new_buffer()
+        self._buffered = 0
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict] = []
+        self._hash = hashlib.sha256()
+    
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the chunks written so far."""
+        return self._hash.hexdigest()
+    
+    @staticmethod
+    def _new_buffer() -> BinaryIO:
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_THRESHOLD)
+    
+    def _take_buffer(self) -> BinaryIO:
+        """Detach the buffered part, rewound for reading; the caller closes it."""
+        buffer = self._buffer
+        buffer.seek(0)
+        self._buffer = self._new_buffer()
+        self._buffered = 0
+        return buffer
+    
+    async def write(self, chunk: bytes) -> None:
+        """Add a chunk, sending a part whenever a full part is buffered."""
+        self.size += len(chunk)
+        self._hash.update(chunk)
+        data = memoryview(chunk)
+        while data:
+            room = UPLOAD_PART_SIZE - self._buffered
+            self._buffer.write(data[:room])
+            self._buffered += min(room, len(data))
+            data = data[room:]
+            if self._buffered >= UPLOAD_PART_SIZE:
+                with self._take_buffer() as part:
+                    await self._upload_part(part)
+    
+    async def _upload_part(self, data: BinaryIO) -> None:
+        if self._upload_id is None:
+            if not _bucket_ready:
+                await run_storage_call(ensure_bucket_exists)
+            self._upload_id = await run_storage_call(
+                storage_backend.create_multipart_upload, self.file_key, self.content_type
+            )
+        
+        part_number = len(self._parts) + 1
+        part = await run_storage_call(
+            storage_backend.upload_part, self.file_key, self._upload_id, part_number, data
+        )
+        self._parts.append(part)
+    
+    async def complete(self) -> str:
+        """
+        Send the remaining bytes and finish the upload.
+        
+        Returns:
+            S3 object key
+        """
+        if self._upload_id is None:
+            # Fits in a single part: one request instead of three
+            with self._take_buffer() as data:
+                await upload_file(data, self.file_key, self.content_type)
+            return self.file_key
+        
+        if self._buffered:
+            with self._take_buffer() as data:
+                await self._upload_part(data)
+        await run_storage_call(
+            storage_backend.complete_multipart_upload, self.file_key, self._upload_id, self._parts
+        )
+        return self.file_key
+    
+    async def abort(self) -> None:
+        """Discard the upload and any parts already stored."""
+        self._take_buffer().close()
+        if self._upload_id is None:
+            return
+        try:
+            await run_storage_call(storage_backend.abort_multipart_upload, self.file_key, self._upload_id)
+        except Exception:
+            # Best effort: an orphaned multipart upload only costs storage
+            logger.warning(f"Failed to abort multipart upload of {self.file_key}", exc_info=True)
+        self._upload_id = None
+
+
+# Entries live until their expiry bucket ends (see _expiry_bucket)
+presigned_url_cache = TTLCache(maxsize=PRESIGNED_URL_CACHE_MAX_SIZE, ttl=MAX_PRESIGNED_URL_EXPIRATION)
+
+
+def _expiry_bucket(expiration: int, now: float):
+    """
+    Place a URL request in a fixed time bucket.
+    
+    All URLs for a key requested within the same bucket are the same URL,
+    signed to expire `margin` seconds after the bucket ends. The URL is only
+    handed out until the bucket ends, so every caller gets a URL valid for
+    at least `margin` seconds and at most `expiration` seconds.
+    
+    Returns:
+        Tuple of (bucket number, bucket end, expiry time), as Unix times
+    """
+    margin = min(PRESIGNED_URL_MIN_VALIDITY, expiration // 2)
+    window = expiration - margin
+    bucket = int(now // window)
+    bucket_end = (bucket + 1) * window
+    return bucket, bucket_end, bucket_end + margin
+
 
+def _sign_urls(file_keys: List[str], expires_at: float, now: float) -> List[str]:
+    expires_in = max(1, int(expires_at - now))
+    return [storage_backend.presigned_get_url(file_key, expires_in) for file_key in file_keys]
 
-def generate_presigned_url(file_key: str, expiration: int = 3600) -> str:
+
+async def generate_presigned_urls(
+    file_keys: Iterable[str],
+    expiration: int = PRESIGNED_URL_EXPIRATION
+) -> Dict[str, Dict]:
     """
-    Generate a presigned URL for file access.
+    Get presigned URLs for several files, reusing cached URLs.
+    
+    Args:
+        file_keys: S3 object keys
+        expiration: Maximum URL lifetime in seconds (default 1 hour)
+    
+    Returns:
+        Dict mapping each file key to a dict with "url" and "expires_at" (datetime)
+    """
+    expiration = min(max(expiration, 2), MAX_PRESIGNED_URL_EXPIRATION)
+    now = time.time()
+    bucket, bucket_end, expires_at = _expiry_bucket(expiration, now)
+    
+    result: Dict[str, Dict] = {}
+    missing: List[str] = []
+    for file_key in dict.fromkeys(file_keys):
+        cached = presigned_url_cache.get((file_key, expiration, bucket))
+        if cached is not None:
+            result[file_key] = cached
+        else:
+            missing.append(file_key)
+    metrics.counter("presigned_url_cache_hits").inc(len(result))
+    metrics.counter("presigned_url_cache_misses").inc(len(missing))
+    
+    if missing:
+        # Signing is local computation: one hop to the storage pool for the whole batch
+        urls = await run_storage_call(_sign_urls, missing, expires_at, now)
+        expires = datetime.fromtimestamp(expires_at, tz=timezone.utc)
+        for file_key, url in zip(missing, urls):
+            entry = {"url": url, "expires_at": expires}
+            presigned_url_cache.set((file_key, expiration, bucket), entry, ttl=bucket_end - now)
+            result[file_key] = entry
+    return result
+
+
+async def generate_presigned_url(file_key: str, expiration: int = PRESIGNED_URL_EXPIRATION) -> str:
+    """
+    Get a presigned URL for file access.
+    
+    URLs are cached and reused while they remain valid for at least
+    PRESIGNED_URL_MIN_VALIDITY seconds.
     
     Args:
         file_key: S3 object key
-        expiration: URL expiration time in seconds (default 1 hour)
+        expiration: Maximum URL lifetime in seconds (default 1 hour)
     
     Returns:
         Presigned URL
     """
-    try:
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': STORAGE_BUCKET_NAME, 'Key': file_key},
-            ExpiresIn=expiration
-        )
-        return url
-    except ClientError as e:
-        raise Exception(f"Error generating presigned URL: {str(e)}")
+    return (await generate_presigned_urls([file_key], expiration))[file_key]["url"]
+
+
+def presigned_uploads_supported() -> bool:
+    """Whether the storage backend accepts direct uploads (generate_presigned_post)."""
+    return storage_backend.supports_presigned_uploads
+
+
+async def generate_presigned_post(file_key: str, content_type: str, max_size: int, expiration: int = 3600) -> Dict:
+    """
+    Generate a presigned POST for uploading a file directly to MinIO/S3.
+    
+    Storage itself rejects uploads larger than max_size or with another
+    content type.
+    
+    Args:
+        file_key: S3 object key
+        content_type: Required MIME type of the upload
+        max_size: Maximum upload size in bytes
+        expiration: Expiration time in seconds (default 1 hour)
+    
+    Returns:
+        Dict with "url" and the form "fields" to send along with the file
+    """
+    return await run_storage_call(storage_backend.presigned_post, file_key, content_type, max_size, expiration)
 
 
-def delete_file(file_key: str) -> bool:
+async def get_file_metadata(file_key: str) -> Optional[Dict]:
+    """
+    Get size and content type of a file in MinIO/S3 (HEAD request).
+    
+    Args:
+        file_key: S3 object key
+    
+    Returns:
+        Dict with "size", "content_type" and "etag", or None if the file does not exist
+    """
+    return await run_storage_call(storage_backend.head_object, file_key)
+
+
+async def delete_file(file_key: str) -> bool:
     """
     Delete a file from MinIO/S3.
     
@@ -100,14 +387,42 @@ def delete_file(file_key: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        s3_client.delete_object(Bucket=STORAGE_BUCKET_NAME, Key=file_key)
-        return True
-    except ClientError:
-        return False
+    return await run_storage_call(storage_backend.delete_object, file_key)
+
+
+async def list_files(prefix: str, continuation_token: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    List one page (up to 1000) of files under a prefix, in key order.
+    
+    Args:
+        prefix: Key prefix (e.g. "users/")
+        continuation_token: Token returned with the previous page
+    
+    Returns:
+        Tuple of (files as dicts with "key", "size" and "last_modified",
+        token for the next page or None after the last page)
+    """
+    return await run_storage_call(storage_backend.list_objects, prefix, continuation_token)
+
+
+async def delete_files(file_keys: List[str]) -> List[str]:
+    """
+    Delete many files from MinIO/S3, up to 1000 per request.
+    
+    Args:
+        file_keys: S3 object keys
+    
+    Returns:
+        Keys that could not be deleted
+    """
+    failed: List[str] = []
+    for start in range(0, len(file_keys), MAX_KEYS_PER_REQUEST):
+        batch = file_keys[start:start + MAX_KEYS_PER_REQUEST]
+        failed += await run_storage_call(storage_backend.delete_objects, batch)
+    return failed
 
 
-def file_exists(file_key: str) -> bool:
+async def file_exists(file_key: str) -> bool:
     """
     Check if a file exists in MinIO/S3.
     
@@ -117,28 +432,79 @@ def file_exists(file_key: str) -> bool:
     Returns:
         True if file exists, False otherwise
     """
-    try:
-        s3_client.head_object(Bucket=STORAGE_BUCKET_NAME, Key=file_key)
-        return True
-    except ClientError:
-        return False
+    return await get_file_metadata(file_key) is not None
 
 
-def get_file_content(file_key: str) -> bytes:
+async def open_file_stream(file_key: str, byte_range: Optional[str] = None) -> Dict:
     """
-    Get file content from MinIO/S3.
+    Open a file in MinIO/S3 for streaming, without reading its content.
+    
+    The GET response carries the size, ETag and content type, so no
+    separate HEAD request is made.
     
     Args:
         file_key: S3 object key
+        byte_range: Optional HTTP Range header value (e.g. "bytes=0-1023")
     
     Returns:
-        File content as bytes
+        Dict with "body" (iterate with iter_file_chunks), "content_length",
+        "content_range" (set for partial content), "etag", "last_modified"
+        and "content_type"
+    
+    Raises:
+        FileNotFoundError: If the object does not exist
+        InvalidRangeError: If the range cannot be satisfied
+    """
+    return await run_storage_call(storage_backend.get_object, file_key, byte_range)
+
+
+def _read_object(file_key: str) -> bytes:
+    body = storage_backend.get_object(file_key)["body"]
+    try:
+        return body.read()
+    finally:
+        body.close()
+
+
+async def read_file(file_key: str) -> bytes:
+    """
+    Read a whole file from MinIO/S3 into memory (for small or bounded files).
+    
+    Raises:
+        FileNotFoundError: If the object does not exist
+    """
+    return await run_storage_call(_read_object, file_key)
+
+
+def _copy_object(file_key: str, destination: BinaryIO) -> None:
+    body = storage_backend.get_object(file_key)["body"]
+    try:
+        shutil.copyfileobj(body, destination, DOWNLOAD_CHUNK_SIZE)
+    finally:
+        body.close()
+
+
+async def download_file(file_key: str, destination: BinaryIO) -> None:
+    """
+    Copy a file from MinIO/S3 into a local binary file, chunk by chunk (the
+    file is never held in memory whole).
+    
+    Raises:
+        FileNotFoundError: If the object does not exist
     """
+    await run_storage_call(_copy_object, file_key, destination)
+
+
+async def iter_file_chunks(body, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read an open storage body in fixed-size chunks, closing it when done."""
     try:
-        response = s3_client.get_object(Bucket=STORAGE_BUCKET_NAME, Key=file_key)
-        return response['Body'].read()
-    except ClientError as e:
-        raise Exception(f"Error retrieving file: {str(e)}")
+        while True:
+            chunk = await run_storage_call(body.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await run_storage_call(body.close)
 
 
 def generate_file_key(user_id: int, filename: str) -> str:
@@ -155,4 +521,3 @@ def generate_file_key(user_id: int, filename: str) -> str:
     file_ext = Path(filename).suffix.lower()
     unique_id = str(uuid.uuid4())
     return f"users/{user_id}/{unique_id}{file_ext}"
-
@@ -0,0 +1,458 @@
+"""Object storage backends (S3/MinIO and local filesystem).
+
+Backends are synchronous; app.utils.storage runs their calls in a bounded
+thread pool so that async routes never block the event loop.
+"""
+
+import json
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime, timezone
+from email.utils import formatdate
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+import boto3
+from botocore.client import Config
+from botocore.exceptions import ClientError
+
+_MISSING_CODES = ('NoSuchKey', '404', 'NotFound')
+
+# Most keys S3 lists or deletes in one request
+MAX_KEYS_PER_REQUEST = 1000
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Object content: bytes, or a binary file positioned at the start of the content
+Data = Union[bytes, BinaryIO]
+
+
+class InvalidRangeError(Exception):
+    """The requested byte range cannot be satisfied."""
+
+    def __init__(self, object_size: Optional[int] = None):
+        super().__init__("Requested range not satisfiable")
+        self.object_size = object_size
+
+
+class StorageBackend:
+    """
+    Interface of an object store holding files under string keys.
+
+    get_object returns a dict with "body" (a file-like object with read()
+    and close()), "content_length", "content_range" (set for partial
+    content), "etag", "last_modified" and "content_type".
+    """
+
+    # Whether presigned_post is available (clients can upload to storage directly)
+    supports_presigned_uploads = True
+
+    def ensure_bucket(self) -> None:
+        raise NotImplementedError
+
+    def put_object(self, file_key: str, data: Data, content_type: Optional[str]) -> None:
+        raise NotImplementedError
+
+    def create_multipart_upload(self, file_key: str, content_type: Optional[str]) -> str:
+        raise NotImplementedError
+
+    def upload_part(self, file_key: str, upload_id: str, part_number: int, data: Data) -> Dict:
+        raise NotImplementedError
+
+    def complete_multipart_upload(self, file_key: str, upload_id: str, parts: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def abort_multipart_upload(self, file_key: str, upload_id: str) -> None:
+        raise NotImplementedError
+
+    def get_object(self, file_key: str, byte_range: Optional[str] = None) -> Dict:
+        raise NotImplementedError
+
+    def head_object(self, file_key: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def delete_object(self, file_key: str) -> bool:
+        raise NotImplementedError
+
+    def list_objects(self, prefix: str, continuation_token: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        List one page of objects under a prefix, in key order.
+
+        Returns:
+            Tuple of (objects as dicts with "key", "size" and "last_modified",
+            token for the next page or None after the last page)
+        """
+        raise NotImplementedError
+
+    def delete_objects(self, file_keys: List[str]) -> List[str]:
+        """
+        Delete up to MAX_KEYS_PER_REQUEST objects in one request.
+
+        Returns:
+            Keys that could not be deleted
+        """
+        raise NotImplementedError
+
+    def presigned_get_url(self, file_key: str, expiration: int) -> str:
+        raise NotImplementedError
+
+    def presigned_post(self, file_key: str, content_type: str, max_size: int, expiration: int) -> Dict:
+        raise NotImplementedError
+
+
+class S3Backend(StorageBackend):
+    """S3-compatible object storage (MinIO in development)."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        bucket: str,
+        use_ssl: bool,
+        max_pool_connections: int
+    ):
+        self.bucket = bucket
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            config=Config(
+                signature_version='s3v4',
+                # One connection per storage worker thread, kept alive between calls
+                max_pool_connections=max_pool_connections,
+                tcp_keepalive=True,
+                retries={'max_attempts': 3, 'mode': 'standard'}
+            ),
+            use_ssl=use_ssl
+        )
+
+    def ensure_bucket(self) -> None:
+        try:
+            self.client.head_bucket(Bucket=self.bucket)
+        except ClientError:
+            # Bucket doesn't exist, create it
+            try:
+                self.client.create_bucket(Bucket=self.bucket)
+            except ClientError as e:
+                # Bucket might have been created by another process
+                if e.response['Error']['Code'] != 'BucketAlreadyOwnedByYou':
+                    raise
+
+    def put_object(self, file_key: str, data: Data, content_type: Optional[str]) -> None:
+        extra_args = {'ContentType': content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=file_key, Body=data, **extra_args)
+
+    def create_multipart_upload(self, file_key: str, content_type: Optional[str]) -> str:
+        extra_args = {'ContentType': content_type} if content_type else {}
+        response = self.client.create_multipart_upload(Bucket=self.bucket, Key=file_key, **extra_args)
+        return response['UploadId']
+
+    def upload_part(self, file_key: str, upload_id: str, part_number: int, data: Data) -> Dict:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=file_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def complete_multipart_upload(self, file_key: str, upload_id: str, parts: List[Dict]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=file_key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+
+    def abort_multipart_upload(self, file_key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=file_key, UploadId=upload_id)
+
+    def get_object(self, file_key: str, byte_range: Optional[str] = None) -> Dict:
+        params = {'Bucket': self.bucket, 'Key': file_key}
+        if byte_range:
+            params['Range'] = byte_range
+        try:
+            response = self.client.get_object(**params)
+        except ClientError as e:
+            error = e.response.get('Error', {})
+            if error.get('Code') in _MISSING_CODES:
+                raise FileNotFoundError(file_key)
+            if error.get('Code') == 'InvalidRange':
+                object_size = error.get('ActualObjectSize')
+                raise InvalidRangeError(int(object_size) if object_size else None)
+            raise Exception(f"Error retrieving file: {str(e)}")
+
+        return {
+            "body": response['Body'],
+            "content_length": response.get('ContentLength'),
+            "content_range": response.get('ContentRange'),
+            "etag": response.get('ETag'),
+            "last_modified": response.get('LastModified'),
+            "content_type": response.get('ContentType'),
+        }
+
+    def head_object(self, file_key: str) -> Optional[Dict]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=file_key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in _MISSING_CODES:
+                return None
+            raise
+        return {
+            "size": response.get('ContentLength'),
+            "content_type": response.get('ContentType'),
+            "etag": response.get('ETag'),
+        }
+
+    def delete_object(self, file_key: str) -> bool:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=file_key)
+            return True
+        except ClientError:
+            return False
+
+    def list_objects(self, prefix: str, continuation_token: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        params = {'Bucket': self.bucket, 'Prefix': prefix, 'MaxKeys': MAX_KEYS_PER_REQUEST}
+        if continuation_token:
+            params['ContinuationToken'] = continuation_token
+        response = self.client.list_objects_v2(**params)
+        objects = [
+            {"key": item['Key'], "size": item['Size'], "last_modified": item['LastModified']}
+            for item in response.get('Contents', [])
+        ]
+        next_token = response.get('NextContinuationToken') if response.get('IsTruncated') else None
+        return objects, next_token
+
+    def delete_objects(self, file_keys: List[str]) -> List[str]:
+        if not file_keys:
+            return []
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={'Objects': [{'Key': key} for key in file_keys], 'Quiet': True}
+        )
+        return [error['Key'] for error in response.get('Errors', [])]
+
+    def presigned_get_url(self, file_key: str, expiration: int) -> str:
+        try:
+            return self.client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.bucket, 'Key': file_key},
+                ExpiresIn=expiration
+            )
+        except ClientError as e:
+            raise Exception(f"Error generating presigned URL: {str(e)}")
+
+    def presigned_post(self, file_key: str, content_type: str, max_size: int, expiration: int) -> Dict:
+        try:
+            return self.client.generate_presigned_post(
+                Bucket=self.bucket,
+                Key=file_key,
+                Fields={'Content-Type': content_type},
+                Conditions=[
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, max_size],
+                ],
+                ExpiresIn=expiration
+            )
+        except ClientError as e:
+            raise Exception(f"Error generating presigned POST: {str(e)}")
+
+
+class LocalBackend(StorageBackend):
+    """
+    Files in a local directory, for development and offline benchmarks.
+
+    Each object has a JSON sidecar holding its content type. Presigned
+    URLs point at the API's download endpoint; presigned uploads are not
+    supported.
+    """
+
+    supports_presigned_uploads = False
+
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+        self._uploads = self.root / ".multipart"
+
+    def _path(self, file_key: str) -> Path:
+        path = (self.root / file_key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid file key: {file_key}")
+        return path
+
+    @staticmethod
+    def _meta_path(path: Path) -> Path:
+        return path.with_name(f".{path.name}.meta")
+
+    def _write_meta(self, path: Path, content_type: Optional[str]) -> None:
+        self._meta_path(path).write_text(json.dumps({"content_type": content_type}))
+
+    def _read_meta(self, path: Path) -> Dict:
+        try:
+            return json.loads(self._meta_path(path).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_data(path: Path, data: Data) -> None:
+        if isinstance(data, bytes):
+            path.write_bytes(data)
+            return
+        with open(path, "wb") as out:
+            shutil.copyfileobj(data, out)
+
+    def ensure_bucket(self) -> None:
+        self._uploads.mkdir(parents=True, exist_ok=True)
+
+    def put_object(self, file_key: str, data: Data, content_type: Optional[str]) -> None:
+        path = self._path(file_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        self._write_data(tmp_path, data)
+        self._write_meta(path, content_type)
+        os.replace(tmp_path, path)
+
+    def create_multipart_upload(self, file_key: str, content_type: Optional[str]) -> str:
+        upload_id = uuid.uuid4().hex
+        upload_dir = self._uploads / upload_id
+        upload_dir.mkdir(parents=True)
+        (upload_dir / "content_type").write_text(content_type or "")
+        return upload_id
+
+    def upload_part(self, file_key: str, upload_id: str, part_number: int, data: Data) -> Dict:
+        self._write_data(self._uploads / upload_id / f"{part_number:05d}", data)
+        return {'PartNumber': part_number, 'ETag': f'"{upload_id}-{part_number}"'}
+
+    def complete_multipart_upload(self, file_key: str, upload_id: str, parts: List[Dict]) -> None:
+        upload_dir = self._uploads / upload_id
+        path = self._path(file_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{upload_id}.tmp")
+        with open(tmp_path, "wb") as out:
+            for part in sorted(parts, key=lambda p: p['PartNumber']):
+                with open(upload_dir / f"{part['PartNumber']:05d}", "rb") as part_file:
+                    shutil.copyfileobj(part_file, out)
+        self._write_meta(path, (upload_dir / "content_type").read_text() or None)
+        os.replace(tmp_path, path)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, file_key: str, upload_id: str) -> None:
+        shutil.rmtree(self._uploads / upload_id, ignore_errors=True)
+
+    def get_object(self, file_key: str, byte_range: Optional[str] = None) -> Dict:
+        path = self._path(file_key)
+        try:
+            body: BinaryIO = open(path, "rb")
+        except (FileNotFoundError, IsADirectoryError):
+            raise FileNotFoundError(file_key)
+        stat = os.fstat(body.fileno())
+        size = stat.st_size
+
+        start, end, content_range = 0, size - 1, None
+        match = _BYTE_RANGE.match(byte_range) if byte_range else None
+        # Like S3 (and RFC 9110), a syntactically invalid range such as
+        # bytes=5-2 is ignored: the whole object is returned
+        if match and (match.group(1) or match.group(2)) and not (
+            match.group(1) and match.group(2) and int(match.group(2)) < int(match.group(1))
+        ):
+            first, last = match.groups()
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            else:
+                start = max(size - int(last), 0)
+            if start >= size or start > end:
+                body.close()
+                raise InvalidRangeError(size)
+            body.seek(start)
+            content_range = f"bytes {start}-{end}/{size}"
+
+        length = end - start + 1
+        return {
+            "body": _BoundedReader(body, length),
+            "content_length": length,
+            "content_range": content_range,
+            "etag": f'"{stat.st_mtime_ns:x}-{size:x}"',
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            "content_type": self._read_meta(path).get("content_type"),
+        }
+
+    def head_object(self, file_key: str) -> Optional[Dict]:
+        path = self._path(file_key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return {
+            "size": stat.st_size,
+            "content_type": self._read_meta(path).get("content_type"),
+            "etag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+        }
+
+    def delete_object(self, file_key: str) -> bool:
+        path = self._path(file_key)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        self._meta_path(path).unlink(missing_ok=True)
+        return True
+
+    def list_objects(self, prefix: str, continuation_token: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        # The token is the last key of the previous page
+        keys = []
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            for filename in filenames:
+                if filename.startswith("."):
+                    continue
+                key = (Path(directory) / filename).relative_to(self.root).as_posix()
+                if key.startswith(prefix) and (continuation_token is None or key > continuation_token):
+                    keys.append(key)
+        keys.sort()
+
+        objects = []
+        for key in keys[:MAX_KEYS_PER_REQUEST]:
+            stat = (self.root / key).stat()
+            objects.append({
+                "key": key,
+                "size": stat.st_size,
+                "last_modified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            })
+        next_token = objects[-1]["key"] if len(keys) > MAX_KEYS_PER_REQUEST else None
+        return objects, next_token
+
+    def delete_objects(self, file_keys: List[str]) -> List[str]:
+        return [key for key in file_keys if not self.delete_object(key)]
+
+    def presigned_get_url(self, file_key: str, expiration: int) -> str:
+        return f"{self.base_url}/api/uploads/files/{file_key}"
+
+    def presigned_post(self, file_key: str, content_type: str, max_size: int, expiration: int) -> Dict:
+        raise NotImplementedError("Presigned uploads require the S3 storage backend")
+
+
+class _BoundedReader:
+    """File wrapper that stops reading after a byte limit (for ranges)."""
+
+    def __init__(self, file: BinaryIO, limit: int):
+        self._file = file
+        self._remaining = limit
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self._file.close()
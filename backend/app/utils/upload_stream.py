@@ -0,0 +1,123 @@
+"""Incremental parsing of multipart/form-data request bodies.
+
+Starlette's UploadFile spools the whole request body before the route runs.
+iter_multipart_file instead yields one file field's bytes as they arrive, so
+a route can forward them (e.g. to object storage) and reject oversized
+uploads without buffering the body.
+"""
+
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+@dataclass
+class FilePartHeader:
+    """Headers of the streamed file field; yielded before its data."""
+    filename: str
+    content_type: Optional[str]
+
+
+class _FieldCollector:
+    """python-multipart callbacks collecting the events of one file field."""
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.events: List[Union[FilePartHeader, bytes]] = []
+        self.found = False
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._in_field = False
+
+    def on_part_begin(self) -> None:
+        self._headers = []
+        self._in_field = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers.append((self._header_field.lower(), self._header_value))
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        if name != self.field_name or filename is None or self.found:
+            return
+        self.found = True
+        self._in_field = True
+        content_type = headers.get(b"content-type")
+        self.events.append(FilePartHeader(
+            filename=filename.decode("utf-8", errors="replace"),
+            content_type=content_type.decode("latin-1") if content_type else None,
+        ))
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field and end > start:
+            self.events.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        self._in_field = False
+
+
+async def iter_multipart_file(
+    request: Request,
+    field_name: str = "file"
+) -> AsyncIterator[Union[FilePartHeader, bytes]]:
+    """
+    Stream one file field of a multipart/form-data request.
+
+    Yields a FilePartHeader, then the field's content as byte chunks in the
+    order they arrive. Other fields are skipped.
+
+    Raises:
+        HTTPException: If the body is not multipart or has no such file field
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a multipart/form-data request"
+        )
+
+    collector = _FieldCollector(field_name)
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": collector.on_part_begin,
+        "on_header_field": collector.on_header_field,
+        "on_header_value": collector.on_header_value,
+        "on_header_end": collector.on_header_end,
+        "on_headers_finished": collector.on_headers_finished,
+        "on_part_data": collector.on_part_data,
+        "on_part_end": collector.on_part_end,
+    })
+
+    async for chunk in request.stream():
+        try:
+            parser.write(chunk)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Malformed multipart body"
+            )
+        # Hand over what this chunk produced before reading the next one
+        events, collector.events = collector.events, []
+        for event in events:
+            yield event
+
+    parser.finalize()
+    if not collector.found:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing file field '{field_name}'"
+        )
@@ -0,0 +1,132 @@
+"""Benchmark: blocking storage calls on the event loop vs the storage thread pool.
+
+Runs N concurrent "requests", each uploading a file with StreamingUpload and
+streaming it back with open_file_stream/iter_file_chunks, against the local
+filesystem backend in a temporary directory (no MinIO needed). --latency adds
+a simulated network round trip to every storage call.
+
+It runs once calling the backend directly on the event loop (the old
+behaviour) and once through app.utils.storage, which runs the calls in a
+bounded thread pool. A heartbeat task measures event-loop lag.
+
+Usage:
+    python benchmarks/storage_throughput.py --requests 50 --size-kb 512 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ.setdefault("STORAGE_LOCAL_PATH", tempfile.mkdtemp(prefix="storage-bench-"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import storage  # noqa: E402
+from app.utils.storage_backends import LocalBackend  # noqa: E402
+
+
+class SlowLocalBackend(LocalBackend):
+    """Local backend with a fixed delay per call, standing in for network latency."""
+
+    def __init__(self, root: str, latency: float):
+        super().__init__(root, base_url="")
+        self.latency = latency
+
+    def put_object(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super().put_object(*args, **kwargs)
+
+    def get_object(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super().get_object(*args, **kwargs)
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list) -> None:
+    """Record how late the event loop wakes this task up."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run_blocking(backend: LocalBackend, concurrency: int, payload: bytes) -> list:
+    async def request(i: int) -> float:
+        start = time.perf_counter()
+        # Blocks the event loop for every call, like the old storage module
+        backend.put_object(f"bench/blocking/{i}", payload, "application/octet-stream")
+        stream = backend.get_object(f"bench/blocking/{i}")
+        try:
+            while stream["body"].read(storage.DOWNLOAD_CHUNK_SIZE):
+                pass
+        finally:
+            stream["body"].close()
+        return time.perf_counter() - start
+
+    return await asyncio.gather(*(request(i) for i in range(concurrency)))
+
+
+async def run_pooled(backend: LocalBackend, concurrency: int, payload: bytes) -> list:
+    storage.storage_backend = backend
+
+    async def request(i: int) -> float:
+        start = time.perf_counter()
+        upload = storage.StreamingUpload(f"bench/pooled/{i}", "application/octet-stream")
+        await upload.write(payload)
+        await upload.complete()
+        stream = await storage.open_file_stream(f"bench/pooled/{i}")
+        async for _ in storage.iter_file_chunks(stream["body"]):
+            pass
+        return time.perf_counter() - start
+
+    return await asyncio.gather(*(request(i) for i in range(concurrency)))
+
+
+async def measure(name: str, runner, backend: LocalBackend, concurrency: int, payload: bytes) -> None:
+    stop = asyncio.Event()
+    lags: list = []
+    beat = asyncio.create_task(heartbeat(stop, 0.005, lags))
+
+    start = time.perf_counter()
+    latencies = await runner(backend, concurrency, payload)
+    wall = time.perf_counter() - start
+
+    stop.set()
+    await beat
+
+    latencies.sort()
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    throughput = concurrency * len(payload) * 2 / wall / (1024 * 1024)
+    print(
+        f"{name:<14} wall={wall * 1000:8.1f}ms  "
+        f"p50={statistics.median(latencies) * 1000:8.1f}ms  "
+        f"p95={p95 * 1000:8.1f}ms  "
+        f"max_loop_lag={max(lags, default=0) * 1000:8.1f}ms  "
+        f"throughput={throughput:7.1f}MB/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent requests")
+    parser.add_argument("--size-kb", type=int, default=512, help="File size per request")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Simulated latency per storage call")
+    args = parser.parse_args()
+
+    backend = SlowLocalBackend(storage.STORAGE_LOCAL_PATH, args.latency_ms / 1000)
+    backend.ensure_bucket()
+    payload = os.urandom(args.size_kb * 1024)
+
+    print(f"storage workers={storage.STORAGE_MAX_WORKERS}  root={storage.STORAGE_LOCAL_PATH}")
+    await measure("event loop", run_blocking, backend, args.requests, payload)
+    await measure("thread pool", run_pooled, backend, args.requests, payload)
+    storage.shutdown_storage()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
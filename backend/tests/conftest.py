@@ -0,0 +1,63 @@
+"""Test setup: the app against a temporary SQLite database (aiosqlite).
+
+The models use Postgres column types (UUID, JSONB); they are compiled to
+SQLite equivalents here. Postgres-only query features (JSONB containment and
+functions, regexp_replace) are not exercised by these tests, so neither are
+the endpoints built on them: publishing a job and saving a printer profile
+(job_matches). SQLite ignores FOR UPDATE SKIP LOCKED, so the bidding sweeper
+runs here without its row locking.
+"""
+
+import asyncio
+import os
+import tempfile
+
+# Configure before the app (and its engines) are imported
+_db_dir = tempfile.mkdtemp(prefix="printing-marketplace-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_LOCAL_PATH"] = os.path.join(_db_dir, "storage")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.dialects.postgresql import JSONB, UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid(type_, compiler, **kw):
+    return "CHAR(36)"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb(type_, compiler, **kw):
+    return "JSON"
+
+
+from app.main import app  # noqa: E402
+from app.persistence.database import Base, engine  # noqa: E402
+# Registers every model on Base.metadata
+from app import models  # noqa: E402,F401
+from app.services.identity import identity_cache  # noqa: E402
+
+
+async def _reset_database() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """Fresh tables (and no cached identities) for every test."""
+    asyncio.run(_reset_database())
+    identity_cache.clear()
+    yield
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client() -> TestClient:
+    # Not used as a context manager: startup hooks (storage, sweeper) stay off
+    return TestClient(app)
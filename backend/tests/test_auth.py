@@ -0,0 +1,123 @@
+"""Tests for token verification caching and token revocation."""
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+
+from app.models import RevokedToken
+from app.persistence.database import SessionLocal
+from app.services import token_revocation
+from app.services.token_revocation import BloomFilter, TokenRevocationList
+from app.utils import cache
+from app.utils.auth import create_access_token, token_cache, verify_token
+from app.utils.enums import UserRole
+
+
+def advance_cache_clock(monkeypatch, seconds: float) -> None:
+    """Make the caches see a monotonic clock that is seconds ahead."""
+    start = time.monotonic()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: start + seconds))
+
+
+def test_token_cache_entry_expires_with_token(monkeypatch):
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=30))
+    assert verify_token(token) is not None
+    cache_key = hashlib.sha256(token.encode()).digest()
+    assert token_cache.get(cache_key) is not None
+
+    # Well within TOKEN_CACHE_TTL_SECONDS, but past the token's exp
+    advance_cache_clock(monkeypatch, 31)
+    assert token_cache.get(cache_key) is None
+
+
+def test_token_cache_keeps_token_until_exp(monkeypatch):
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(hours=1))
+    assert verify_token(token) is not None
+    cache_key = hashlib.sha256(token.encode()).digest()
+
+    advance_cache_clock(monkeypatch, 30)
+    assert token_cache.get(cache_key) is not None
+
+
+def test_expired_token_is_rejected_and_not_cached():
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    assert verify_token(token) is None
+    assert token_cache.get(hashlib.sha256(token.encode()).digest()) is None
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.001)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    assert bloom.count == 1000
+
+    bloom.add("jti-0")
+    assert bloom.count == 1000
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 100
+
+
+async def revoke(revocations: TokenRevocationList, jti: str) -> None:
+    async with SessionLocal() as db:
+        await revocations.revoke(
+            db, jti=jti, user_id=None, expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
+        )
+        await db.commit()
+
+
+async def is_revoked(revocations: TokenRevocationList, jti: str) -> bool:
+    async with SessionLocal() as db:
+        return await revocations.is_revoked(db, jti)
+
+
+def test_revocation_is_visible_to_other_workers_after_sync(monkeypatch):
+    monkeypatch.setattr(token_revocation, "REVOCATION_SYNC_INTERVAL_SECONDS", 0)
+    worker_a, worker_b = TokenRevocationList(), TokenRevocationList()
+    assert not asyncio.run(is_revoked(worker_b, "revoked-jti"))
+
+    asyncio.run(revoke(worker_a, "revoked-jti"))
+    assert asyncio.run(is_revoked(worker_a, "revoked-jti"))
+    assert asyncio.run(is_revoked(worker_b, "revoked-jti"))
+    assert not asyncio.run(is_revoked(worker_b, "other-jti"))
+
+
+def test_sync_overlap_picks_up_late_commits(monkeypatch):
+    monkeypatch.setattr(token_revocation, "REVOCATION_SYNC_INTERVAL_SECONDS", 0)
+    worker = TokenRevocationList()
+    asyncio.run(revoke(TokenRevocationList(), "newer-jti"))
+    assert asyncio.run(is_revoked(worker, "newer-jti"))
+
+    # A revocation whose transaction started before newer-jti's but committed
+    # after the worker synced it: its revoked_at is older than the newest seen
+    async def commit_late_revocation():
+        async with SessionLocal() as db:
+            await db.execute(insert(RevokedToken).values(
+                jti="late-jti",
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+                revoked_at=worker._last_revoked_at - timedelta(seconds=10)
+            ))
+            await db.commit()
+
+    asyncio.run(commit_late_revocation())
+    assert asyncio.run(is_revoked(worker, "late-jti"))
+
+
+def test_logout_revokes_token(client):
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "customer@example.com", "role": UserRole.CUSTOMER.value, "company_name": "Acme"}
+    )
+    assert response.status_code == 201, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    response = client.get("/api/jobs", headers=headers)
+    assert response.status_code == 401
+    assert "revoked" in response.json()["detail"]
@@ -0,0 +1,106 @@
+"""Tests for the bidding sweeper."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.models import CustomerProfile, PrintingJob
+from app.persistence.database import SessionLocal
+from app.services.bidding_sweeper import (
+    BIDDING_SWEEPER_MAX_SLEEP_SECONDS,
+    BIDDING_SWEEPER_MIN_SLEEP_SECONDS,
+    BiddingSweeper,
+    close_expired_jobs_batch,
+)
+from app.services.open_job_index import open_job_index
+from app.utils.enums import JobState, ProductType
+
+
+async def job_states(job_ids: list) -> dict:
+    async with SessionLocal() as db:
+        jobs = (await db.execute(select(PrintingJob).where(PrintingJob.id.in_(job_ids)))).scalars()
+        return {job.id: (job.state, job.closed_at) for job in jobs}
+
+
+async def create_open_jobs(bidding_ends_at: list) -> list:
+    """Create one OPEN job per bidding deadline; returns their ids."""
+    async with SessionLocal() as db:
+        customer = CustomerProfile(company_name="Acme")
+        db.add(customer)
+        await db.flush()
+        now = datetime.now(timezone.utc)
+        jobs = [
+            PrintingJob(
+                customer_profile_id=customer.id,
+                product_type=ProductType.FLYERS.value,
+                quantity=100,
+                due_date=now + timedelta(days=7),
+                bidding_ends_at=ends_at,
+                published_at=now,
+                state=JobState.OPEN.value
+            )
+            for ends_at in bidding_ends_at
+        ]
+        db.add_all(jobs)
+        await db.commit()
+        return [job.id for job in jobs]
+
+
+def test_closed_jobs_leave_open_job_snapshot():
+    now = datetime.now(timezone.utc)
+    expired_id, open_id = asyncio.run(create_open_jobs([now - timedelta(hours=1), now + timedelta(hours=1)]))
+
+    async def load_and_sweep() -> list:
+        async with SessionLocal() as db:
+            await open_job_index.load(db)
+        return await close_expired_jobs_batch()
+
+    assert asyncio.run(load_and_sweep()) == [expired_id]
+    assert expired_id not in open_job_index._slots
+    assert open_id in open_job_index._slots
+
+
+def test_sweep_closes_expired_jobs():
+    now = datetime.now(timezone.utc)
+    job_ids = asyncio.run(create_open_jobs([
+        now - timedelta(days=1),
+        now - timedelta(minutes=1),
+        now - timedelta(minutes=1),
+        now + timedelta(hours=1),
+    ]))
+
+    assert asyncio.run(BiddingSweeper().sweep()) == 3
+    states = asyncio.run(job_states(job_ids))
+    for job_id in job_ids[:3]:
+        state, closed_at = states[job_id]
+        assert state == JobState.CLOSED.value
+        assert closed_at is not None
+    assert states[job_ids[3]] == (JobState.OPEN.value, None)
+
+    # Nothing left to close
+    assert asyncio.run(BiddingSweeper().sweep()) == 0
+
+
+def test_sleep_without_open_jobs_is_capped():
+    assert asyncio.run(BiddingSweeper()._sleep_seconds()) == BIDDING_SWEEPER_MAX_SLEEP_SECONDS
+
+
+def test_sleep_until_next_deadline():
+    now = datetime.now(timezone.utc)
+    asyncio.run(create_open_jobs([now + timedelta(seconds=60), now + timedelta(hours=1)]))
+
+    seconds = asyncio.run(BiddingSweeper()._sleep_seconds())
+    assert 55 < seconds <= 60
+
+
+def test_sleep_bounds():
+    now = datetime.now(timezone.utc)
+    past_id, future_id = asyncio.run(create_open_jobs([now - timedelta(minutes=5), now + timedelta(days=3)]))
+    sweeper = BiddingSweeper()
+
+    # A deadline that already passed (e.g. held by another worker's batch) does not busy-loop
+    assert asyncio.run(sweeper._sleep_seconds()) == BIDDING_SWEEPER_MIN_SLEEP_SECONDS
+
+    assert asyncio.run(close_expired_jobs_batch()) == [past_id]
+    assert asyncio.run(sweeper._sleep_seconds()) == BIDDING_SWEEPER_MAX_SLEEP_SECONDS
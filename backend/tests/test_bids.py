@@ -0,0 +1,333 @@
+"""Tests for the bid listing of a job."""
+
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import event, select
+
+from app.models import Agreement, Bid, PrinterProfile, PrintingJob, Rating, User
+from app.persistence.database import SessionLocal, engine
+from app.services.bidding import accept_bid, list_job_bids
+from app.services.open_job_index import open_job_index
+from app.utils.auth import create_access_token
+from app.utils.enums import BidStatus, JobState, ProductType, UserRole
+
+
+@contextmanager
+def count_queries():
+    """Count the statements sent to the database inside the block."""
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def signup_customer(client) -> dict:
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "customer@example.com", "role": UserRole.CUSTOMER.value, "company_name": "Acme"}
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_job_with_bids(num_bids: int) -> tuple:
+    """Create an OPEN job of the customer with one bid from each of num_bids printers."""
+    async with SessionLocal() as db:
+        customer = (await db.execute(
+            select(User).where(User.email == "customer@example.com")
+        )).scalars().one()
+        now = datetime.now(timezone.utc)
+        job = PrintingJob(
+            customer_profile_id=customer.customer_profile_id,
+            product_type=ProductType.FLYERS.value,
+            quantity=100,
+            due_date=now + timedelta(days=7),
+            bidding_ends_at=now + timedelta(hours=1),
+            state=JobState.OPEN.value
+        )
+        rated_job = PrintingJob(
+            customer_profile_id=customer.customer_profile_id,
+            product_type=ProductType.FLYERS.value,
+            quantity=100,
+            due_date=now,
+            state=JobState.COMPLETED.value
+        )
+        db.add_all([job, rated_job])
+
+        suffix = f"{num_bids}-{now.timestamp()}"
+        printers = [
+            User(email=f"printer-{suffix}-{i}@example.com", role=UserRole.PRINTER.value)
+            for i in range(num_bids)
+        ]
+        db.add_all(printers)
+        await db.flush()
+        profiles = [
+            PrinterProfile(
+                user_id=printer.id,
+                business_name=f"Printer {i}",
+                supported_product_types=[ProductType.FLYERS.value],
+                payment_terms="Net 30"
+            )
+            for i, printer in enumerate(printers)
+        ]
+        db.add_all(profiles)
+        await db.flush()
+        db.add_all(
+            Bid(
+                job_id=job.id,
+                printer_id=printer.id,
+                price=Decimal(100 + i),
+                estimated_turnaround_days=3,
+                payment_terms="Net 30"
+            )
+            for i, printer in enumerate(printers)
+        )
+        db.add(Rating(job_id=rated_job.id, printer_profile_id=profiles[0].id, customer_id=customer.id, rating=4))
+        await db.commit()
+        return job.id, job.uuid
+
+
+def test_list_job_bids_returns_printer_and_rating(client):
+    headers = signup_customer(client)
+    _, job_uuid = asyncio.run(create_job_with_bids(3))
+
+    response = client.get(f"/api/jobs/{job_uuid}/bids", headers=headers)
+
+    assert response.status_code == 200, response.text
+    bids = response.json()
+    assert [bid["price"] for bid in bids] == ["100.00", "101.00", "102.00"]
+    assert bids[0]["printer_business_name"] == "Printer 0"
+    assert bids[0]["printer_rating"]["rating_count"] == 1
+    assert bids[0]["printer_rating"]["average_rating"] == 4.0
+    assert bids[1]["printer_rating"]["rating_count"] == 0
+    assert bids[1]["printer_rating"]["average_rating"] is None
+
+
+def test_list_job_bids_query_count_is_constant(client):
+    headers = signup_customer(client)
+    _, one_bid_job_uuid = asyncio.run(create_job_with_bids(1))
+    _, many_bids_job_uuid = asyncio.run(create_job_with_bids(25))
+    # Warm the identity cache so both requests authenticate the same way
+    client.get(f"/api/jobs/{one_bid_job_uuid}/bids", headers=headers)
+
+    with count_queries() as one_bid:
+        response = client.get(f"/api/jobs/{one_bid_job_uuid}/bids", headers=headers)
+    assert len(response.json()) == 1
+
+    with count_queries() as many_bids:
+        response = client.get(f"/api/jobs/{many_bids_job_uuid}/bids", headers=headers)
+    assert len(response.json()) == 25
+
+    assert one_bid["queries"] == many_bids["queries"]
+
+
+def test_list_job_bids_service_uses_one_query(client):
+    signup_customer(client)
+
+    async def list_bids(num_bids: int) -> tuple:
+        job_id, _ = await create_job_with_bids(num_bids)
+        async with SessionLocal() as db:
+            with count_queries() as counter:
+                bids = await list_job_bids(db, job_id)
+        return len(bids), counter["queries"]
+
+    assert asyncio.run(list_bids(1)) == (1, 1)
+    assert asyncio.run(list_bids(25)) == (25, 1)
+
+
+def test_list_job_bids_only_for_the_owning_customer(client):
+    signup_customer(client)
+    _, job_uuid = asyncio.run(create_job_with_bids(1))
+    other = client.post(
+        "/api/auth/signup",
+        json={"email": "other@example.com", "role": UserRole.CUSTOMER.value, "company_name": "Other"}
+    ).json()["access_token"]
+
+    response = client.get(f"/api/jobs/{job_uuid}/bids", headers={"Authorization": f"Bearer {other}"})
+
+    assert response.status_code == 404
+
+
+def test_accepted_job_leaves_open_job_snapshot(client):
+    signup_customer(client)
+    job_id, job_uuid = asyncio.run(create_job_with_bids(2))
+
+    async def accept() -> None:
+        async with SessionLocal() as db:
+            await open_job_index.load(db)
+            assert job_id in open_job_index._slots
+            customer = (await db.execute(
+                select(User).where(User.email == "customer@example.com")
+            )).scalars().one()
+            bid_uuid = (await db.execute(select(Bid.uuid).where(Bid.job_id == job_id))).scalars().first()
+            await accept_bid(db, job_uuid, bid_uuid, customer.id, customer.customer_profile_id)
+
+    asyncio.run(accept())
+
+    assert job_id not in open_job_index._slots
+
+
+async def create_printer(email: str = "printer@example.com") -> int:
+    """Create a printer with a profile; returns the user id."""
+    async with SessionLocal() as db:
+        printer = User(email=email, role=UserRole.PRINTER.value)
+        db.add(printer)
+        await db.flush()
+        db.add(PrinterProfile(
+            user_id=printer.id,
+            business_name="Printer",
+            supported_product_types=[ProductType.FLYERS.value],
+            payment_terms="Net 30"
+        ))
+        await db.commit()
+        return printer.id
+
+
+async def create_job(state: JobState, bidding_ends_at: datetime) -> str:
+    """Create a job of the customer in the given state; returns its uuid."""
+    async with SessionLocal() as db:
+        customer = (await db.execute(
+            select(User).where(User.email == "customer@example.com")
+        )).scalars().one()
+        job = PrintingJob(
+            customer_profile_id=customer.customer_profile_id,
+            product_type=ProductType.FLYERS.value,
+            quantity=100,
+            due_date=datetime.now(timezone.utc) + timedelta(days=7),
+            bidding_ends_at=bidding_ends_at,
+            state=state.value
+        )
+        db.add(job)
+        await db.commit()
+        return job.uuid
+
+
+async def job_bids(job_uuid: str) -> list:
+    async with SessionLocal() as db:
+        return (await db.execute(
+            select(Bid).join(PrintingJob, PrintingJob.id == Bid.job_id).where(PrintingJob.uuid == job_uuid)
+        )).scalars().all()
+
+
+def bearer(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def test_rebid_updates_existing_bid(client):
+    signup_customer(client)
+    headers = bearer(asyncio.run(create_printer()))
+    job_uuid = asyncio.run(create_job(JobState.OPEN, datetime.now(timezone.utc) + timedelta(hours=1)))
+
+    response = client.put(
+        f"/api/jobs/{job_uuid}/bid", headers=headers, json={"price": "120.00", "estimated_turnaround_days": 5}
+    )
+    assert response.status_code == 201, response.text
+    bid = response.json()
+    assert bid["payment_terms"] == "Net 30"
+    assert bid["updated_at"] is None
+
+    response = client.put(
+        f"/api/jobs/{job_uuid}/bid",
+        headers=headers,
+        json={"price": "99.50", "estimated_turnaround_days": 3, "notes": "Rush"}
+    )
+    assert response.status_code == 200, response.text
+    rebid = response.json()
+    assert rebid["uuid"] == bid["uuid"]
+    assert rebid["price"] == "99.50"
+    assert rebid["estimated_turnaround_days"] == 3
+    assert rebid["notes"] == "Rush"
+    assert rebid["updated_at"] is not None
+
+    bids = asyncio.run(job_bids(job_uuid))
+    assert len(bids) == 1
+    assert bids[0].price == Decimal("99.50")
+
+
+def test_bid_on_job_that_is_not_open_is_rejected(client):
+    signup_customer(client)
+    headers = bearer(asyncio.run(create_printer()))
+    now = datetime.now(timezone.utc)
+    bid = {"price": "100.00", "estimated_turnaround_days": 3}
+
+    draft_uuid = asyncio.run(create_job(JobState.DRAFT, now + timedelta(hours=1)))
+    response = client.put(f"/api/jobs/{draft_uuid}/bid", headers=headers, json=bid)
+    assert response.status_code == 404
+
+    closed_uuid = asyncio.run(create_job(JobState.CLOSED, now - timedelta(hours=1)))
+    response = client.put(f"/api/jobs/{closed_uuid}/bid", headers=headers, json=bid)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Bidding on this job is closed"
+
+    # Still OPEN, but the window ended before the sweeper closed it
+    expired_uuid = asyncio.run(create_job(JobState.OPEN, now - timedelta(minutes=1)))
+    response = client.put(f"/api/jobs/{expired_uuid}/bid", headers=headers, json=bid)
+    assert response.status_code == 409
+
+    for job_uuid in (draft_uuid, closed_uuid, expired_uuid):
+        assert asyncio.run(job_bids(job_uuid)) == []
+
+
+def test_accept_bid(client):
+    headers = signup_customer(client)
+    job_id, job_uuid = asyncio.run(create_job_with_bids(3))
+    bids = sorted(asyncio.run(job_bids(job_uuid)), key=lambda bid: bid.price)
+    accepted = bids[1]
+
+    response = client.post(f"/api/jobs/{job_uuid}/bids/{accepted.uuid}/accept", headers=headers)
+
+    assert response.status_code == 201, response.text
+    agreement = response.json()
+    assert agreement["job_id"] == job_id
+    assert agreement["bid_id"] == accepted.id
+    assert agreement["printer_id"] == accepted.printer_id
+    assert agreement["agreed_price"] == "101.00"
+    assert agreement["payment_terms"] == "Net 30"
+    assert agreement["customer_confirmed"] is True
+
+    statuses = {bid.uuid: (bid.status, bid.accepted_at) for bid in asyncio.run(job_bids(job_uuid))}
+    assert statuses[accepted.uuid][0] == BidStatus.ACCEPTED.value
+    assert statuses[accepted.uuid][1] is not None
+    for bid in (bids[0], bids[2]):
+        assert statuses[bid.uuid] == (BidStatus.LOST.value, None)
+
+    async def job_state() -> str:
+        async with SessionLocal() as db:
+            return (await db.execute(select(PrintingJob.state).where(PrintingJob.id == job_id))).scalar()
+    assert asyncio.run(job_state()) == JobState.IN_PROGRESS.value
+
+    async def agreement_count() -> int:
+        async with SessionLocal() as db:
+            return len((await db.execute(select(Agreement).where(Agreement.job_id == job_id))).all())
+    assert asyncio.run(agreement_count()) == 1
+
+
+def test_second_accept_is_rejected(client):
+    headers = signup_customer(client)
+    job_id, job_uuid = asyncio.run(create_job_with_bids(2))
+    first, second = asyncio.run(job_bids(job_uuid))
+
+    response = client.post(f"/api/jobs/{job_uuid}/bids/{first.uuid}/accept", headers=headers)
+    assert response.status_code == 201, response.text
+
+    for bid in (first, second):
+        response = client.post(f"/api/jobs/{job_uuid}/bids/{bid.uuid}/accept", headers=headers)
+        assert response.status_code == 409
+        assert response.json()["detail"] == f"Cannot accept a bid on a job in {JobState.IN_PROGRESS.value} state"
+
+    # The losing printer can no longer change its bid either
+    response = client.put(
+        f"/api/jobs/{job_uuid}/bid",
+        headers=bearer(second.printer_id),
+        json={"price": "50.00", "estimated_turnaround_days": 1}
+    )
+    assert response.status_code == 409
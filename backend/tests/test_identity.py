@@ -0,0 +1,124 @@
+"""Tests for the cached identity of authenticated users."""
+
+import asyncio
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+
+from app.models import User
+from app.persistence.database import SessionLocal, engine
+from app.services.identity import identity_cache
+from app.utils.enums import ProductType, UserRole
+from app.utils.metrics import metrics
+
+
+@contextmanager
+def count_user_queries():
+    """Count the statements reading the users table inside the block."""
+    counter = {"queries": 0}
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if "FROM users" in statement:
+            counter["queries"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def signup_customer(client) -> dict:
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "customer@example.com", "role": UserRole.CUSTOMER.value, "company_name": "Acme"}
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def customer_id() -> int:
+    async with SessionLocal() as db:
+        return (await db.execute(
+            select(User.id).where(User.email == "customer@example.com")
+        )).scalar_one()
+
+
+async def update_customer(**values) -> None:
+    async with SessionLocal() as db:
+        user = (await db.execute(
+            select(User).where(User.email == "customer@example.com")
+        )).scalars().one()
+        for key, value in values.items():
+            setattr(user, key, value)
+        await db.commit()
+
+
+async def delete_customer() -> None:
+    async with SessionLocal() as db:
+        user = (await db.execute(
+            select(User).where(User.email == "customer@example.com")
+        )).scalars().one()
+        await db.delete(user)
+        await db.commit()
+
+
+def create_job(client, headers):
+    return client.post(
+        "/api/jobs",
+        headers=headers,
+        json={"product_type": ProductType.FLYERS.value, "quantity": 100, "due_date": "2030-01-01T00:00:00Z"}
+    )
+
+
+def test_identity_is_cached(client):
+    headers = signup_customer(client)
+    assert client.get("/api/jobs", headers=headers).status_code == 200
+    user_id = asyncio.run(customer_id())
+    assert identity_cache.get(user_id) is not None
+
+    hits = metrics.counter("identity_cache_hits").value
+    with count_user_queries() as counter:
+        response = client.get("/api/jobs", headers=headers)
+    assert response.status_code == 200
+    assert counter["queries"] == 0
+    assert metrics.counter("identity_cache_hits").value == hits + 1
+
+
+def test_role_change_invalidates_identity(client):
+    headers = signup_customer(client)
+    assert create_job(client, headers).status_code == 201
+
+    asyncio.run(update_customer(role=UserRole.PRINTER.value))
+    assert identity_cache.get(asyncio.run(customer_id())) is None
+
+    # Authorized as a printer, not as the cached customer
+    response = create_job(client, headers)
+    assert response.status_code == 403
+
+
+def test_unrelated_user_change_keeps_identity(client):
+    headers = signup_customer(client)
+    client.get("/api/jobs", headers=headers)
+    user_id = asyncio.run(customer_id())
+
+    asyncio.run(update_customer(email="renamed@example.com"))
+    assert identity_cache.get(user_id) is not None
+
+
+def test_customer_profile_change_invalidates_identity(client):
+    headers = signup_customer(client)
+    client.get("/api/jobs", headers=headers)
+
+    asyncio.run(update_customer(customer_profile_id=None))
+    response = client.get("/api/jobs", headers=headers)
+    assert response.status_code == 404
+
+
+def test_deleted_user_is_not_served_from_cache(client):
+    headers = signup_customer(client)
+    client.get("/api/jobs", headers=headers)
+
+    asyncio.run(delete_customer())
+    response = client.get("/api/jobs", headers=headers)
+    assert response.status_code == 401
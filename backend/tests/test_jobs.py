@@ -0,0 +1,119 @@
+"""Tests for the printer's feed of matching jobs (GET /api/jobs/matching)."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.api import jobs as jobs_api
+from app.models import CustomerProfile, JobMatch, PrinterProfile, PrintingJob, User
+from app.persistence.database import SessionLocal
+from app.services.open_job_index import OpenJobIndex
+from app.utils.enums import JobState, ProductType, UserRole
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def signup(client, email: str, role: UserRole, company_name: str = None) -> dict:
+    response = client.post("/api/auth/signup", json={"email": email, "role": role.value, "company_name": company_name})
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_matched_jobs(printer_email: str) -> list:
+    """
+    Give the printer a profile and matches to OPEN jobs (two of them created
+    at the same instant) and a CLOSED one; returns the OPEN job uuids, newest first.
+    """
+    async with SessionLocal() as db:
+        printer = (await db.execute(select(User).where(User.email == printer_email))).scalars().one()
+        db.add(PrinterProfile(
+            user_id=printer.id,
+            business_name="Printer",
+            supported_product_types=[ProductType.FLYERS.value],
+            payment_terms="Net 30"
+        ))
+        customer = CustomerProfile(company_name="Acme")
+        db.add(customer)
+        await db.flush()
+
+        start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        created_at = [start, start + timedelta(minutes=1), start + timedelta(minutes=1), start + timedelta(minutes=2),
+                      start + timedelta(minutes=3)]
+        jobs = [
+            PrintingJob(
+                customer_profile_id=customer.id,
+                product_type=ProductType.FLYERS.value,
+                quantity=100,
+                due_date=start + timedelta(days=7),
+                state=JobState.OPEN.value,
+                created_at=created
+            )
+            for created in created_at
+        ]
+        closed = PrintingJob(
+            customer_profile_id=customer.id,
+            product_type=ProductType.FLYERS.value,
+            quantity=100,
+            due_date=start + timedelta(days=7),
+            state=JobState.CLOSED.value,
+            created_at=start + timedelta(minutes=2)
+        )
+        db.add_all([*jobs, closed])
+        await db.flush()
+        db.add_all(
+            JobMatch(printer_id=printer.id, job_id=job.id, job_created_at=job.created_at)
+            for job in [*jobs, closed]
+        )
+        await db.commit()
+        newest_first = sorted(jobs, key=lambda job: (job.created_at, job.id), reverse=True)
+        return [job.uuid for job in newest_first]
+
+
+def fetch_all_pages(client, headers: dict, limit: int) -> list:
+    pages = []
+    params = {"limit": limit}
+    while True:
+        response = client.get("/api/jobs/matching", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        pages.append([job["uuid"] for job in response.json()])
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if next_cursor is None:
+            return pages
+        params = {"limit": limit, "cursor": next_cursor}
+
+
+@pytest.mark.parametrize("engine", ["table", "columnar"])
+def test_matching_jobs_keyset_pagination(client, monkeypatch, engine):
+    monkeypatch.setattr(jobs_api, "MATCHING_ENGINE", engine)
+    monkeypatch.setattr(jobs_api, "open_job_index", OpenJobIndex())
+    headers = signup(client, "printer@example.com", UserRole.PRINTER)
+    expected = asyncio.run(create_matched_jobs("printer@example.com"))
+
+    pages = fetch_all_pages(client, headers, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [uuid for page in pages for uuid in page] == expected
+
+    # A page that exactly fits the remaining jobs is the last one
+    response = client.get("/api/jobs/matching", headers=headers, params={"limit": len(expected)})
+    assert [job["uuid"] for job in response.json()] == expected
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_matching_jobs_invalid_cursor(client):
+    headers = signup(client, "printer@example.com", UserRole.PRINTER)
+    asyncio.run(create_matched_jobs("printer@example.com"))
+
+    response = client.get("/api/jobs/matching", headers=headers, params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+def test_matching_is_not_routed_as_a_job_uuid(client):
+    headers = signup(client, "customer@example.com", UserRole.CUSTOMER, company_name="Acme")
+
+    response = client.get("/api/jobs/matching", headers=headers)
+
+    # The printer-only matching route, not "job not found"
+    assert response.status_code == 403
@@ -0,0 +1,157 @@
+"""Tests for the columnar snapshot of OPEN jobs."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.api.jobs import job_matches_printer
+from app.models import CustomerProfile, PrinterProfile, PrintingJob
+from app.persistence.database import SessionLocal
+from app.services.matching import locations_overlap, normalize_location
+from app.services.open_job_index import OpenJobIndex
+from app.utils.enums import JobState, ProductType
+
+JOBS = [
+    # product type, quantity, delivery location, state
+    (ProductType.FLYERS, 500, "Tel-Aviv, Israel", JobState.OPEN),
+    (ProductType.FLYERS, 500, None, JobState.OPEN),
+    (ProductType.FLYERS, 500, "Haifa", JobState.OPEN),
+    (ProductType.FLYERS, 500, "-", JobState.OPEN),
+    (ProductType.FLYERS, 50, "Tel Aviv", JobState.OPEN),
+    (ProductType.FLYERS, 5000, "Tel Aviv", JobState.OPEN),
+    (ProductType.BROCHURES, 500, "Tel Aviv", JobState.OPEN),
+    (ProductType.FLYERS, 500, "Tel Aviv", JobState.DRAFT),
+]
+
+
+def printer_profile(**fields) -> PrinterProfile:
+    defaults = dict(
+        user_id=1,
+        business_name="Printer",
+        supported_product_types=[ProductType.FLYERS.value],
+        min_quantity=100,
+        max_quantity=1000,
+        service_areas=["tel aviv"]
+    )
+    return PrinterProfile(**{**defaults, **fields})
+
+
+async def create_jobs() -> list:
+    async with SessionLocal() as db:
+        customer = CustomerProfile(company_name="Acme")
+        db.add(customer)
+        await db.flush()
+        now = datetime.now(timezone.utc)
+        jobs = [
+            PrintingJob(
+                customer_profile_id=customer.id,
+                product_type=product_type.value,
+                quantity=quantity,
+                due_date=now + timedelta(days=7),
+                delivery_location=delivery_location,
+                state=state.value,
+                created_at=now + timedelta(minutes=i)
+            )
+            for i, (product_type, quantity, delivery_location, state) in enumerate(JOBS)
+        ]
+        db.add_all(jobs)
+        await db.commit()
+        return jobs
+
+
+async def match(index: OpenJobIndex, profile: PrinterProfile) -> list:
+    async with SessionLocal() as db:
+        return (await index.match(db, profile)).tolist()
+
+
+def expected_ids(jobs: list, profile: PrinterProfile) -> list:
+    matching = [
+        job for job in jobs
+        if job.state == JobState.OPEN.value and job_matches_printer(job, profile)
+    ]
+    return [job.id for job in sorted(matching, key=lambda job: job.created_at, reverse=True)]
+
+
+def test_match_follows_matching_rules():
+    jobs = asyncio.run(create_jobs())
+    index = OpenJobIndex()
+
+    for profile in (
+        printer_profile(),
+        printer_profile(service_areas=None),
+        printer_profile(service_areas=["Israel", "Haifa"]),
+        printer_profile(min_quantity=None, max_quantity=None, service_areas=[]),
+        printer_profile(supported_product_types=[ProductType.BROCHURES.value, ProductType.FLYERS.value]),
+        printer_profile(supported_product_types=[]),
+    ):
+        assert asyncio.run(match(index, profile)) == expected_ids(jobs, profile)
+
+    # Tel Aviv jobs of 100..1000 flyers, and the job without a location
+    assert asyncio.run(match(index, printer_profile())) == [jobs[1].id, jobs[0].id]
+
+
+def test_apply_keeps_snapshot_in_sync():
+    jobs = asyncio.run(create_jobs())
+    index = OpenJobIndex()
+    profile = printer_profile()
+    assert asyncio.run(match(index, profile)) == [jobs[1].id, jobs[0].id]
+
+    draft = jobs[-1]
+    draft.state = JobState.OPEN.value
+    index.apply(draft)
+    jobs[0].state = JobState.CLOSED.value
+    index.apply(jobs[0])
+    index.discard([jobs[1].id])
+
+    assert asyncio.run(match(index, profile)) == [draft.id]
+
+
+def test_page_applies_cursor_and_skips_closed_jobs():
+    jobs = asyncio.run(create_jobs())
+    index = OpenJobIndex()
+    profile = printer_profile(min_quantity=None, max_quantity=None, service_areas=None)
+    expected = expected_ids(jobs, profile)
+    assert len(expected) == 6
+
+    async def close_in_database(job_id: int) -> None:
+        # Closed by another worker: still in this snapshot
+        async with SessionLocal() as db:
+            await db.execute(update(PrintingJob).where(PrintingJob.id == job_id).values(state=JobState.CLOSED.value))
+            await db.commit()
+
+    async def pages(limit: int) -> list:
+        result = []
+        cursor = None
+        async with SessionLocal() as db:
+            while True:
+                page, cursor = await index.page(db, profile, cursor, limit)
+                assert len(page) <= limit
+                result.append([job.id for job in page])
+                if cursor is None:
+                    return result
+
+    assert asyncio.run(pages(4)) == [expected[:4], expected[4:]]
+
+    asyncio.run(close_in_database(expected[1]))
+    open_ids = [job_id for job_id in expected if job_id != expected[1]]
+    assert asyncio.run(pages(2)) == [open_ids[:2], open_ids[2:4], open_ids[4:]]
+
+
+def test_location_mask_matches_overlap_rule():
+    locations = [
+        "Tel Aviv", "Tel-Aviv, Israel", "Aviv Tel", "Israel", "Haifa, Israel", "New York",
+        "York", "Yorkshire", "New York City", "tel tel aviv", "-", "Ramat Gan, Tel Aviv District",
+    ]
+    areas = ["tel aviv", "Israel", "york", "New York City, USA", "aviv", "gan", "!!", "Tel Aviv District"]
+    index = OpenJobIndex()
+    for job_id, location in enumerate(locations + [None], start=1):
+        index._upsert(job_id, ProductType.FLYERS.value, 1, location, None)
+
+    for area_set in [[area] for area in areas] + [areas[:3], areas[3:], [1, "York"]]:
+        mask = index._location_mask(area_set)
+        normalized_areas = [normalize_location(area) for area in area_set if isinstance(area, str)]
+        assert mask[0]
+        for code, location in enumerate(index._locations[1:], start=1):
+            expected = any(locations_overlap(location, area) for area in normalized_areas)
+            assert mask[code] == expected, (location, area_set)
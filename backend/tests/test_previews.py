@@ -0,0 +1,67 @@
+"""Tests for preview rendering of uploaded print files."""
+
+import asyncio
+import io
+
+from PIL import Image
+
+from app.services import previews
+from app.services.previews import generate_preview, preview_key
+from app.utils.previews import render_preview
+from app.utils.storage import storage_backend
+
+
+def preview_image(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    assert image.format == "JPEG"
+    return image
+
+
+def test_render_image_preview(tmp_path):
+    path = tmp_path / "flyer.png"
+    # Transparent PNG: flattened onto white
+    Image.new("RGBA", (1200, 600), (255, 0, 0, 0)).save(path)
+
+    image = preview_image(render_preview(str(path), ".png", 256))
+
+    assert image.size == (256, 128)
+    assert image.mode == "RGB"
+    assert image.getpixel((10, 10)) == (255, 255, 255)
+
+
+def test_render_pdf_preview(tmp_path):
+    path = tmp_path / "brochure.pdf"
+    Image.new("RGB", (600, 900), (0, 0, 255)).save(path, format="PDF")
+
+    image = preview_image(render_preview(str(path), ".pdf", 300))
+
+    assert max(image.size) == 300
+    assert image.size[0] < image.size[1]
+    red, green, blue = image.getpixel((100, 100))
+    assert blue > 200 and red < 50 and green < 50
+
+
+def test_render_unsupported_type(tmp_path):
+    path = tmp_path / "artwork.ai"
+    path.write_bytes(b"%!PS-Adobe")
+
+    assert render_preview(str(path), ".ai", 256) is None
+
+
+def test_generate_preview_stores_jpeg():
+    file_key = "users/1/flyer.jpg"
+    output = io.BytesIO()
+    Image.new("RGB", (2000, 1000), (0, 128, 0)).save(output, format="JPEG")
+    storage_backend.put_object(file_key, output.getvalue(), "image/jpeg")
+
+    try:
+        asyncio.run(generate_preview(file_key))
+    finally:
+        previews.shutdown_previews()
+
+    stored = storage_backend.get_object(preview_key(file_key))
+    try:
+        image = preview_image(stored["body"].read())
+    finally:
+        stored["body"].close()
+    assert max(image.size) == previews.PREVIEW_MAX_SIZE
@@ -0,0 +1,170 @@
+"""Tests for the incrementally maintained printer rating summaries."""
+
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.models import CustomerProfile, PrinterProfile, PrintingJob, Rating, User
+from app.persistence.database import SessionLocal
+from app.services.rating_summaries import get_rating_summaries
+from app.utils.enums import JobState, ProductType, UserRole
+
+
+async def create_printers_and_jobs(num_printers: int, num_jobs: int) -> tuple:
+    """Create a customer, printers and COMPLETED jobs; returns (customer id, profiles, job ids)."""
+    async with SessionLocal() as db:
+        customer_profile = CustomerProfile(company_name="Acme")
+        db.add(customer_profile)
+        await db.flush()
+        customer = User(email="customer@example.com", role=UserRole.CUSTOMER.value, customer_profile_id=customer_profile.id)
+        printers = [User(email=f"printer-{i}@example.com", role=UserRole.PRINTER.value) for i in range(num_printers)]
+        jobs = [
+            PrintingJob(
+                customer_profile_id=customer_profile.id,
+                product_type=ProductType.FLYERS.value,
+                quantity=100,
+                due_date=datetime.now(timezone.utc),
+                state=JobState.COMPLETED.value
+            )
+            for _ in range(num_jobs)
+        ]
+        db.add_all([customer, *printers, *jobs])
+        await db.flush()
+        profiles = [
+            PrinterProfile(
+                user_id=printer.id,
+                business_name=f"Printer {i}",
+                supported_product_types=[ProductType.FLYERS.value],
+                payment_terms="Net 30"
+            )
+            for i, printer in enumerate(printers)
+        ]
+        db.add_all(profiles)
+        await db.commit()
+        return customer.id, [(profile.id, profile.uuid) for profile in profiles], [job.id for job in jobs]
+
+
+async def add_ratings(customer_id: int, ratings: list) -> None:
+    """Add (job id, printer profile id, stars) ratings."""
+    async with SessionLocal() as db:
+        db.add_all(
+            Rating(job_id=job_id, printer_profile_id=profile_id, customer_id=customer_id, rating=stars)
+            for job_id, profile_id, stars in ratings
+        )
+        await db.commit()
+
+
+async def update_rating(job_id: int, **values) -> None:
+    async with SessionLocal() as db:
+        rating = (await db.execute(select(Rating).where(Rating.job_id == job_id))).scalars().one()
+        for key, value in values.items():
+            setattr(rating, key, value)
+        await db.commit()
+
+
+async def delete_rating(job_id: int) -> None:
+    async with SessionLocal() as db:
+        rating = (await db.execute(select(Rating).where(Rating.job_id == job_id))).scalars().one()
+        await db.delete(rating)
+        await db.commit()
+
+
+async def summaries(profile_uuids: list) -> dict:
+    async with SessionLocal() as db:
+        return {
+            summary.printer_profile_uuid: summary
+            for summary in await get_rating_summaries(db, profile_uuids)
+        }
+
+
+def stars(**counts) -> dict:
+    return {i: counts.get(f"s{i}", 0) for i in range(1, 6)}
+
+
+def test_summary_counts_new_ratings():
+    customer_id, [(profile_id, profile_uuid)], job_ids = asyncio.run(create_printers_and_jobs(1, 3))
+    asyncio.run(add_ratings(customer_id, [(job_ids[0], profile_id, 5), (job_ids[1], profile_id, 4), (job_ids[2], profile_id, 5)]))
+
+    summary = asyncio.run(summaries([profile_uuid]))[profile_uuid]
+    assert summary.rating_count == 3
+    assert summary.average_rating == 4.67
+    assert summary.stars == stars(s4=1, s5=2)
+
+
+def test_updated_rating_moves_between_stars():
+    customer_id, [(profile_id, profile_uuid)], job_ids = asyncio.run(create_printers_and_jobs(1, 2))
+    asyncio.run(add_ratings(customer_id, [(job_ids[0], profile_id, 5), (job_ids[1], profile_id, 3)]))
+
+    asyncio.run(update_rating(job_ids[1], rating=1))
+
+    summary = asyncio.run(summaries([profile_uuid]))[profile_uuid]
+    assert summary.rating_count == 2
+    assert summary.average_rating == 3.0
+    assert summary.stars == stars(s1=1, s5=1)
+
+
+def test_feedback_only_update_keeps_summary():
+    customer_id, [(profile_id, profile_uuid)], job_ids = asyncio.run(create_printers_and_jobs(1, 1))
+    asyncio.run(add_ratings(customer_id, [(job_ids[0], profile_id, 4)]))
+
+    asyncio.run(update_rating(job_ids[0], feedback="Great colors"))
+
+    summary = asyncio.run(summaries([profile_uuid]))[profile_uuid]
+    assert summary.rating_count == 1
+    assert summary.stars == stars(s4=1)
+
+
+def test_rating_moved_to_another_printer():
+    customer_id, profiles, job_ids = asyncio.run(create_printers_and_jobs(2, 1))
+    (first_id, first_uuid), (second_id, second_uuid) = profiles
+    asyncio.run(add_ratings(customer_id, [(job_ids[0], first_id, 2)]))
+
+    asyncio.run(update_rating(job_ids[0], printer_profile_id=second_id, rating=4))
+
+    result = asyncio.run(summaries([first_uuid, second_uuid]))
+    assert result[first_uuid].rating_count == 0
+    assert result[first_uuid].average_rating is None
+    assert result[first_uuid].stars == stars()
+    assert result[second_uuid].rating_count == 1
+    assert result[second_uuid].stars == stars(s4=1)
+
+
+def test_deleted_rating_is_removed_from_summary():
+    customer_id, [(profile_id, profile_uuid)], job_ids = asyncio.run(create_printers_and_jobs(1, 2))
+    asyncio.run(add_ratings(customer_id, [(job_ids[0], profile_id, 5), (job_ids[1], profile_id, 2)]))
+
+    asyncio.run(delete_rating(job_ids[0]))
+
+    summary = asyncio.run(summaries([profile_uuid]))[profile_uuid]
+    assert summary.rating_count == 1
+    assert summary.average_rating == 2.0
+    assert summary.stars == stars(s2=1)
+
+    asyncio.run(delete_rating(job_ids[1]))
+
+    summary = asyncio.run(summaries([profile_uuid]))[profile_uuid]
+    assert summary.rating_count == 0
+    assert summary.average_rating is None
+
+
+def test_rating_summaries_route(client):
+    customer_id, [(profile_id, profile_uuid)], job_ids = asyncio.run(create_printers_and_jobs(1, 1))
+    asyncio.run(add_ratings(customer_id, [(job_ids[0], profile_id, 3)]))
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "other@example.com", "role": UserRole.CUSTOMER.value, "company_name": "Other"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = client.post(
+        "/api/profiles/printers/rating-summaries",
+        headers=headers,
+        json={"printer_profile_uuids": [profile_uuid, "00000000-0000-0000-0000-000000000000"]}
+    )
+
+    assert response.status_code == 200, response.text
+    [summary] = response.json()["summaries"]
+    assert summary["printer_profile_uuid"] == profile_uuid
+    assert summary["rating_count"] == 1
+    assert summary["average_rating"] == 3.0
@@ -0,0 +1,102 @@
+"""Tests for the routing of read-only endpoints to the read replica.
+
+The replica is a second SQLite database that replication never reaches, so
+a read answered by it misses the rows written to the primary.
+"""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api import admin
+from app.persistence import database
+from app.persistence.database import Base, create_engine_for
+from app.utils import dependencies
+from app.utils.enums import ProductType, UserRole
+
+
+async def _create_tables(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture
+def replica_engine(monkeypatch):
+    path = os.path.join(tempfile.mkdtemp(prefix="printing-marketplace-replica-"), "replica.db")
+    engine = create_engine_for(f"sqlite:///{path}", "replica")
+    asyncio.run(_create_tables(engine))
+    monkeypatch.setattr(database, "replica_engine", engine)
+    monkeypatch.setattr(admin, "replica_engine", engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", async_sessionmaker(
+        engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    ))
+    monkeypatch.setattr(database, "_recent_writers", {})
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def signup_customer(client) -> dict:
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "customer@example.com", "role": UserRole.CUSTOMER.value, "company_name": "Acme"}
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_reads_go_to_replica_after_read_your_writes_window(client, replica_engine):
+    headers = signup_customer(client)
+    response = client.post(
+        "/api/jobs",
+        headers=headers,
+        json={"product_type": ProductType.FLYERS.value, "quantity": 100, "due_date": "2030-01-01T00:00:00Z"}
+    )
+    assert response.status_code == 201, response.text
+    job_uuid = response.json()["uuid"]
+
+    # The customer just wrote: their reads stay on the primary
+    assert client.get(f"/api/jobs/{job_uuid}", headers=headers).status_code == 200
+    assert len(client.get("/api/jobs", headers=headers).json()) == 1
+
+    # Window over: reads go to the (never replicated) replica
+    database._recent_writers.clear()
+    assert client.get(f"/api/jobs/{job_uuid}", headers=headers).status_code == 404
+    assert client.get("/api/jobs", headers=headers).json() == []
+
+
+def test_read_your_writes_window_is_per_process(client, replica_engine, monkeypatch):
+    headers = signup_customer(client)
+    response = client.post(
+        "/api/jobs",
+        headers=headers,
+        json={"product_type": ProductType.FLYERS.value, "quantity": 100, "due_date": "2030-01-01T00:00:00Z"}
+    )
+    assert response.status_code == 201, response.text
+    assert client.get("/api/jobs", headers=headers).json() != []
+
+    # Another worker process has its own (empty) record of recent writers:
+    # the same read goes to the replica there (documented limitation)
+    monkeypatch.setattr(database, "_recent_writers", {})
+    assert client.get("/api/jobs", headers=headers).json() == []
+
+
+def test_pool_reports_primary_and_replica(client, replica_engine, monkeypatch):
+    monkeypatch.setattr(dependencies, "ADMIN_API_TOKEN", "admin-token")
+
+    response = client.get("/api/admin/pool", headers={"X-Admin-Token": "admin-token"})
+
+    assert response.status_code == 200, response.text
+    assert set(response.json()) == {"primary", "replica"}
+    assert response.json()["replica"]["class"] == type(replica_engine.sync_engine.pool).__name__
+
+
+def test_pool_without_replica(client, monkeypatch):
+    monkeypatch.setattr(dependencies, "ADMIN_API_TOKEN", "admin-token")
+
+    response = client.get("/api/admin/pool", headers={"X-Admin-Token": "admin-token"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["replica"] is None
@@ -0,0 +1,45 @@
+"""Tests for byte ranges in the local storage backend."""
+
+import pytest
+
+from app.utils.storage_backends import InvalidRangeError, LocalBackend
+
+CONTENT = b"0123456789"
+
+
+@pytest.fixture
+def backend(tmp_path) -> LocalBackend:
+    backend = LocalBackend(str(tmp_path), base_url="")
+    backend.put_object("users/1/file.txt", CONTENT, "text/plain")
+    return backend
+
+
+def read(backend: LocalBackend, byte_range):
+    stream = backend.get_object("users/1/file.txt", byte_range)
+    try:
+        return stream["body"].read(), stream["content_range"]
+    finally:
+        stream["body"].close()
+
+
+@pytest.mark.parametrize("byte_range, body, content_range", [
+    ("bytes=2-4", b"234", "bytes 2-4/10"),
+    ("bytes=7-", b"789", "bytes 7-9/10"),
+    ("bytes=-3", b"789", "bytes 7-9/10"),
+    ("bytes=8-100", b"89", "bytes 8-9/10"),
+    ("bytes=4-4", b"4", "bytes 4-4/10"),
+])
+def test_satisfiable_range(backend, byte_range, body, content_range):
+    assert read(backend, byte_range) == (body, content_range)
+
+
+@pytest.mark.parametrize("byte_range", [None, "bytes=5-2", "bytes=-", "items=0-1"])
+def test_invalid_range_returns_whole_object(backend, byte_range):
+    assert read(backend, byte_range) == (CONTENT, None)
+
+
+@pytest.mark.parametrize("byte_range", ["bytes=10-", "bytes=10-20", "bytes=-0"])
+def test_unsatisfiable_range(backend, byte_range):
+    with pytest.raises(InvalidRangeError) as error:
+        backend.get_object("users/1/file.txt", byte_range)
+    assert error.value.object_size == len(CONTENT)
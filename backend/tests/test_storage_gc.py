@@ -0,0 +1,98 @@
+"""Tests for the storage garbage collection of unreferenced uploads."""
+
+import asyncio
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.api.uploads import get_uploaded_file_by_hash
+from app.models import UploadedFile, User
+from app.persistence.database import SessionLocal
+from app.services.storage_gc import collect_orphaned_files
+from app.utils.enums import UploadStatus, UserRole
+from app.utils.storage import storage_backend
+
+GRACE_PERIOD = timedelta(days=7)
+
+
+@pytest.fixture(autouse=True)
+def empty_storage():
+    shutil.rmtree(storage_backend.root, ignore_errors=True)
+
+
+def put_old_object(file_key: str) -> None:
+    """Store an object last modified well before the grace period."""
+    storage_backend.put_object(file_key, b"content of " + file_key.encode(), "application/pdf")
+    old = (datetime.now(timezone.utc) - 2 * GRACE_PERIOD).timestamp()
+    os.utime(storage_backend.root / file_key, (old, old))
+
+
+async def create_uploads(file_keys: list) -> int:
+    """Create completed uploads of one user, last used before the grace period."""
+    async with SessionLocal() as db:
+        user = User(email="customer@example.com", role=UserRole.CUSTOMER.value)
+        db.add(user)
+        await db.flush()
+        last_used_at = datetime.now(timezone.utc) - 2 * GRACE_PERIOD
+        db.add_all(
+            UploadedFile(
+                user_id=user.id,
+                file_key=file_key,
+                filename=file_key.rsplit("/", 1)[-1],
+                size=100,
+                sha256=f"{i:064x}",
+                status=UploadStatus.COMPLETED.value,
+                last_used_at=last_used_at
+            )
+            for i, file_key in enumerate(file_keys)
+        )
+        await db.commit()
+        return user.id
+
+
+async def remaining_uploads() -> set:
+    async with SessionLocal() as db:
+        return set((await db.execute(select(UploadedFile.file_key))).scalars().all())
+
+
+def test_deduplicated_upload_is_kept():
+    reused, unused, untracked = "users/1/reused.pdf", "users/1/unused.pdf", "users/1/untracked.pdf"
+    for file_key in (reused, unused, untracked):
+        put_old_object(file_key)
+    user_id = asyncio.run(create_uploads([reused, unused]))
+
+    async def reuse_and_collect():
+        async with SessionLocal() as db:
+            uploaded_file = await get_uploaded_file_by_hash(db, user_id, f"{0:064x}")
+            assert uploaded_file.file_key == reused
+            return await collect_orphaned_files(db, GRACE_PERIOD)
+
+    stats = asyncio.run(reuse_and_collect())
+
+    # The objects are all old: only last_used_at tells the reused one apart
+    assert stats.scanned_files == 3
+    assert stats.deleted_files == 2
+    assert storage_backend.head_object(reused) is not None
+    assert storage_backend.head_object(unused) is None
+    assert storage_backend.head_object(untracked) is None
+    assert asyncio.run(remaining_uploads()) == {reused}
+
+
+def test_dry_run_deletes_nothing():
+    file_key = "users/1/unused.pdf"
+    put_old_object(file_key)
+    asyncio.run(create_uploads([file_key]))
+
+    async def collect():
+        async with SessionLocal() as db:
+            return await collect_orphaned_files(db, GRACE_PERIOD, dry_run=True)
+
+    stats = asyncio.run(collect())
+
+    assert stats.orphaned_files == 1
+    assert stats.deleted_files == 0
+    assert storage_backend.head_object(file_key) is not None
+    assert asyncio.run(remaining_uploads()) == {file_key}
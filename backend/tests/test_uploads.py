@@ -0,0 +1,152 @@
+"""Tests for the upload routes."""
+
+import asyncio
+import hashlib
+
+from sqlalchemy import func, select
+
+from app.api import uploads
+from app.models import UploadedFile
+from app.persistence.database import SessionLocal
+from app.utils import storage
+from app.utils.enums import UserRole
+from app.utils.storage_backends import LocalBackend
+
+
+def signup_customer(client) -> dict:
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "customer@example.com", "role": UserRole.CUSTOMER.value, "company_name": "Acme"}
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def count_uploads() -> int:
+    async with SessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(UploadedFile))).scalar()
+
+
+class PresigningBackend(LocalBackend):
+    """Local backend that hands out (fake) presigned POST forms."""
+
+    supports_presigned_uploads = True
+
+    def presigned_post(self, file_key, content_type, max_size, expiration):
+        return {"url": "https://storage.example.com/bucket", "fields": {"key": file_key}}
+
+
+def test_presigned_upload_not_supported_by_backend(client):
+    headers = signup_customer(client)
+
+    response = client.post("/api/uploads/presigned", headers=headers, json={"filename": "flyer.pdf"})
+
+    assert response.status_code == 501, response.text
+    assert asyncio.run(count_uploads()) == 0
+
+
+def test_presigned_upload(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "storage_backend", PresigningBackend(str(tmp_path), base_url=""))
+    headers = signup_customer(client)
+
+    response = client.post("/api/uploads/presigned", headers=headers, json={"filename": "flyer.pdf"})
+
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert body["url"] == "https://storage.example.com/bucket"
+    assert body["fields"] == {"key": body["file_key"]}
+    assert asyncio.run(count_uploads()) == 1
+
+
+def stored_keys() -> list:
+    return storage.storage_backend.list_objects("users/")[0]
+
+
+def upload(client, headers: dict, content: bytes, filename: str = "artwork.zip"):
+    return client.post(
+        "/api/uploads/job-file",
+        headers=headers,
+        files={"file": (filename, content, "application/zip")}
+    )
+
+
+def test_streaming_upload(client):
+    headers = signup_customer(client)
+    content = b"print file " * 1000
+
+    response = upload(client, headers, content)
+
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert body["deduplicated"] is False
+    assert body["size"] == len(content)
+    assert storage.storage_backend.get_object(body["file_url"])["content_length"] == len(content)
+    assert asyncio.run(count_uploads()) == 1
+
+
+def test_streaming_upload_over_size_limit(client, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_FILE_SIZE", 1000)
+    headers = signup_customer(client)
+    before = stored_keys()
+
+    # Content-Length within MAX_FILE_SIZE + MULTIPART_OVERHEAD: cut off while streaming
+    response = upload(client, headers, b"x" * 5000)
+    assert response.status_code == 400, response.text
+    assert "too large" in response.json()["detail"]
+
+    # Content-Length alone is over the limit: rejected before reading the body
+    response = upload(client, headers, b"x" * (uploads.MULTIPART_OVERHEAD + 5000))
+    assert response.status_code == 400, response.text
+    assert "too large" in response.json()["detail"]
+
+    assert stored_keys() == before
+    assert asyncio.run(count_uploads()) == 0
+
+
+def test_early_dedup_with_content_sha256(client):
+    headers = signup_customer(client)
+    content = b"same artwork" * 100
+    first = upload(client, headers, content).json()
+    before = stored_keys()
+
+    # Known hash: answered from the header, the body is never read
+    response = client.post(
+        "/api/uploads/job-file",
+        headers={**headers, "X-Content-SHA256": hashlib.sha256(content).hexdigest().upper()},
+        content=b"not even multipart"
+    )
+
+    assert response.status_code == 201, response.text
+    assert response.json()["deduplicated"] is True
+    assert response.json()["file_url"] == first["file_url"]
+    assert stored_keys() == before
+    assert asyncio.run(count_uploads()) == 1
+
+
+def test_content_sha256_mismatch(client):
+    headers = signup_customer(client)
+
+    response = client.post(
+        "/api/uploads/job-file",
+        headers={**headers, "X-Content-SHA256": hashlib.sha256(b"other").hexdigest()},
+        files={"file": ("artwork.zip", b"content", "application/zip")}
+    )
+
+    assert response.status_code == 400, response.text
+    assert asyncio.run(count_uploads()) == 0
+
+
+def test_upload_without_file_field(client):
+    headers = signup_customer(client)
+
+    # Multipart, but the file is sent under another field name
+    response = client.post(
+        "/api/uploads/job-file",
+        headers=headers,
+        data={"description": "artwork"},
+        files={"attachment": ("artwork.zip", b"content", "application/zip")}
+    )
+
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Missing file field 'file'"
+    assert asyncio.run(count_uploads()) == 0